@@ -7,6 +7,8 @@ import random
 from typing import Tuple, List, Dict
 import json
 
+from state_coverage import StateActionCounters
+
 
 class QLearningAgent:
     """
@@ -20,6 +22,9 @@ class QLearningAgent:
     - Avec probabilité (1-ε): exploitation (meilleure action connue)
     """
     
+    # Type d'agent (voir run_config.AGENT_TYPES), enregistré dans les sauvegardes
+    AGENT_TYPE = "qlearning"
+    
     def __init__(
         self,
         actions: List[str],
@@ -27,7 +32,8 @@ class QLearningAgent:
         gamma: float = 0.9,
         epsilon: float = 0.3,
         epsilon_min: float = 0.01,
-        epsilon_decay: float = 0.995
+        epsilon_decay: float = 0.995,
+        seed: int = None
     ):
         """
         Initialise l'agent Q-Learning.
@@ -39,6 +45,7 @@ class QLearningAgent:
             epsilon: Probabilité d'exploration initiale [0, 1]
             epsilon_min: Valeur minimale d'epsilon
             epsilon_decay: Facteur de décroissance d'epsilon par épisode
+            seed: Graine de l'exploration, des ex æquo et du replay
         """
         self.actions = actions
         self.alpha = alpha
@@ -61,6 +68,14 @@ class QLearningAgent:
         self.episodes_trained = 0
         self.recent_rewards = []  # Buffer des 50 dernières récompenses moyennes
         self.best_avg_reward = float('-inf')  # Meilleure performance moyenne
+        
+        # Visites, mises à jour et erreurs TD par (état, action) (voir state_coverage.py)
+        self.counters = StateActionCounters(actions)
+        
+        # Générateur propre à l'agent (les entraînements simultanés ne se
+        # partagent pas le module random). Sans graine, il est dérivé du
+        # module random (reproductible avec random.seed())
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
     
     def get_Q(self, state: Tuple, action: str) -> float:
         """
@@ -93,20 +108,22 @@ class QLearningAgent:
         if len(self.experience_buffer) > self.buffer_size:
             self.experience_buffer.pop(0)
     
-    def choose_action(self, state: Tuple, explore: bool = True) -> str:
+    def choose_action(self, state: Tuple, explore: bool = True, rng: random.Random = None) -> str:
         """
         Choisit une action selon la politique ε-greedy.
         
         Args:
             state: État actuel du jeu
             explore: Si True, utilise ε-greedy; si False, toujours exploite (pour évaluation)
+            rng: Générateur pour l'exploration et les ex æquo (défaut: self.rng)
             
         Returns:
             Action choisie
         """
-        if explore and random.random() < self.epsilon:
+        rng = rng or self.rng
+        if explore and rng.random() < self.epsilon:
             # Exploration: action aléatoire
-            return random.choice(self.actions)
+            return rng.choice(self.actions)
         else:
             # Exploitation: meilleure action connue
             q_values = [self.get_Q(state, a) for a in self.actions]
@@ -118,7 +135,7 @@ class QLearningAgent:
                 for i, q in enumerate(q_values) 
                 if q == max_q
             ]
-            return random.choice(best_actions)
+            return rng.choice(best_actions)
     
     def update(self, state: Tuple, action: str, reward: float, next_state: Tuple, done: bool):
         """
@@ -151,6 +168,7 @@ class QLearningAgent:
         
         # Mise à jour de la Q-table
         self.Q[(state, action)] = new_q
+        self.counters.record_visit(state, action, td_error)
     
     def decay_epsilon(self, episode_reward: float = None):
         """
@@ -186,6 +204,7 @@ class QLearningAgent:
         self.alpha = max(self.alpha_min, self.alpha * self.alpha_decay)
         
         self.episodes_trained += 1
+        self.counters.end_episode(self.episodes_trained, len(self.Q))
     
     def replay_experience(self, batch_size: int = 32):
         """
@@ -194,9 +213,12 @@ class QLearningAgent:
         
         Args:
             batch_size: Nombre d'expériences à rejouer
+            
+        Returns:
+            Nombre de mises à jour effectuées (0 si le buffer est trop petit)
         """
         if len(self.experience_buffer) < batch_size:
-            return
+            return 0
         
         # Priorisation : donner plus de poids aux expériences importantes
         # (grandes récompenses positives ou négatives)
@@ -212,7 +234,7 @@ class QLearningAgent:
         probabilities = [p / total_priority for _, p in experiences_with_priority]
         
         # Échantillonner selon les probabilités (avec remplacement)
-        indices = random.choices(range(len(experiences_with_priority)), 
+        indices = self.rng.choices(range(len(experiences_with_priority)), 
                                 weights=probabilities, k=batch_size)
         batch = [experiences_with_priority[i][0] for i in indices]
         
@@ -231,6 +253,8 @@ class QLearningAgent:
             new_q = old_q + replay_alpha * td_error
             
             self.Q[(state, action)] = new_q
+            self.counters.record_update(state, action, td_error)
+        return batch_size
     
     def save(self, filepath: str):
         """
@@ -239,7 +263,13 @@ class QLearningAgent:
         Args:
             filepath: Chemin du fichier JSON de sauvegarde
         """
-        data = {
+        with open(filepath, 'w') as f:
+            json.dump(self._save_data(), f, indent=2)
+    
+    def _save_data(self) -> Dict:
+        """Contenu sérialisable de la sauvegarde (complété par les sous-classes)."""
+        return {
+            "agent_type": self.AGENT_TYPE,
             "actions": self.actions,
             "alpha": self.alpha,
             "alpha_initial": self.alpha_initial,
@@ -252,11 +282,13 @@ class QLearningAgent:
             "episodes_trained": self.episodes_trained,
             "recent_rewards": self.recent_rewards,
             "best_avg_reward": self.best_avg_reward,
-            "Q": {str(k): v for k, v in self.Q.items()}  # Convertir les tuples en strings
+            "Q": self._q_table_data(),
+            "counters": self.counters.to_dict()
         }
-        
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+    
+    def _q_table_data(self) -> Dict:
+        """Q-table de la sauvegarde (tuples convertis en strings pour JSON)."""
+        return {str(k): v for k, v in self.Q.items()}
     
     def load(self, filepath: str):
         """
@@ -266,8 +298,10 @@ class QLearningAgent:
             filepath: Chemin du fichier JSON de sauvegarde
         """
         with open(filepath, 'r') as f:
-            data = json.load(f)
-        
+            self._load_data(json.load(f))
+    
+    def _load_data(self, data: Dict):
+        """Restaure l'agent à partir du contenu d'une sauvegarde (voir _save_data)."""
         self.actions = data["actions"]
         self.alpha = data["alpha"]
         self.alpha_initial = data.get("alpha_initial", self.alpha)
@@ -287,6 +321,12 @@ class QLearningAgent:
             # Format: "((x, y, ...), 'action')"
             k = eval(k_str)  # Attention: eval est dangereux en production
             self.Q[k] = v
+        
+        # Compteurs de couverture (absents des anciennes sauvegardes)
+        if "counters" in data:
+            self.counters = StateActionCounters.from_dict(self.actions, data["counters"])
+        else:
+            self.counters = StateActionCounters(self.actions)
     
     def get_policy(self, states: List[Tuple]) -> Dict[Tuple, str]:
         """
@@ -330,18 +370,19 @@ class RandomAgent:
     def __init__(self, actions: List[str]):
         self.actions = actions
     
-    def choose_action(self, state: Tuple, explore: bool = True) -> str:
+    def choose_action(self, state: Tuple, explore: bool = True, rng: random.Random = None) -> str:
         """
         Choisit une action aléatoire.
         
         Args:
             state: État actuel (non utilisé)
             explore: Non utilisé (pour compatibilité avec QLearningAgent)
+            rng: Générateur (défaut: module random)
             
         Returns:
             Action aléatoire
         """
-        return random.choice(self.actions)
+        return (rng or random).choice(self.actions)
     
     def update(self, state: Tuple, action: str, reward: float, next_state: Tuple, done: bool):
         """
@@ -3,37 +3,43 @@ API Flask pour Mini-Pacman
 Fournit les endpoints pour l'interface Vue.js
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import os
 import json
-import base64
-from io import BytesIO
-import matplotlib
-matplotlib.use('Agg')  # Backend non-interactif pour serveur
-import matplotlib.pyplot as plt
-import numpy as np
+import time
+from typing import Optional
 
 from environment import MiniPacmanEnv
-from agent import QLearningAgent
-from training import train_agent, evaluate_agent, run_episode_with_replay
+from training import (train_agent, evaluate_agent, run_episode_with_replay, run_episode_trajectory,
+                      iter_episode_frames, iter_episode_trajectory)
+from early_stopping import EarlyStopping
+from evaluation import evaluate_suite, make_seed_suite
+from arena import run_arena
+from state_coverage import coverage_report
+from profiling import TrainingProfiler
+from curriculum import run_curriculum, make_stages
+from jobs import Job, JobManager, ProgressBatcher, RemoteJobManager
+from graph_cache import GraphCache
+from series import downsample_series
+from model_registry import ModelRegistry
+from run_config import AGENT_TYPES, build_env, build_agent, env_config
+from streaming import negotiate_encoding, ndjson_lines, compress_stream
+import metrics
 
 app = Flask(__name__)
 CORS(app)  # Permettre les requêtes cross-origin depuis Vue.js
 
-# Variables globales pour stocker l'état
-current_env = None
-current_agent = None
-training_stats = None
-training_config = None
-
-# Dossiers de sauvegarde
-MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'saved_models')
-RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'results')
+# Dossiers de sauvegarde (PACMAN_MODELS_DIR / PACMAN_RESULTS_DIR pour les isoler, ex: tests de charge)
+MODELS_DIR = os.environ.get('PACMAN_MODELS_DIR', os.path.join(os.path.dirname(__file__), '..', 'saved_models'))
+RESULTS_DIR = os.environ.get('PACMAN_RESULTS_DIR', os.path.join(os.path.dirname(__file__), '..', 'results'))
 
 os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
+# Modèles entraînés : catalogue sur disque, PACMAN_MODEL_CACHE agents en mémoire
+registry = ModelRegistry(MODELS_DIR, cache_size=int(os.environ.get('PACMAN_MODEL_CACHE', 8)))
+
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -44,6 +50,42 @@ def health_check():
     })
 
 
+# Latence des requêtes par route (jusqu'à l'envoi des en-têtes : le corps des
+# réponses en flux, SSE et replay, n'est pas compté)
+REQUEST_LATENCY = metrics.REGISTRY.histogram(
+    'pacman_http_request_duration_seconds',
+    "Durée de traitement des requêtes HTTP",
+    ('route', 'method', 'status')
+)
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def observe_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Route générique (/api/jobs/<job_id>) : cardinalité bornée
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        REQUEST_LATENCY.labels(route, request.method, response.status_code).observe(time.perf_counter() - start)
+    return response
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Métriques opérationnelles au format texte Prometheus.
+    
+    Latences de ce processus, puis tâches et entraînements du processus qui
+    les exécute (le même en développement, le processus des tâches avec
+    server.py).
+    """
+    return Response(metrics.REGISTRY.render() + job_manager.metrics(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Retourne la configuration par défaut."""
@@ -65,10 +107,159 @@ def get_config():
     return jsonify(default_config)
 
 
+def _config_error(config) -> Optional[str]:
+    """
+    Vérifie une configuration d'entraînement avant soumission.
+    
+    Seuls les types d'agent de AGENT_TYPES sont acceptés (pas les types
+    expérimentaux, voir run_config). Le curriculum a ses propres critères d'arrêt (seuil par étape) et
+    enchaîne plusieurs entraînements : l'arrêt anticipé et le profilage ne
+    s'y appliquent pas et sont refusés plutôt qu'ignorés.
+    
+    Returns:
+        Message d'erreur, ou None si la configuration est acceptée
+    """
+    if not isinstance(config, dict):
+        return "Configuration JSON manquante"
+    agent_type = config.get('agent_type', 'qlearning')
+    if agent_type not in AGENT_TYPES:
+        return f"Type d'agent inconnu: {agent_type} (disponibles: {', '.join(AGENT_TYPES)})"
+    if config.get('curriculum'):
+        unsupported = [key for key in ('early_stopping', 'profile') if config.get(key)]
+        if unsupported:
+            return f"Options incompatibles avec le curriculum: {', '.join(unsupported)}"
+    return None
+
+
+def run_training_job(job: Job) -> dict:
+    """
+    Exécute un entraînement (appelé par un thread du JobManager).
+    
+    Voir train() pour le format de la configuration. À la fin, l'agent
+    entraîné est enregistré dans le registre (identifiant = celui de la
+    tâche) et devient le dernier modèle ("latest").
+    
+    Args:
+        job: Tâche contenant la configuration et l'événement d'annulation
+        
+    Returns:
+        Résumé des statistiques d'entraînement
+    """
+    config = job.config
+    error = _config_error(config)
+    if error:
+        raise ValueError(error)
+    
+    # Créer l'environnement et l'agent
+    seed = config.get('seed')
+    env = build_env(config, seed=seed)
+    agent = build_agent(config, env.ACTIONS, seed=seed)
+    
+    # Arrêt anticipé (optionnel)
+    early_stopping = None
+    if config.get('early_stopping'):
+        early_stopping = EarlyStopping(**config['early_stopping'])
+    
+    # Profilage par phase (optionnel)
+    profiler = TrainingProfiler() if config.get('profile') else None
+    
+    # Progression publiée sur le flux SSE de la tâche (au plus 4 lots/s)
+    progress = ProgressBatcher(job.publish)
+    
+    # Entraîner
+    if config.get('curriculum'):
+        stages = make_stages(
+            target_env=env_config(env),
+            max_episodes=config.get('num_episodes', 500)
+        )
+        stats = run_curriculum(
+            agent=agent,
+            stages=stages,
+            max_steps=config.get('max_steps', 500),
+            state_encoding=env.state_encoding,
+            seed=seed,
+            verbose=False,
+            cancel_event=job.cancel_event,
+            progress_callback=progress
+        )
+    else:
+        stats = train_agent(
+            env=env,
+            agent=agent,
+            num_episodes=config.get('num_episodes', 500),
+            max_steps=config.get('max_steps', 500),
+            verbose=False,
+            early_stopping=early_stopping,
+            profiler=profiler,
+            cancel_event=job.cancel_event,
+            progress_callback=progress
+        )
+    progress.flush()
+    
+    if stats['cancelled']:
+        return {"cancelled": True, "num_episodes": stats['num_episodes']}
+    
+    if profiler is not None:
+        profiler.export(os.path.join(RESULTS_DIR, f'profile_{job.id}.json'))
+    
+    # Enregistrer le modèle dans le catalogue
+    registry.register(
+        model_id=job.id,
+        agent=agent,
+        config=config,
+        stats=stats,
+        env_config=env_config(env),
+        agent_type=config.get('agent_type', 'qlearning')
+    )
+    
+    # Rendre les graphiques dès maintenant, en arrière-plan (inutile dans le
+    # processus de tâches du serveur de production : les requêtes sont
+    # servies par d'autres processus, qui rendent à la demande)
+    if PRERENDER_GRAPHS:
+        graph_cache.submit(job.id, stats)
+    
+    return {
+        "model_id": job.id,
+        "avg_reward": stats['avg_reward'],
+        "avg_coins": stats['avg_coins'],
+        "success_rate": stats['success_rate'],
+        "training_time": stats['training_time'],
+        "q_table_size": stats['q_table_size'],
+        "num_episodes": stats['num_episodes']
+    }
+
+
+# Tâches d'entraînement en arrière-plan (PACMAN_MAX_JOBS entraînements simultanés).
+# Avec le serveur de production (server.py), elles tournent dans un processus
+# dédié dont l'adresse est donnée par PACMAN_JOB_SERVER ("hôte:port" ou
+# chemin d'un socket Unix).
+PRERENDER_GRAPHS = True
+if os.environ.get('PACMAN_JOB_SERVER'):
+    _job_address = os.environ['PACMAN_JOB_SERVER']
+    if ':' in _job_address:
+        _job_host, _job_port = _job_address.rsplit(':', 1)
+        _job_address = (_job_host, int(_job_port))
+    job_manager = RemoteJobManager(
+        address=_job_address,
+        authkey=os.environ.get('PACMAN_JOB_AUTHKEY', '').encode()
+    )
+else:
+    job_manager = JobManager(
+        runner=run_training_job,
+        max_workers=int(os.environ.get('PACMAN_MAX_JOBS', 2))
+    )
+
+
+def _client_id() -> str:
+    """Identifiant du client pour l'ordonnancement équitable des tâches."""
+    return request.headers.get('X-Client-Id') or request.remote_addr or "anonymous"
+
+
 @app.route('/api/train', methods=['POST'])
 def train():
     """
-    Lance l'entraînement de l'agent avec les paramètres fournis.
+    Lance l'entraînement de l'agent avec les paramètres fournis et attend
+    sa fin (compatibilité ; préférer POST /api/jobs qui répond immédiatement).
     
     Body JSON attendu:
     {
@@ -82,58 +273,45 @@ def train():
         "gamma": 0.9,
         "epsilon": 1.0,
         "epsilon_min": 0.01,
-        "epsilon_decay": 0.995
+        "epsilon_decay": 0.995,
+        "agent_type": "qlearning" ou "linear",
+        "num_tilings": 4,              (linéaire: pavages décalés par résolution)
+        "resolutions": [4, 8, 16],     (linéaire: tuiles par côté de la position)
+        "early_stopping": {            (optionnel)
+            "eval_interval": 100,
+            "eval_episodes": 20,
+            "patience": 5,
+            "metric": "success_rate",
+            "target": 90
+        },
+        "profile": false,              (optionnel, profilage par phase)
+        "curriculum": false,           (optionnel, étapes faciles puis config cible ;
+                                        incompatible avec early_stopping et profile)
+        "seed": 0                      (optionnel, graine de l'environnement et de l'agent)
     }
     """
-    global current_env, current_agent, training_stats, training_config
+    error = _config_error(request.json)
+    if error:
+        return jsonify({
+            "success": False,
+            "message": error
+        }), 400
     
     try:
-        config = request.json
-        training_config = config.copy()
-        
-        # Créer l'environnement
-        current_env = MiniPacmanEnv(
-            grid_size=config.get('grid_size', 10),
-            num_ghosts=config.get('num_ghosts', 3),
-            ghost_behavior=config.get('ghost_behavior', 'random'),
-            coins_per_row=config.get('coins_per_row', 10),
-            num_lives=config.get('num_lives', 3),
-            enable_powerups=config.get('enable_powerups', True)
-        )
+        job_id = job_manager.submit(request.json, owner=_client_id())
+        status = job_manager.wait(job_id)
         
-        # Créer l'agent
-        current_agent = QLearningAgent(
-            actions=current_env.ACTIONS,
-            alpha=config.get('alpha', 0.1),
-            gamma=config.get('gamma', 0.9),
-            epsilon=config.get('epsilon', 1.0),
-            epsilon_min=config.get('epsilon_min', 0.01),
-            epsilon_decay=config.get('epsilon_decay', 0.995)
-        )
-        
-        # Entraîner
-        training_stats = train_agent(
-            env=current_env,
-            agent=current_agent,
-            num_episodes=config.get('num_episodes', 500),
-            max_steps=config.get('max_steps', 500),
-            verbose=False
-        )
-        
-        # Sauvegarder le modèle
-        model_path = os.path.join(MODELS_DIR, 'latest_model.json')
-        current_agent.save(model_path)
+        if status['status'] != 'completed':
+            return jsonify({
+                "success": False,
+                "message": f"Erreur lors de l'entraînement: {status['error'] or status['status']}"
+            }), 500
         
         return jsonify({
             "success": True,
             "message": "Entraînement terminé avec succès",
-            "stats": {
-                "avg_reward": training_stats['avg_reward'],
-                "avg_coins": training_stats['avg_coins'],
-                "success_rate": training_stats['success_rate'],
-                "training_time": training_stats['training_time'],
-                "q_table_size": training_stats['q_table_size']
-            }
+            "job_id": job_id,
+            "stats": job_manager.result(job_id)
         })
     
     except Exception as e:
@@ -143,29 +321,193 @@ def train():
         }), 500
 
 
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Soumet un entraînement en arrière-plan et retourne immédiatement son identifiant.
+    Même format de configuration que /api/train.
+    """
+    config = request.json
+    error = _config_error(config)
+    if error:
+        return jsonify({
+            "success": False,
+            "message": error
+        }), 400
+    
+    job_id = job_manager.submit(config, owner=_client_id())
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "job": job_manager.status(job_id)
+    }), 202
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Liste les tâches d'entraînement connues."""
+    return jsonify({
+        "success": True,
+        "jobs": job_manager.list_jobs()
+    })
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Retourne l'état d'une tâche (queued, running, completed, failed, cancelled)."""
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({
+            "success": False,
+            "message": "Tâche inconnue"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": status
+    })
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Annule une tâche en attente ou en cours."""
+    if not job_manager.cancel(job_id):
+        return jsonify({
+            "success": False,
+            "message": "Tâche inconnue ou déjà terminée"
+        }), 404
+    return jsonify({
+        "success": True,
+        "job": job_manager.status(job_id)
+    })
+
+
+def _sse(event_type: str, data: dict, event_id: int = None) -> str:
+    """Formate un message Server-Sent Events."""
+    message = f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Flux Server-Sent Events de la progression d'une tâche.
+    
+    Événements:
+        progress: métriques agrégées (episode, num_episodes, reward, coins,
+            success_rate, epsilon, elapsed, steps_per_sec...)
+        status: état final de la tâche (dernier message du flux)
+    
+    Un client reconnecté (en-tête Last-Event-ID, ou ?since=) reçoit les
+    événements manqués encore en mémoire. Un commentaire est envoyé toutes
+    les 15 secondes sans événement pour garder la connexion ouverte.
+    """
+    if job_manager.status(job_id) is None:
+        return jsonify({
+            "success": False,
+            "message": "Tâche inconnue"
+        }), 404
+    
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        last_id = 0
+    
+    def generate():
+        nonlocal last_id
+        # Délai de reconnexion conseillé au navigateur
+        yield "retry: 2000\n\n"
+        while True:
+            polled = job_manager.events_since(job_id, last_id, timeout=15)
+            if polled is None:
+                return
+            events, finished = polled
+            for event_id, event_type, data in events:
+                last_id = event_id
+                yield _sse(event_type, data, event_id)
+            if finished:
+                yield _sse("status", job_manager.status(job_id))
+                return
+            if not events:
+                yield ": keepalive\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Pas de mise en tampon derrière nginx
+        }
+    )
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Retourne le résumé des statistiques d'une tâche terminée."""
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({
+            "success": False,
+            "message": "Tâche inconnue"
+        }), 404
+    if status['status'] != 'completed':
+        return jsonify({
+            "success": False,
+            "job": status,
+            "message": "Tâche non terminée"
+        }), 409
+    return jsonify({
+        "success": True,
+        "job": status,
+        "stats": job_manager.result(job_id)
+    })
+
+
 @app.route('/api/results', methods=['GET'])
 def get_results():
     """
-    Retourne les résultats de l'entraînement et génère les graphiques.
+    Retourne les résultats d'un entraînement (par défaut le dernier).
+    
+    Les graphiques ne sont pas inclus : "graphs" donne l'URL de chaque image
+    (voir /api/results/graphs/<name>). La réponse porte l'identifiant de
+    l'entraînement en ETag (If-None-Match -> 304 tant qu'il n'a pas changé).
+    
+    Query string:
+        model: Identifiant du modèle (défaut: latest)
+        series: "false" pour omettre les séries par épisode de "stats"
+            (voir /api/results/series pour les obtenir sous-échantillonnées)
     """
-    global training_stats, training_config
+    include_series = request.args.get('series', 'true').lower() != 'false'
+    # Identifiants demandés passés tels quels : inconnu -> None (pas de repli sur latest)
+    requested = request.args.get('model')
+    run_id = registry.resolve(requested)
+    metadata = registry.get_metadata(requested)
+    stats = registry.get_stats(requested)
     
-    if training_stats is None or training_config is None:
+    if stats is None or metadata is None:
         return jsonify({
             "success": False,
             "message": "Aucun entraînement disponible. Veuillez d'abord entraîner un agent."
         }), 200  # 200 au lieu de 404 pour que le frontend gère mieux
     
+    if not include_series:
+        stats = {key: value for key, value in stats.items() if not key.endswith('_per_episode')}
+    
     try:
-        # Générer les graphiques
-        graphs = generate_training_graphs(training_stats)
-        
-        return jsonify({
+        response = jsonify({
             "success": True,
-            "config": training_config,
-            "stats": training_stats,
-            "graphs": graphs
+            "run_id": run_id,
+            "config": metadata["config"],
+            "stats": stats,
+            "graphs": {
+                name: f"/api/results/graphs/{name}?run={run_id}"
+                for name in GRAPH_NAMES
+            }
         })
+        response.set_etag(graph_cache.etag(run_id, "results" if include_series else "summary"))
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
     
     except Exception as e:
         import traceback
@@ -177,24 +519,145 @@ def get_results():
         }), 500
 
 
+@app.route('/api/results/series', methods=['GET'])
+def get_series():
+    """
+    Retourne les séries par épisode du dernier entraînement, sous-échantillonnées.
+    
+    Query string:
+        model: Identifiant du modèle (défaut: latest)
+        points: Nombre maximum de points par série (défaut: 500, max: 5000)
+        from, to: Plage d'épisodes (1-indexée, incluse ; défaut: tout)
+        method: "lttb" (défaut) ou "minmax" (min et max de chaque paquet)
+        window: Fenêtre des moyennes glissantes (défaut: 50)
+        series: Liste séparée par des virgules parmi reward, coins, steps, success
+    
+    Chaque série contient les points bruts (x, y) et sa moyenne glissante
+    (avg_x, avg_y), le taux de succès étant exprimé en %.
+    """
+    requested = request.args.get('model')
+    run_id = registry.resolve(requested)
+    stats = registry.get_stats(requested)
+    
+    if stats is None:
+        return jsonify({
+            "success": False,
+            "message": "Aucun entraînement disponible. Veuillez d'abord entraîner un agent."
+        }), 200
+    
+    # Résultat déterminé par l'entraînement et la requête : ETag sans calcul
+    etag = graph_cache.etag(run_id, f"series?{request.query_string.decode()}")
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    
+    try:
+        names = request.args.get('series')
+        data = downsample_series(
+            stats,
+            num_points=min(request.args.get('points', 500, type=int), 5000),
+            start=request.args.get('from', 1, type=int),
+            end=request.args.get('to', None, type=int),
+            method=request.args.get('method', 'lttb'),
+            window=request.args.get('window', 50, type=int),
+            names=names.split(',') if names else None
+        )
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    
+    response = jsonify({
+        "success": True,
+        "run_id": run_id,
+        **data
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@app.route('/api/results/graphs/<name>', methods=['GET'])
+def get_graph(name):
+    """
+    Retourne un graphique d'entraînement en PNG.
+    
+    Query string:
+        run: Identifiant du modèle (défaut: le dernier). Une URL avec
+            identifiant désigne une image immuable, mise en cache par le navigateur.
+    """
+    requested_run = registry.resolve(request.args.get('run'))
+    if name not in GRAPH_NAMES or requested_run is None:
+        return jsonify({
+            "success": False,
+            "message": "Graphique inconnu"
+        }), 404
+    
+    # L'ETag est connu sans rendu : répondre 304 immédiatement si possible
+    if request.if_none_match.contains(graph_cache.etag(requested_run, name)):
+        return Response(status=304, headers={'ETag': f'"{graph_cache.etag(requested_run, name)}"'})
+    
+    try:
+        graph = graph_cache.get(requested_run, name, stats=registry.get_stats(requested_run))
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erreur lors du rendu du graphique: {str(e)}"
+        }), 500
+    
+    if graph is None:
+        return jsonify({
+            "success": False,
+            "message": "Graphique indisponible pour cet entraînement"
+        }), 404
+    
+    image, etag = graph
+    response = Response(image, mimetype='image/png')
+    response.set_etag(etag)
+    if 'run' in request.args:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
 @app.route('/api/replay', methods=['POST'])
 def replay_episode():
     """
-    Rejoue un épisode avec l'agent entraîné et retourne l'historique.
+    Rejoue un épisode avec un agent entraîné et retourne l'historique.
+    
+    Body JSON attendu:
+    {
+        "model_id": "latest",          (optionnel, voir /api/models)
+        "max_steps": 200,
+        "format": "full" ou "delta"   (delta: image clé + changements par pas)
+    }
     """
-    global current_env, current_agent
+    params = request.json or {}
+    model_id = params.get('model_id')
+    agent = registry.get_agent(model_id)
+    # Environnement neuf par requête : plusieurs replays peuvent tourner en parallèle
+    env = registry.make_env(model_id)
     
-    if current_env is None or current_agent is None:
+    if env is None or agent is None:
         return jsonify({
             "success": False,
             "message": "Aucun agent entraîné disponible"
         }), 404
     
     try:
-        max_steps = request.json.get('max_steps', 500)
+        max_steps = params.get('max_steps', 500)
+        
+        if params.get('format') == 'delta':
+            trajectory = run_episode_trajectory(env, agent, max_steps)
+            return jsonify({
+                "success": True,
+                "trajectory": trajectory,
+                "episode_length": len(trajectory['steps']) + 1
+            })
         
         # Exécuter un épisode
-        history = run_episode_with_replay(current_env, current_agent, max_steps)
+        history = run_episode_with_replay(env, agent, max_steps)
         
         return jsonify({
             "success": True,
@@ -210,105 +673,348 @@ def replay_episode():
         }), 500
 
 
-def generate_training_graphs(stats: dict) -> dict:
+@app.route('/api/replay/stream', methods=['POST'])
+def replay_stream():
     """
-    Génère les graphiques d'entraînement avec Matplotlib.
+    Rejoue un épisode en flux NDJSON : chaque image est envoyée dès qu'elle
+    est jouée, sans attendre la fin de l'épisode.
     
-    Args:
-        stats: Statistiques d'entraînement
-        
-    Returns:
-        Dictionnaire contenant les graphiques en base64
+    Même body JSON que /api/replay. Format "full" : une image par ligne.
+    Format "delta" : l'en-tête {"format", "keyframe"} puis un delta par ligne.
+    La réponse est compressée (gzip ou deflate) selon Accept-Encoding, par
+    blocs vidés au fil de l'eau.
     """
-    graphs = {}
-    
-    # 1. Graphique des récompenses
-    fig, ax = plt.subplots(figsize=(10, 6))
-    rewards = stats['rewards_per_episode']
-    episodes = range(1, len(rewards) + 1)
-    
-    # Courbe brute et moyenne glissante
-    ax.plot(episodes, rewards, alpha=0.3, label='Récompense par épisode')
-    
-    # Moyenne glissante sur 50 épisodes
-    window = 50
-    if len(rewards) >= window:
-        moving_avg = np.convolve(rewards, np.ones(window)/window, mode='valid')
-        ax.plot(range(window, len(rewards) + 1), moving_avg, 
-                linewidth=2, label=f'Moyenne glissante ({window} épisodes)')
-    
-    ax.set_xlabel('Épisode')
-    ax.set_ylabel('Récompense totale')
-    ax.set_title('Évolution de la récompense pendant l\'entraînement')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-    
-    graphs['rewards'] = fig_to_base64(fig)
-    plt.close(fig)
+    params = request.json or {}
+    model_id = params.get('model_id')
+    agent = registry.get_agent(model_id)
+    env = registry.make_env(model_id)
     
-    # 2. Graphique des pièces collectées
-    fig, ax = plt.subplots(figsize=(10, 6))
-    coins = stats['coins_per_episode']
-    
-    ax.plot(episodes, coins, alpha=0.3, label='Pièces collectées par épisode')
+    if env is None or agent is None:
+        return jsonify({
+            "success": False,
+            "message": "Aucun agent entraîné disponible"
+        }), 404
     
-    if len(coins) >= window:
-        moving_avg = np.convolve(coins, np.ones(window)/window, mode='valid')
-        ax.plot(range(window, len(coins) + 1), moving_avg,
-                linewidth=2, label=f'Moyenne glissante ({window} épisodes)')
+    max_steps = params.get('max_steps', 500)
+    if params.get('format') == 'delta':
+        items = iter_episode_trajectory(env, agent, max_steps)
+    else:
+        items = iter_episode_frames(env, agent, max_steps)
     
-    ax.set_xlabel('Épisode')
-    ax.set_ylabel('Nombre de pièces')
-    ax.set_title('Nombre de pièces collectées pendant l\'entraînement')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    headers = {
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        'X-Accel-Buffering': 'no'
+    }
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
     
-    graphs['coins'] = fig_to_base64(fig)
-    plt.close(fig)
+    return Response(
+        stream_with_context(compress_stream(ndjson_lines(items), encoding)),
+        mimetype='application/x-ndjson',
+        headers=headers
+    )
+
+
+@app.route('/api/evaluate', methods=['POST'])
+def evaluate():
+    """
+    Évalue un agent entraîné contre l'agent aléatoire (et d'autres modèles
+    du registre) sur une suite de graines identique, dans l'environnement
+    d'entraînement du modèle évalué. Le résumé est ajouté aux métadonnées
+    du modèle.
+
+    Body JSON attendu:
+    {
+        "model_id": "latest",              (optionnel)
+        "num_episodes": 1000,
+        "base_seed": 0,
+        "max_steps": 300,
+        "workers": 4,
+        "models": ["<id>", ...]            (optionnel, autres modèles comparés)
+    }
+    """
+    params = request.json or {}
+    metadata = registry.get_metadata(params.get('model_id'))
+
+    if metadata is None:
+        return jsonify({
+            "success": False,
+            "message": "Aucun agent entraîné disponible"
+        }), 404
+
+    try:
+        model_id = metadata["id"]
+        agents = {model_id: registry.get_agent(model_id)}
+        for other_id in params.get('models', []):
+            other = registry.get_agent(other_id)
+            if other is None:
+                return jsonify({
+                    "success": False,
+                    "message": f"Modèle introuvable: {other_id}"
+                }), 404
+            agents[other_id] = other
+
+        num_episodes = params.get('num_episodes', 1000)
+        base_seed = params.get('base_seed', 0)
+        max_steps = params.get('max_steps', metadata["config"].get('max_steps', 500))
+        report = evaluate_suite(
+            agents=agents,
+            env_config=metadata["env"],
+            seeds=make_seed_suite(num_episodes, base_seed),
+            max_steps=max_steps,
+            workers=params.get('workers'),
+            verbose=False
+        )
+
+        evaluated = report["agents"][model_id]
+        registry.add_evaluation(model_id, {
+            "num_episodes": num_episodes,
+            "base_seed": base_seed,
+            "max_steps": max_steps,
+            "success_rate": evaluated["success"],
+            "reward": evaluated["reward"],
+            "coins": evaluated["coins"]
+        })
+
+        return jsonify({
+            "success": True,
+            "report": report
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erreur lors de l'évaluation: {str(e)}"
+        }), 500
+
+
+@app.route('/api/arena', methods=['POST'])
+def arena():
+    """
+    Classe les modèles du registre sur une suite de graines commune.
+    Les résultats par (modèle, graine) sont gardés en cache : après l'ajout
+    d'un modèle, seul celui-ci est évalué.
+
+    Body JSON attendu:
+    {
+        "models": ["<id>", ...],           (optionnel, défaut: tous)
+        "env": {"grid_size": 10, ...},     (optionnel, défaut: environnement du dernier modèle)
+        "num_episodes": 500,
+        "base_seed": 0,
+        "max_steps": 300,
+        "workers": 4
+    }
+    """
+    params = request.json or {}
+
+    try:
+        arena_env = None
+        if params.get('env'):
+            latest = registry.get_metadata('latest')
+            arena_env = dict(latest["env"] if latest else {}, **params['env'])
+
+        report = run_arena(
+            MODELS_DIR,
+            model_ids=params.get('models'),
+            env_config=arena_env,
+            seeds=make_seed_suite(params.get('num_episodes', 500), params.get('base_seed', 0)),
+            max_steps=params.get('max_steps', 300),
+            workers=params.get('workers'),
+            verbose=False
+        )
+        return jsonify({
+            "success": True,
+            "report": report
+        })
+
+    except KeyError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e.args[0])
+        }), 404
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "message": f"Erreur lors du classement: {str(e)}"
+        }), 500
+
+
+# Taille maximale d'un lot de /api/act
+MAX_ACT_BATCH = int(os.environ.get('PACMAN_MAX_ACT_BATCH', 10000))
+
+
+@app.route('/api/act', methods=['POST'])
+def act():
+    """
+    Politique gloutonne d'un modèle pour un lot d'états (service de politique).
     
-    # 3. Graphique du taux de succès
-    fig, ax = plt.subplots(figsize=(10, 6))
-    successes = stats['success_per_episode']
+    Body JSON attendu (l'un des deux champs d'états):
+    {
+        "model_id": "latest",                  (optionnel)
+        "states": [[zone_x, zone_y, danger, target_dir, progress, invincible, ghost_dir], ...],
+        "raw_states": [{"pacman_pos": [x, y], "ghosts_pos": [[x, y], ...],
+                        "coins": [[x, y], ...], "powerups": [...],
+                        "invincible_timer": 0, "coins_collected": 0}, ...],
+        "include_q": true                      (optionnel, valeurs Q par action)
+    }
     
-    if len(successes) >= window:
-        success_rate = np.convolve(successes, np.ones(window)/window, mode='valid') * 100
-        ax.plot(range(window, len(successes) + 1), success_rate,
-                linewidth=2, label=f'Taux de succès ({window} épisodes)')
+    Les états bruts sont encodés comme get_state_for_agent (grille du modèle
+    par défaut). Réponse: actions, known (état vu à l'entraînement) et
+    q_values dans l'ordre de "action_order".
+    """
+    params = request.json or {}
+    model_id = registry.resolve(params.get('model_id'))
+    policy = registry.get_policy(model_id) if model_id is not None else None
+    if policy is None:
+        return jsonify({
+            "success": False,
+            "message": "Modèle inconnu"
+        }), 404
     
-    ax.set_xlabel('Épisode')
-    ax.set_ylabel('Taux de succès (%)')
-    ax.set_title('Taux de succès pendant l\'entraînement')
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-    ax.set_ylim(0, 105)
+    # Taille du lot vérifiée avant l'encodage des états bruts
+    batch = params['raw_states'] if 'raw_states' in params else params.get('states', [])
+    if isinstance(batch, list) and len(batch) > MAX_ACT_BATCH:
+        return jsonify({
+            "success": False,
+            "message": f"Lot trop grand ({len(batch)} états, maximum {MAX_ACT_BATCH})"
+        }), 413
     
-    graphs['success_rate'] = fig_to_base64(fig)
-    plt.close(fig)
+    try:
+        if 'raw_states' in params:
+            model_env = registry.get_metadata(model_id)["env"]
+            grid_size = model_env.get('grid_size', 10)
+            state_encoding = model_env.get('state_encoding', 'zones')
+            encode = MiniPacmanEnv.encode_raw_state
+            states = [encode(raw, grid_size, state_encoding) for raw in batch]
+        else:
+            states = [tuple(state) for state in batch]
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            "success": False,
+            "message": f"État invalide: {str(e)}"
+        }), 400
     
-    return graphs
+    try:
+        result = policy.act(states)
+    except ValueError as e:
+        return jsonify({
+            "success": False,
+            "message": f"État invalide: {str(e)}"
+        }), 400
+    actions = policy.actions
+    response = {
+        "success": True,
+        "model_id": model_id,
+        "action_order": actions,
+        "actions": [actions[i] for i in result["actions"].tolist()],
+        "known": result["known"].tolist()
+    }
+    if params.get('include_q', True):
+        response["q_values"] = result["q_values"].tolist()
+    if 'raw_states' in params:
+        response["states"] = states
+    return jsonify(response)
+
+
+@app.route('/api/models', methods=['GET'])
+def list_models():
+    """Liste les modèles du registre (du plus récent au plus ancien) et l'état du cache."""
+    return jsonify({
+        "success": True,
+        "latest": registry.resolve('latest'),
+        "models": registry.list_models(),
+        "cache": registry.cache_info()
+    })
+
+
+@app.route('/api/models/<model_id>', methods=['GET'])
+def get_model(model_id):
+    """Retourne les métadonnées d'un modèle ("latest" = dernier entraîné)."""
+    metadata = registry.get_metadata(model_id)
+    if metadata is None:
+        return jsonify({
+            "success": False,
+            "message": "Modèle inconnu"
+        }), 404
+    return jsonify({
+        "success": True,
+        "model": metadata
+    })
 
 
-def fig_to_base64(fig) -> str:
+@app.route('/api/models/<model_id>/coverage', methods=['GET'])
+def get_model_coverage(model_id):
     """
-    Convertit une figure Matplotlib en string base64.
-    
+    Couverture de l'espace d'états par un modèle : états jamais visités,
+    concentration des mises à jour, paires à forte variance d'erreur TD,
+    évolution de la couverture pendant l'entraînement.
+
+    Paramètres: top (défaut 20), min_count (défaut 10)
+    """
+    metadata = registry.get_metadata(model_id)
+    agent = registry.get_agent(model_id)
+    if metadata is None or agent is None:
+        return jsonify({
+            "success": False,
+            "message": "Modèle inconnu"
+        }), 404
+
+    state_space = MiniPacmanEnv.state_space(has_ghosts=metadata["env"].get('num_ghosts', 3) > 0)
+    report = coverage_report(
+        agent.counters,
+        state_space,
+        top=request.args.get('top', 20, type=int),
+        min_count=request.args.get('min_count', 10, type=int)
+    )
+    return jsonify({
+        "success": True,
+        "model_id": metadata["id"],
+        "coverage": report
+    })
+
+
+@app.route('/api/models/<model_id>', methods=['DELETE'])
+def delete_model(model_id):
+    """Supprime un modèle du registre (fichiers compris)."""
+    if not registry.delete(model_id):
+        return jsonify({
+            "success": False,
+            "message": "Modèle inconnu"
+        }), 404
+    return jsonify({"success": True})
+
+
+def render_training_graphs(stats: dict) -> dict:
+    """
+    Rendu des graphiques d'entraînement (plotting, donc Matplotlib, n'est
+    importé qu'au premier appel).
+
     Args:
-        fig: Figure Matplotlib
-        
+        stats: Statistiques d'entraînement
+
     Returns:
-        String base64 de l'image
+        Dictionnaire {nom: image PNG}
     """
-    buffer = BytesIO()
-    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-    buffer.seek(0)
-    img_base64 = base64.b64encode(buffer.getvalue()).decode()
-    buffer.close()
-    return f"data:image/png;base64,{img_base64}"
+    from plotting import generate_training_graphs
+    return generate_training_graphs(stats)
+
+
+# Graphiques rendus une fois par entraînement (incrémenter version si le style change)
+GRAPH_NAMES = ['rewards', 'coins', 'success_rate']
+graph_cache = GraphCache(renderer=render_training_graphs, version=1)
 
 
 if __name__ == '__main__':
     print("=" * 60)
     print("Démarrage de l'API Mini-Pacman")
     print("URL: http://localhost:5000")
+    print("(développement ; en production : python server.py)")
     print("=" * 60)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,312 @@
+"""
+Arène : classement de nombreux modèles du registre sur une suite de graines commune
+Chargement paresseux (mémoire bornée), pool de processus, cache des résultats par (modèle, graine)
+
+Exemple :
+    python arena.py --models-dir saved_models --episodes 500 --workers 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from evaluation import METRICS, make_seed_suite, process_pool_context, run_seeded_episode, summarize_episodes
+from model_registry import ModelRegistry
+from run_config import ENV_KEYS
+
+
+# 2 : générateurs propres à l'environnement et à l'agent (épisodes différents par graine)
+CACHE_VERSION = 2
+
+# Registre propre à chaque processus de travail (cache LRU d'agents borné)
+_worker_registry = None
+
+
+def suite_key(env_config: Dict, max_steps: int) -> str:
+    """
+    Identifiant des conditions d'évaluation (environnement, nombre de pas).
+
+    La graine fixe le labyrinthe, les positions initiales et la suite
+    aléatoire de l'épisode : à conditions égales, le résultat d'un modèle
+    sur une graine ne change pas et peut être gardé en cache.
+
+    Args:
+        env_config: Paramètres de MiniPacmanEnv (sans seed)
+        max_steps: Nombre maximum de pas par épisode
+
+    Returns:
+        Empreinte courte (hexadécimal)
+    """
+    payload = json.dumps({"version": CACHE_VERSION, "env": env_config, "max_steps": max_steps}, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+class ArenaCache:
+    """
+    Résultats par (modèle, graine) sur disque : un fichier JSON par modèle et
+    par suite. Un modèle ré-entraîné sous le même identifiant (date de
+    création différente) invalide ses résultats.
+    """
+
+    def __init__(self, root_dir: str, key: str):
+        """
+        Args:
+            root_dir: Répertoire du cache
+            key: Identifiant de la suite (voir suite_key)
+        """
+        self.dir = os.path.join(root_dir, key)
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _path(self, model_id: str) -> str:
+        return os.path.join(self.dir, f"{model_id}.json")
+
+    def load(self, model_id: str, created_at: float) -> Dict[int, Dict]:
+        """
+        Résultats connus d'un modèle.
+
+        Args:
+            model_id: Identifiant du modèle
+            created_at: Date de création du modèle (métadonnées du registre)
+
+        Returns:
+            {graine: métriques de l'épisode}
+        """
+        try:
+            with open(self._path(model_id)) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if data.get("created_at") != created_at:
+            return {}
+        return {int(seed): dict(zip(METRICS, values), seed=int(seed))
+                for seed, values in data["episodes"].items()}
+
+    def save(self, model_id: str, created_at: float, episodes: Dict[int, Dict]):
+        """
+        Enregistre les résultats d'un modèle (écriture atomique).
+
+        Args:
+            model_id: Identifiant du modèle
+            created_at: Date de création du modèle
+            episodes: {graine: métriques de l'épisode}
+        """
+        data = {
+            "model_id": model_id,
+            "created_at": created_at,
+            "metrics": METRICS,
+            "episodes": {str(seed): [episode[metric] for metric in METRICS]
+                         for seed, episode in sorted(episodes.items())}
+        }
+        tmp_path = f"{self._path(model_id)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path(model_id))
+
+
+def _init_worker(models_dir: str, max_loaded: int):
+    """Ouvre le registre dans le processus de travail (agents chargés à la demande)."""
+    global _worker_registry
+    _worker_registry = ModelRegistry(models_dir, cache_size=max_loaded)
+
+
+def _run_model_chunk(model_id: str, env_config: Dict, seeds: List[int], max_steps: int) -> List[Dict]:
+    """Joue les épisodes gloutons d'un modèle sur un lot de graines."""
+    agent = _worker_registry.get_agent(model_id)
+    if agent is None:
+        raise KeyError(f"Modèle introuvable: {model_id}")
+    return [run_seeded_episode(agent, env_config, seed, max_steps) for seed in seeds]
+
+
+def run_arena(
+    models_dir: str,
+    model_ids: Optional[List[str]] = None,
+    env_config: Optional[Dict] = None,
+    seeds: Optional[List[int]] = None,
+    max_steps: int = 300,
+    workers: int = None,
+    chunk_size: int = 250,
+    max_loaded: int = 2,
+    num_resamples: int = 1000,
+    cache_dir: Optional[str] = None,
+    verbose: bool = True
+) -> Dict:
+    """
+    Classe des modèles du registre sur une suite de graines identique.
+
+    Seules les paires (modèle, graine) absentes du cache sont jouées :
+    ajouter un modèle puis relancer le classement n'évalue que lui. Les
+    lots de graines d'un même modèle se suivent dans la file du pool, et
+    chaque processus garde au plus `max_loaded` agents en mémoire.
+
+    Args:
+        models_dir: Répertoire du registre des modèles
+        model_ids: Modèles à classer (None = tous)
+        env_config: Paramètres de MiniPacmanEnv (None = environnement du dernier modèle)
+        seeds: Suite de graines (None = make_seed_suite(500))
+        max_steps: Nombre maximum de pas par épisode
+        workers: Nombre de processus (None = nombre de CPU, 1 = séquentiel)
+        chunk_size: Nombre de graines par tâche envoyée au pool
+        max_loaded: Nombre maximum d'agents chargés par processus
+        num_resamples: Nombre de rééchantillonnages bootstrap
+        cache_dir: Répertoire du cache (défaut: <models_dir>/arena)
+        verbose: Afficher le classement
+
+    Returns:
+        Dictionnaire contenant la suite, le classement et le nombre d'épisodes joués
+    """
+    start_time = time.time()
+    registry = ModelRegistry(models_dir, cache_size=max_loaded)
+    catalog = {metadata["id"]: metadata for metadata in registry.list_models()}
+    if model_ids is None:
+        model_ids = list(catalog)
+    unknown = [model_id for model_id in model_ids if model_id not in catalog]
+    if unknown:
+        raise KeyError(f"Modèles introuvables: {', '.join(unknown)}")
+    if not model_ids:
+        raise ValueError("Aucun modèle à classer")
+
+    if env_config is None:
+        env_config = catalog[registry.resolve("latest") or model_ids[0]]["env"]
+    # L'encodage d'état ne change pas le déroulement des épisodes : fixé par modèle
+    env_config = {key: value for key, value in env_config.items() if key in ENV_KEYS and key != "state_encoding"}
+    seeds = list(seeds) if seeds is not None else make_seed_suite(500)
+    key = suite_key(env_config, max_steps)
+    cache = ArenaCache(cache_dir or os.path.join(models_dir, "arena"), key)
+
+    # Résultats connus, puis lots de graines manquantes (regroupés par modèle)
+    results = {}
+    tasks = []
+    for model_id in model_ids:
+        created_at = catalog[model_id]["created_at"]
+        known = cache.load(model_id, created_at)
+        results[model_id] = known
+        missing = [seed for seed in seeds if seed not in known]
+        tasks.extend((model_id, missing[i:i + chunk_size]) for i in range(0, len(missing), chunk_size))
+
+    played = sum(len(chunk) for _, chunk in tasks)
+    remaining = {}
+    for model_id, _ in tasks:
+        remaining[model_id] = remaining.get(model_id, 0) + 1
+
+    def collect(model_id: str, episodes: List[Dict]):
+        results[model_id].update((episode["seed"], episode) for episode in episodes)
+        remaining[model_id] -= 1
+        if remaining[model_id] == 0:
+            cache.save(model_id, catalog[model_id]["created_at"], results[model_id])
+
+    def model_env(model_id: str) -> Dict:
+        return dict(env_config, state_encoding=catalog[model_id]["env"].get("state_encoding", "zones"))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(models_dir, max_loaded)
+        for model_id, chunk in tasks:
+            collect(model_id, _run_model_chunk(model_id, model_env(model_id), chunk, max_steps))
+    elif tasks:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=process_pool_context(),
+            initializer=_init_worker,
+            initargs=(models_dir, max_loaded)
+        ) as pool:
+            futures = {
+                pool.submit(_run_model_chunk, model_id, model_env(model_id), chunk, max_steps): model_id
+                for model_id, chunk in tasks
+            }
+            # Chaque modèle est écrit dans le cache dès que ses lots sont terminés
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+
+    leaderboard = []
+    for model_id in model_ids:
+        episodes = [results[model_id][seed] for seed in seeds]
+        metadata = catalog[model_id]
+        leaderboard.append({
+            "model_id": model_id,
+            "agent_type": metadata.get("agent_type", "qlearning"),
+            "created_at": metadata["created_at"],
+            **summarize_episodes(episodes, num_resamples)
+        })
+    # Classement : succès, puis pièces, puis moins de vies perdues
+    leaderboard.sort(key=lambda row: (-row["success"]["mean"], -row["coins"]["mean"], row["lives_lost"]["mean"]))
+    for rank, row in enumerate(leaderboard, start=1):
+        row["rank"] = rank
+
+    report = {
+        "suite": {
+            "key": key,
+            "env_config": env_config,
+            "max_steps": max_steps,
+            "num_episodes": len(seeds),
+            "first_seed": seeds[0] if seeds else None
+        },
+        "leaderboard": leaderboard,
+        "episodes_played": played,
+        "episodes_cached": len(seeds) * len(model_ids) - played,
+        "evaluation_time": time.time() - start_time
+    }
+
+    if verbose:
+        print(f"\n{'='*72}")
+        print(f"Arène : {len(model_ids)} modèles x {len(seeds)} graines "
+              f"({played} épisodes joués, {report['episodes_cached']} en cache, "
+              f"{report['evaluation_time']:.2f}s)")
+        for row in leaderboard:
+            success, coins = row["success"], row["coins"]
+            print(f"{row['rank']:>3}. {row['model_id']:>14} | Succès: {success['mean']:5.1f}% "
+                  f"[{success['ci_low']:.1f}, {success['ci_high']:.1f}] | "
+                  f"Pièces: {coins['mean']:.1f} | Pas: {row['steps']['mean']:.0f} | "
+                  f"Vies perdues: {row['lives_lost']['mean']:.2f}")
+        print(f"{'='*72}\n")
+
+    return report
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Classement des modèles Mini-Pacman")
+    parser.add_argument("--models-dir", default=os.environ.get("PACMAN_MODELS_DIR", "saved_models"))
+    parser.add_argument("--model", action="append", dest="models", help="modèle à classer (répétable ; défaut: tous)")
+    parser.add_argument("--env", action="append", default=[], metavar="CLÉ=VALEUR",
+                        help=f"paramètre de l'environnement ({', '.join(ENV_KEYS)} ; défaut: dernier modèle)")
+    parser.add_argument("--episodes", type=int, default=500, help="nombre de graines de la suite")
+    parser.add_argument("--base-seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=300)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--max-loaded", type=int, default=2, help="agents gardés en mémoire par processus")
+    parser.add_argument("--json", help="fichier où écrire le rapport complet")
+    args = parser.parse_args(argv)
+
+    env_config = None
+    if args.env:
+        registry = ModelRegistry(args.models_dir)
+        latest = registry.get_metadata("latest")
+        env_config = dict(latest["env"]) if latest else {}
+        for item in args.env:
+            name, _, value = item.partition("=")
+            try:
+                env_config[name] = json.loads(value)
+            except ValueError:
+                env_config[name] = value
+
+    report = run_arena(
+        args.models_dir,
+        model_ids=args.models,
+        env_config=env_config,
+        seeds=make_seed_suite(args.episodes, args.base_seed),
+        max_steps=args.max_steps,
+        workers=args.workers,
+        max_loaded=args.max_loaded
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Rapport écrit dans {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
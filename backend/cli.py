@@ -0,0 +1,182 @@
+"""
+Entraînement en ligne de commande (sans Flask ni matplotlib)
+Lit une configuration YAML/JSON, entraîne un agent par graine et écrit les
+métriques de chaque épisode au fil de l'eau (JSONL ou CSV)
+
+Exemple :
+    python cli.py run.yaml --set schedule.num_episodes=200 --seeds 0,1,2
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from typing import Dict, List
+
+from training import train_agent, evaluate_agent
+from early_stopping import EarlyStopping
+from run_config import (load_run_config, apply_overrides, normalize_run_config,
+                        build_env, build_agent, env_config)
+
+
+# Colonnes des métriques par épisode (voir progress_callback de train_agent)
+EPISODE_FIELDS = ["episode", "num_episodes", "reward", "coins", "steps", "success",
+                  "epsilon", "elapsed", "steps_per_sec"]
+
+
+class EpisodeWriter:
+    """Écrit une ligne par épisode et vide le tampon aussitôt (suivi avec tail -f)."""
+
+    def __init__(self, path: str, fmt: str = "jsonl"):
+        """
+        Args:
+            path: Fichier de sortie
+            fmt: "jsonl" ou "csv"
+        """
+        self.file = open(path, "w", newline="")
+        self.csv_writer = None
+        if fmt == "csv":
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=EPISODE_FIELDS, extrasaction="ignore")
+            self.csv_writer.writeheader()
+
+    def __call__(self, metrics: Dict):
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(metrics)
+        else:
+            self.file.write(json.dumps(metrics) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_seed(config: Dict, seed, run_dir: str, quiet: bool = False) -> Dict:
+    """
+    Entraîne puis évalue un agent pour une graine.
+
+    Args:
+        config: Configuration normalisée (voir normalize_run_config)
+        seed: Graine (None = non déterministe)
+        run_dir: Dossier de sortie de cette graine
+        quiet: Ne pas afficher la progression
+
+    Returns:
+        Résumé (entraînement et évaluation)
+    """
+    os.makedirs(run_dir, exist_ok=True)
+    schedule = config["schedule"]
+    output = config["output"]
+
+    if seed is not None:
+        random.seed(seed)
+    env = build_env(config["env"], seed=seed)
+    agent = build_agent(config["agent"], env.ACTIONS, seed=seed)
+
+    early_stopping = None
+    if schedule["early_stopping"]:
+        early_stopping = EarlyStopping(**schedule["early_stopping"])
+
+    transition_log = None
+    if output["transitions"]:
+        from transition_log import TransitionLog  # NumPy, seulement si le journal est demandé
+        transition_log = TransitionLog(os.path.join(run_dir, "transitions"), env.ACTIONS)
+
+    episodes_path = os.path.join(run_dir, f"episodes.{output['format']}")
+    writer = EpisodeWriter(episodes_path, output["format"])
+    log_interval = max(1, schedule["num_episodes"] // 10)
+
+    def progress(metrics: Dict):
+        writer(metrics)
+        if not quiet and metrics["episode"] % log_interval == 0:
+            print(f"[graine {seed}] épisode {metrics['episode']}/{metrics['num_episodes']} | "
+                  f"récompense {metrics['reward']:.1f} | ε {metrics['epsilon']:.3f} | "
+                  f"{metrics['steps_per_sec']:.0f} pas/s", file=sys.stderr, flush=True)
+
+    try:
+        stats = train_agent(
+            env=env,
+            agent=agent,
+            num_episodes=schedule["num_episodes"],
+            max_steps=schedule["max_steps"],
+            verbose=False,
+            early_stopping=early_stopping,
+            progress_callback=progress,
+            transition_log=transition_log
+        )
+        evaluation = None
+        if schedule["eval_episodes"] > 0:
+            evaluation = evaluate_agent(env, agent, num_episodes=schedule["eval_episodes"],
+                                        max_steps=schedule["max_steps"], verbose=False,
+                                        transition_log=transition_log)
+    finally:
+        writer.close()
+        if transition_log is not None:
+            transition_log.close()
+
+    summary = {
+        "name": config["name"],
+        "seed": seed,
+        "env": env_config(env),
+        "agent": config["agent"],
+        "episodes_file": episodes_path,
+        "transitions_dir": transition_log and transition_log.path,
+        "training": {key: value for key, value in stats.items() if not key.endswith("_per_episode")},
+        "evaluation": evaluation and {key: value for key, value in evaluation.items()
+                                      if not key.endswith("_per_episode")},
+    }
+    if output["save_agent"]:
+        summary["agent_file"] = os.path.join(run_dir, "agent.json")
+        agent.save(summary["agent_file"])
+
+    with open(os.path.join(run_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv: List[str] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Entraînement Mini-Pacman sans interface")
+    parser.add_argument("config", help="configuration d'exécution (.yaml, .yml ou .json)")
+    parser.add_argument("--set", action="append", default=[], metavar="CLÉ=VALEUR",
+                        help="modifier une valeur (ex: schedule.num_episodes=200 ; répétable)")
+    parser.add_argument("--seeds", help="graines séparées par des virgules (remplace seeds)")
+    parser.add_argument("--output-dir", help="dossier de sortie (remplace output.dir)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="format des métriques par épisode")
+    parser.add_argument("--quiet", action="store_true", help="ne pas afficher la progression")
+    args = parser.parse_args(argv)
+
+    overrides = list(args.set)
+    if args.seeds is not None:
+        overrides.append(f"seeds=[{args.seeds}]")
+    if args.output_dir is not None:
+        overrides.append(f"output.dir={json.dumps(args.output_dir)}")
+    if args.format is not None:
+        overrides.append(f"output.format={args.format}")
+
+    try:
+        config = normalize_run_config(apply_overrides(load_run_config(args.config), overrides))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    summaries = []
+    for seed in config["seeds"]:
+        run_dir = os.path.join(config["output"]["dir"], config["name"],
+                               f"seed_{seed}" if seed is not None else "unseeded")
+        summary = run_seed(config, seed, run_dir, quiet=args.quiet)
+        # Une ligne JSON par graine sur la sortie standard (enchaînable avec jq)
+        print(json.dumps({
+            "seed": seed,
+            "num_episodes": summary["training"]["num_episodes"],
+            "training_time": summary["training"]["training_time"],
+            "train_success_rate": summary["training"]["success_rate"],
+            "eval_success_rate": summary["evaluation"] and summary["evaluation"]["success_rate"],
+            "eval_avg_reward": summary["evaluation"] and summary["evaluation"]["avg_reward"],
+            "run_dir": run_dir,
+        }), flush=True)
+        summaries.append(summary)
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
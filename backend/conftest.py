@@ -0,0 +1,47 @@
+"""
+Configuration pytest du backend
+Les modules sont importés à plat (from environment import ...), comme depuis le dossier backend
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from environment import MiniPacmanEnv
+from agent import QLearningAgent
+
+
+@pytest.fixture(autouse=True)
+def seeded_random():
+    """Module random réinitialisé avant chaque test (exploration, ex æquo)."""
+    random.seed(0)
+
+
+@pytest.fixture
+def small_env():
+    """Petit environnement déterministe (6x6, un fantôme)."""
+    return MiniPacmanEnv(grid_size=6, num_ghosts=1, coins_per_row=3, seed=1)
+
+
+@pytest.fixture
+def trained_agent(small_env):
+    """Agent Q-Learning entraîné quelques épisodes sur small_env."""
+    from training import train_agent
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS, epsilon=1.0)
+    train_agent(small_env, agent, num_episodes=20, max_steps=100, verbose=False)
+    return agent
+
+
+@pytest.fixture
+def registry(tmp_path, small_env, trained_agent):
+    """Registre temporaire contenant un modèle entraîné ("m1")."""
+    from model_registry import ModelRegistry
+    from run_config import env_config
+    registry = ModelRegistry(str(tmp_path / "models"))
+    stats = {"num_episodes": 20, "rewards_per_episode": [0.0] * 20}
+    registry.register("m1", trained_agent, {"num_episodes": 20}, stats, env_config(small_env))
+    return registry
@@ -0,0 +1,261 @@
+"""
+Entraînement par curriculum pour Mini-Pacman
+Configurations de difficulté croissante, Q-table conservée d'une étape à l'autre
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List
+
+from environment import MiniPacmanEnv
+from agent import QLearningAgent
+from training import train_agent
+from evaluation import evaluate_suite, make_seed_suite
+
+
+# Étapes par défaut : l'état de get_state_for_agent (zones 4x4, directions,
+# progression) ne dépend pas de la taille de la grille, la Q-table se transfère
+DEFAULT_STAGES = [
+    {
+        "name": "facile",
+        "env": {"grid_size": 6, "num_ghosts": 1, "ghost_behavior": "random", "coins_per_row": 2},
+        "threshold": 50.0,
+        "max_episodes": 600
+    },
+    {
+        "name": "moyen",
+        "env": {"grid_size": 8, "num_ghosts": 2, "ghost_behavior": "random", "coins_per_row": 4},
+        "threshold": 30.0,
+        "max_episodes": 1000
+    },
+    {
+        "name": "difficile",
+        "env": {"grid_size": 10, "num_ghosts": 3, "ghost_behavior": "chase", "coins_per_row": 6},
+        "threshold": 20.0,
+        "max_episodes": 2000
+    },
+]
+
+
+def make_stages(target_env: Dict, max_episodes: int = 2000) -> List[Dict]:
+    """
+    Construit un curriculum dont la dernière étape est la configuration visée.
+
+    Les étapes par défaut strictement plus faciles (grille plus petite) sont
+    conservées, puis la configuration cible est ajoutée. `max_episodes` est le
+    budget total : l'étape cible en reçoit au moins la moitié, le reste est
+    réparti entre les étapes faciles au prorata de leur budget par défaut (une
+    étape qui ne recevrait aucun épisode est retirée). Les étapes faciles
+    reprennent l'encodage d'état de la cible.
+
+    Args:
+        target_env: Paramètres de MiniPacmanEnv de l'étape finale
+        max_episodes: Budget total d'épisodes du curriculum
+
+    Returns:
+        Liste d'étapes
+    """
+    target_size = target_env.get("grid_size", 10)
+    easy_stages = [stage for stage in DEFAULT_STAGES if stage["env"]["grid_size"] < target_size]
+    easy_budget = max_episodes // 2
+    default_total = sum(stage["max_episodes"] for stage in easy_stages)
+
+    stages = []
+    for stage in easy_stages:
+        budget = easy_budget * stage["max_episodes"] // default_total
+        if budget > 0:
+            env = dict(stage["env"])
+            if "state_encoding" in target_env:
+                env["state_encoding"] = target_env["state_encoding"]
+            stages.append(dict(stage, env=env, max_episodes=budget))
+    stages.append({
+        "name": "cible",
+        "env": dict(target_env),
+        "threshold": None,
+        "max_episodes": max_episodes - sum(stage["max_episodes"] for stage in stages)
+    })
+    return stages
+
+
+def _merge_stats(merged: Dict, stats: Dict):
+    """Concatène les séries par épisode d'un tour d'entraînement."""
+    for key in ["rewards_per_episode", "coins_per_episode", "steps_per_episode", "success_per_episode"]:
+        merged.setdefault(key, []).extend(stats[key])
+
+
+def run_curriculum(
+    agent: QLearningAgent,
+    stages: List[Dict] = None,
+    max_steps: int = 300,
+    episodes_per_round: int = 100,
+    eval_episodes: int = 100,
+    eval_seed: int = 100_000,
+    stage_epsilon: float = 0.3,
+    state_encoding: str = None,
+    seed: int = None,
+    verbose: bool = True,
+    cancel_event: threading.Event = None,
+    progress_callback: Callable[[Dict], None] = None
+) -> Dict:
+    """
+    Entraîne l'agent sur une suite d'environnements de difficulté croissante.
+
+    Sur chaque étape, l'agent est entraîné par tours de `episodes_per_round`
+    épisodes puis évalué sans exploration sur une suite de graines fixe. Il
+    passe à l'étape suivante dès que le taux de succès atteint le seuil de
+    l'étape (ou que son budget d'épisodes est épuisé). Une étape sans seuil
+    n'est pas évaluée (elle dure tout son budget). La Q-table est
+    conservée ; epsilon est remonté à `stage_epsilon` pour réexplorer.
+
+    Args:
+        agent: Agent à entraîner (sa Q-table est réutilisée d'une étape à l'autre)
+        stages: Étapes {"name", "env", "threshold" (% succès ou None), "max_episodes",
+            "max_steps" (optionnel)} ; None = DEFAULT_STAGES
+        max_steps: Nombre maximum de pas par épisode (par défaut)
+        episodes_per_round: Épisodes d'entraînement entre deux évaluations
+        eval_episodes: Nombre de graines d'évaluation par tour
+        eval_seed: Première graine de la suite d'évaluation
+        stage_epsilon: Epsilon minimal au début de chaque nouvelle étape
+        state_encoding: Encodage d'état imposé aux étapes qui n'en précisent
+            pas (ex: "features" pour l'agent linéaire ; None = "zones")
+        seed: Graine des environnements d'entraînement (étape i : seed + i)
+        verbose: Afficher la progression
+        cancel_event: Si fourni et activé, le curriculum s'arrête après le tour courant
+        progress_callback: Appelée après chaque épisode (numérotation globale,
+            voir train_agent) avec en plus le nom de l'étape
+
+    Returns:
+        Statistiques (séries concaténées comme train_agent + détail par étape)
+    """
+    stages = stages or DEFAULT_STAGES
+    total_budget = sum(stage["max_episodes"] for stage in stages)
+    merged = {}
+    stage_reports = []
+    start_time = time.time()
+
+    for index, stage in enumerate(stages):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        stage_env = dict(stage["env"])
+        if state_encoding is not None:
+            stage_env.setdefault("state_encoding", state_encoding)
+        env = MiniPacmanEnv(**stage_env, seed=None if seed is None else seed + index)
+        stage_steps = stage.get("max_steps", max_steps)
+        threshold = stage.get("threshold")
+        seeds = make_seed_suite(eval_episodes, eval_seed)
+
+        # Nouvelle étape : réexplorer et oublier l'historique de récompenses
+        # (l'échelle des récompenses change avec la taille de la grille)
+        if index > 0:
+            agent.epsilon = max(agent.epsilon, stage_epsilon)
+        agent.recent_rewards = []
+        agent.best_avg_reward = float('-inf')
+
+        episodes_done = 0
+        evaluations = []
+        promoted = False
+
+        while episodes_done < stage["max_episodes"]:
+            round_episodes = min(episodes_per_round, stage["max_episodes"] - episodes_done)
+            round_callback = None
+            if progress_callback is not None:
+                offset = len(merged.get("rewards_per_episode", []))
+                round_start = time.time() - start_time
+
+                def round_callback(progress, offset=offset, round_start=round_start, name=stage.get("name")):
+                    progress_callback(dict(
+                        progress,
+                        episode=offset + progress["episode"],
+                        num_episodes=total_budget,
+                        elapsed=round_start + progress["elapsed"],
+                        stage=name
+                    ))
+
+            stats = train_agent(env, agent, num_episodes=round_episodes,
+                                max_steps=stage_steps, verbose=False,
+                                cancel_event=cancel_event,
+                                progress_callback=round_callback)
+            _merge_stats(merged, stats)
+            episodes_done += stats["num_episodes"]
+            if stats["cancelled"]:
+                break
+            if threshold is None:
+                if verbose:
+                    print(f"[{stage['name']}] {episodes_done}/{stage['max_episodes']} épisodes | "
+                          f"ε: {agent.epsilon:.3f}")
+                continue
+
+            report = evaluate_suite(
+                agents={"agent": agent},
+                env_config=stage_env,
+                seeds=seeds,
+                max_steps=stage_steps,
+                workers=1,
+                baseline=None,
+                num_resamples=200,
+                verbose=False
+            )
+            success = report["agents"]["agent"]["success"]["mean"]
+            evaluations.append({"episodes": episodes_done, "success_rate": success})
+
+            if verbose:
+                print(f"[{stage['name']}] {episodes_done}/{stage['max_episodes']} épisodes | "
+                      f"Succès (éval): {success:.1f}% | ε: {agent.epsilon:.3f}")
+
+            if success >= threshold:
+                promoted = True
+                break
+
+        stage_reports.append({
+            "name": stage.get("name", f"étape {index + 1}"),
+            "env": stage_env,
+            "threshold": threshold,
+            "episodes": episodes_done,
+            "promoted": promoted,
+            "final_success_rate": evaluations[-1]["success_rate"] if evaluations else None,
+            "evaluations": evaluations
+        })
+
+    rewards = merged.get("rewards_per_episode", [])
+    total_episodes = len(rewards)
+
+    def mean(values):
+        return sum(values) / len(values) if values else 0.0
+
+    final_stats = {
+        "num_episodes": total_episodes,
+        "max_steps": max_steps,
+        "training_time": time.time() - start_time,
+        **merged,
+        "avg_reward": mean(rewards),
+        "avg_coins": mean(merged.get("coins_per_episode", [])),
+        "avg_steps": mean(merged.get("steps_per_episode", [])),
+        "success_rate": mean(merged.get("success_per_episode", [])) * 100,
+        "final_epsilon": agent.epsilon,
+        "q_table_size": len(agent.Q),
+        "cancelled": cancel_event is not None and cancel_event.is_set(),
+        "curriculum": stage_reports
+    }
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"Curriculum terminé : {total_episodes} épisodes en {final_stats['training_time']:.1f}s")
+        for report in stage_reports:
+            success = report["final_success_rate"]
+            print(f"{report['name']:>10} | {report['episodes']:>5} épisodes | "
+                  f"Succès final: {'-' if success is None else f'{success:.1f}%'}")
+        print(f"{'='*60}\n")
+
+    return final_stats
+
+
+if __name__ == "__main__":
+    agent = QLearningAgent(
+        actions=MiniPacmanEnv.ACTIONS,
+        alpha=0.5,
+        gamma=0.95,
+        epsilon=1.0,
+        epsilon_min=0.05,
+        epsilon_decay=0.995
+    )
+    run_curriculum(agent, max_steps=300)
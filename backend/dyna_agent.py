@@ -0,0 +1,282 @@
+"""
+Agent Dyna-Q pour Mini-Pacman
+Q-Learning + modèle tabulaire appris + mises à jour de planification simulées
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from agent import QLearningAgent
+
+
+class DynaQAgent(QLearningAgent):
+    """
+    Variante Dyna-Q de QLearningAgent.
+
+    Chaque transition réelle (s, a, r, s', done) alimente un modèle appris
+    stocké dans des tableaux NumPy : une ligne par issue distincte
+    (id(s), a) -> (id(s'), done) avec son compteur et sa somme de récompenses.
+    Après chaque pas réel, `planning_steps` transitions simulées sont tirées
+    du modèle et appliquées en un seul lot vectorisé.
+
+    La Q-table principale est un tableau (états x actions) ; self.Q reste un
+    dictionnaire {(state, action): valeur} tenu à jour en écriture, pour la
+    compatibilité avec save(), get_Q() et le reste du code.
+    """
+
+    AGENT_TYPE = "dyna_q"
+
+    def __init__(
+        self,
+        actions: List[str],
+        alpha: float = 0.1,
+        gamma: float = 0.9,
+        epsilon: float = 0.3,
+        epsilon_min: float = 0.01,
+        epsilon_decay: float = 0.995,
+        planning_steps: int = 10,
+        planning_alpha: float = None,
+        initial_capacity: int = 1024,
+        seed: int = None
+    ):
+        """
+        Initialise l'agent Dyna-Q.
+
+        Args:
+            actions: Liste des actions possibles
+            alpha: Taux d'apprentissage (learning rate) [0, 1]
+            gamma: Facteur de discount (importance du futur) [0, 1]
+            epsilon: Probabilité d'exploration initiale [0, 1]
+            epsilon_min: Valeur minimale d'epsilon
+            epsilon_decay: Facteur de décroissance d'epsilon par épisode
+            planning_steps: Nombre de mises à jour simulées par pas réel (k)
+            planning_alpha: Taux d'apprentissage de la planification (None = alpha courant)
+            initial_capacity: Capacité initiale des tableaux (agrandis au besoin)
+            seed: Graine de l'exploration, du replay et de la planification
+        """
+        self.planning_steps = planning_steps
+        self.planning_alpha = planning_alpha
+        self._action_index = {a: i for i, a in enumerate(actions)}
+        self._init_arrays(len(actions), initial_capacity)
+
+        super().__init__(actions, alpha, gamma, epsilon, epsilon_min, epsilon_decay, seed)
+
+        self.planning_updates = 0
+        # Générateur NumPy dérivé de celui de l'agent (même graine)
+        self._rng = np.random.default_rng(self.rng.getrandbits(32))
+
+    def _init_arrays(self, num_actions: int, capacity: int):
+        """Alloue la Q-table et le modèle (vides)."""
+        self.state_ids = {}
+        self.states = []
+        self.q_values = np.zeros((capacity, num_actions))
+        self._Q = {}
+
+        # Modèle appris : une ligne par issue (s, a) -> (s', done)
+        self.model_rows = {}
+        self.model_sa = np.zeros(capacity, dtype=np.int64)
+        self.model_next = np.zeros(capacity, dtype=np.int64)
+        self.model_done = np.zeros(capacity, dtype=bool)
+        self.model_count = np.zeros(capacity, dtype=np.int64)
+        self.model_reward_sum = np.zeros(capacity)
+        self.sa_count = np.zeros(capacity * num_actions, dtype=np.int64)
+        # (s, a) -> indice de la paire dans self.counters (planification)
+        self.counter_index = np.zeros(capacity * num_actions, dtype=np.int64)
+        self.model_size = 0
+
+    @property
+    def Q(self) -> Dict:
+        """Vue dictionnaire {(state, action): valeur} de la Q-table."""
+        return self._Q
+
+    @Q.setter
+    def Q(self, table: Dict):
+        """Remplace la Q-table (ex: restauration d'un checkpoint) et reconstruit les tableaux."""
+        self.q_values[:] = 0.0
+        self._Q = {}
+        for (state, action), value in table.items():
+            self._set_q(self._state_id(state), self._action_index[action], value)
+
+    def _state_id(self, state: Tuple) -> int:
+        """Retourne l'identifiant entier d'un état (en l'enregistrant si nouveau)."""
+        sid = self.state_ids.get(state)
+        if sid is None:
+            sid = len(self.states)
+            self.state_ids[state] = sid
+            self.states.append(state)
+            if sid >= len(self.q_values):
+                self._grow_states()
+        return sid
+
+    def _grow_states(self):
+        """Double la capacité en états de la Q-table et des compteurs (s, a)."""
+        num_actions = len(self.actions)
+        self.q_values = np.concatenate([self.q_values, np.zeros_like(self.q_values)])
+        self.sa_count = np.concatenate([self.sa_count, np.zeros(len(self.q_values) * num_actions - len(self.sa_count), dtype=np.int64)])
+        self.counter_index = np.concatenate([self.counter_index, np.zeros(len(self.sa_count) - len(self.counter_index), dtype=np.int64)])
+
+    def _grow_model(self):
+        """Double la capacité du modèle."""
+        self.model_sa = np.concatenate([self.model_sa, np.zeros_like(self.model_sa)])
+        self.model_next = np.concatenate([self.model_next, np.zeros_like(self.model_next)])
+        self.model_done = np.concatenate([self.model_done, np.zeros_like(self.model_done)])
+        self.model_count = np.concatenate([self.model_count, np.zeros_like(self.model_count)])
+        self.model_reward_sum = np.concatenate([self.model_reward_sum, np.zeros_like(self.model_reward_sum)])
+
+    def _set_q(self, sid: int, action_idx: int, value: float):
+        """Écrit Q(s, a) dans le tableau et dans la vue dictionnaire."""
+        self.q_values[sid, action_idx] = value
+        self._Q[(self.states[sid], self.actions[action_idx])] = float(value)
+
+    def record_transition(self, sid: int, action_idx: int, reward: float, next_sid: int, done: bool):
+        """
+        Met à jour le modèle appris avec une transition réelle.
+
+        Args:
+            sid: Identifiant de l'état de départ
+            action_idx: Indice de l'action
+            reward: Récompense reçue
+            next_sid: Identifiant de l'état d'arrivée
+            done: Si True, la transition termine l'épisode
+        """
+        sa = sid * len(self.actions) + action_idx
+        key = (sa, next_sid, done)
+        row = self.model_rows.get(key)
+        if row is None:
+            row = self.model_size
+            if row >= len(self.model_sa):
+                self._grow_model()
+            self.model_rows[key] = row
+            self.model_sa[row] = sa
+            self.model_next[row] = next_sid
+            self.model_done[row] = done
+            self.model_size += 1
+        self.model_count[row] += 1
+        self.model_reward_sum[row] += reward
+        self.sa_count[sa] += 1
+
+    def plan(self, num_updates: int = None):
+        """
+        Effectue un lot de mises à jour simulées à partir du modèle.
+
+        Les issues sont tirées uniformément parmi les lignes du modèle ; le pas
+        est pondéré par la probabilité empirique p(s', r | s, a) de l'issue, ce
+        qui donne en espérance la mise à jour complète sur la distribution
+        apprise sans avoir à la parcourir.
+
+        Args:
+            num_updates: Taille du lot (None = planning_steps)
+        """
+        num_updates = self.planning_steps if num_updates is None else num_updates
+        if num_updates <= 0 or self.model_size == 0:
+            return
+
+        num_actions = len(self.actions)
+        # Lignes distinctes : une ligne tirée deux fois dans le lot recevrait deux
+        # pas calculés sur la même valeur (pas effectif > alpha, divergence)
+        rows = np.unique(self._rng.integers(0, self.model_size, size=num_updates))
+        sa = self.model_sa[rows]
+        sids, action_idx = np.divmod(sa, num_actions)
+
+        counts = self.model_count[rows]
+        mean_reward = self.model_reward_sum[rows] / counts
+        future_q = np.where(
+            self.model_done[rows],
+            0.0,
+            self.q_values[self.model_next[rows]].max(axis=1)
+        )
+        td_error = mean_reward + self.gamma * future_q - self.q_values[sids, action_idx]
+
+        alpha = self.alpha if self.planning_alpha is None else self.planning_alpha
+        probability = counts / self.sa_count[sa]
+        np.add.at(self.q_values, (sids, action_idx), alpha * probability * td_error)
+
+        # Répercuter les entrées modifiées dans la vue dictionnaire
+        for sid, a in set(zip(sids.tolist(), action_idx.tolist())):
+            self._Q[(self.states[sid], self.actions[a])] = float(self.q_values[sid, a])
+        self.counters.add_updates(self.counter_index[sa].tolist())
+
+        self.planning_updates += len(rows)
+
+    def update(self, state: Tuple, action: str, reward: float, next_state: Tuple, done: bool):
+        """
+        Mise à jour Q-Learning réelle, enregistrement dans le modèle puis planification.
+
+        Args:
+            state: État avant l'action
+            action: Action effectuée
+            reward: Récompense reçue
+            next_state: État après l'action
+            done: Si True, l'épisode est terminé
+        """
+        self.store_experience(state, action, reward, next_state, done)
+
+        sid = self._state_id(state)
+        next_sid = self._state_id(next_state)
+        a = self._action_index[action]
+
+        future_q = 0.0 if done else self.q_values[next_sid].max()
+        old_q = self.q_values[sid, a]
+        td_error = reward + self.gamma * future_q - old_q
+        self._set_q(sid, a, old_q + self.alpha * td_error)
+        self.counter_index[sid * len(self.actions) + a] = self.counters.record_visit(state, action, td_error)
+
+        self.record_transition(sid, a, reward, next_sid, done)
+        self.plan()
+
+    def replay_experience(self, batch_size: int = 32):
+        """
+        Rejoue des expériences du buffer (même priorisation que QLearningAgent).
+
+        Args:
+            batch_size: Nombre d'expériences à rejouer
+
+        Returns:
+            Nombre de mises à jour effectuées (0 si le buffer est trop petit)
+        """
+        if len(self.experience_buffer) < batch_size:
+            return 0
+
+        weights = [abs(exp[2]) + 0.1 for exp in self.experience_buffer]
+        batch = self.rng.choices(self.experience_buffer, weights=weights, k=batch_size)
+        replay_alpha = max(self.alpha * 0.7, 0.02)
+
+        for state, action, reward, next_state, done in batch:
+            sid = self._state_id(state)
+            a = self._action_index[action]
+            future_q = 0.0 if done else self.q_values[self._state_id(next_state)].max()
+            old_q = self.q_values[sid, a]
+            td_error = reward + self.gamma * future_q - old_q
+            self._set_q(sid, a, old_q + replay_alpha * td_error)
+            self.counters.record_update(state, action, td_error)
+        return batch_size
+
+    def load(self, filepath: str):
+        """
+        Charge la Q-table et les paramètres depuis un fichier.
+        Le modèle appris n'est pas sauvegardé : il se reconstruit à l'entraînement.
+
+        Args:
+            filepath: Chemin du fichier JSON de sauvegarde
+        """
+        super().load(filepath)
+        self._action_index = {a: i for i, a in enumerate(self.actions)}
+        # super().load remplit directement le dictionnaire : reconstruire les tableaux
+        self.Q = dict(self._Q)
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne des statistiques sur l'agent (dont le modèle appris).
+
+        Returns:
+            Dictionnaire de statistiques
+        """
+        stats = super().get_stats()
+        stats.update({
+            "num_states": len(self.states),
+            "model_size": self.model_size,
+            "planning_steps": self.planning_steps,
+            "planning_updates": self.planning_updates
+        })
+        return stats
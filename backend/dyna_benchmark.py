@@ -0,0 +1,153 @@
+"""
+Comparaison Q-Learning / Dyna-Q à budget d'épisodes réels égal
+Même environnement, mêmes graines d'entraînement, évaluation gloutonne sur une
+suite de graines fixe après chaque palier d'épisodes ; temps d'entraînement mesuré
+
+Exemple :
+    python dyna_benchmark.py --grid-size 8 --num-ghosts 2 --planning-steps 5,10,30 \\
+        --checkpoints 10,25,100,300 --seeds 8 --json dyna.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from run_config import build_agent, build_env
+from training import train_agent
+from evaluation import evaluate_suite, make_seed_suite
+
+
+def run_variant(params: Dict, env_params: Dict, checkpoints: List[int], seed: int,
+                eval_seeds: List[int], max_steps: int = 300) -> List[Dict]:
+    """
+    Entraîne un agent jusqu'à chaque palier et l'évalue sans exploration.
+
+    Args:
+        params: Configuration de l'agent (voir run_config.build_agent)
+        env_params: Paramètres de l'environnement
+        checkpoints: Nombres cumulés d'épisodes réels (croissants)
+        seed: Graine de l'entraînement (environnement et module random)
+        eval_seeds: Suite de graines d'évaluation
+        max_steps: Nombre maximum de pas par épisode
+
+    Returns:
+        Un point par palier : épisodes, pièces et succès (évaluation), temps
+        d'entraînement cumulé (s) et mises à jour de planification
+    """
+    random.seed(seed)
+    env = build_env({**env_params, **params}, seed=seed)
+    agent = build_agent(params, env.ACTIONS)
+    points = []
+    episodes = 0
+    training_time = 0.0
+    for checkpoint in checkpoints:
+        start = time.perf_counter()
+        train_agent(env, agent, num_episodes=checkpoint - episodes, max_steps=max_steps, verbose=False)
+        training_time += time.perf_counter() - start
+        episodes = checkpoint
+
+        report = evaluate_suite(
+            agents={"agent": agent},
+            env_config=env_params,
+            seeds=eval_seeds,
+            max_steps=max_steps,
+            workers=1,
+            baseline=None,
+            num_resamples=200,
+            verbose=False
+        )
+        summary = report["agents"]["agent"]
+        points.append({
+            "episodes": checkpoint,
+            "coins": summary["coins"]["mean"],
+            "success": summary["success"]["mean"],
+            "training_time": training_time,
+            "planning_updates": getattr(agent, "planning_updates", 0)
+        })
+    return points
+
+
+def compare(env_params: Dict, planning_steps: List[int], checkpoints: List[int], num_seeds: int = 8,
+            eval_episodes: int = 100, max_steps: int = 300) -> List[Dict]:
+    """
+    Compare Q-Learning et Dyna-Q (un variant par nombre de pas de planification).
+
+    Args:
+        env_params: Paramètres de l'environnement
+        planning_steps: Pas de planification des variantes Dyna-Q
+        checkpoints: Paliers d'épisodes réels
+        num_seeds: Nombre de graines d'entraînement (graines 0..num_seeds-1)
+        eval_episodes: Taille de la suite d'évaluation
+        max_steps: Nombre maximum de pas par épisode
+
+    Returns:
+        Un résultat par variante : nom, paramètres, moyennes par palier
+    """
+    variants = [("qlearning", {"agent_type": "qlearning"})]
+    variants += [(f"dyna_q k={k}", {"agent_type": "dyna_q", "planning_steps": k}) for k in planning_steps]
+    eval_seeds = make_seed_suite(eval_episodes, 100_000)
+
+    results = []
+    for name, params in variants:
+        runs = [run_variant(params, env_params, checkpoints, seed, eval_seeds, max_steps)
+                for seed in range(num_seeds)]
+        points = []
+        for i, checkpoint in enumerate(checkpoints):
+            coins = [run[i]["coins"] for run in runs]
+            points.append({
+                "episodes": checkpoint,
+                "coins": statistics.mean(coins),
+                "coins_std": statistics.pstdev(coins),
+                "success": statistics.mean(run[i]["success"] for run in runs),
+                "training_time": statistics.mean(run[i]["training_time"] for run in runs),
+                "planning_updates": statistics.mean(run[i]["planning_updates"] for run in runs)
+            })
+        results.append({"name": name, "params": params, "points": points})
+    return results
+
+
+def format_results(results: List[Dict]) -> str:
+    """Tableau texte : pièces (évaluation) et temps d'entraînement par palier."""
+    lines = []
+    for result in results:
+        cells = [f"{p['episodes']:>4} ép: {p['coins']:5.1f} ± {p['coins_std']:4.1f} pièces "
+                 f"{p['success']:5.1f}% ({p['training_time']:.1f}s)" for p in result["points"]]
+        lines.append(f"{result['name']:>14} | " + " | ".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Comparaison Q-Learning / Dyna-Q")
+    parser.add_argument("--grid-size", type=int, default=8)
+    parser.add_argument("--num-ghosts", type=int, default=2)
+    parser.add_argument("--ghost-behavior", default="random")
+    parser.add_argument("--planning-steps", default="5,10,30", help="variantes Dyna-Q (ex: 5,10,30)")
+    parser.add_argument("--checkpoints", default="10,25,100,300", help="paliers d'épisodes réels")
+    parser.add_argument("--seeds", type=int, default=8, help="graines d'entraînement")
+    parser.add_argument("--eval-episodes", type=int, default=100)
+    parser.add_argument("--max-steps", type=int, default=300)
+    parser.add_argument("--json", help="fichier où écrire les résultats")
+    args = parser.parse_args(argv)
+
+    env_params = {"grid_size": args.grid_size, "num_ghosts": args.num_ghosts,
+                  "ghost_behavior": args.ghost_behavior}
+    results = compare(
+        env_params,
+        planning_steps=[int(k) for k in args.planning_steps.split(",")],
+        checkpoints=[int(c) for c in args.checkpoints.split(",")],
+        num_seeds=args.seeds,
+        eval_episodes=args.eval_episodes,
+        max_steps=args.max_steps
+    )
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"env": env_params, "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
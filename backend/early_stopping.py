@@ -0,0 +1,209 @@
+"""
+Arrêt anticipé (early stopping) pour l'entraînement Mini-Pacman
+Évaluations gloutonnes périodiques + tests statistiques de plateau/convergence
+"""
+
+import math
+import statistics
+from typing import Dict, List, Optional
+
+
+def welch_t_test(sample_a: List[float], sample_b: List[float]) -> Dict:
+    """
+    Test t de Welch unilatéral : la moyenne de A est-elle supérieure à celle de B ?
+
+    La p-value est calculée avec l'approximation normale de la loi de Student,
+    suffisante pour des lots d'évaluation de 20 épisodes ou plus.
+
+    Args:
+        sample_a: Échantillon candidat (ex: dernière évaluation)
+        sample_b: Échantillon de référence (ex: meilleure évaluation)
+
+    Returns:
+        Dictionnaire {"t": statistique, "p_value": p-value unilatérale}
+    """
+    n_a, n_b = len(sample_a), len(sample_b)
+    if n_a < 2 or n_b < 2:
+        return {"t": 0.0, "p_value": 1.0}
+
+    mean_a, mean_b = statistics.fmean(sample_a), statistics.fmean(sample_b)
+    var_a, var_b = statistics.variance(sample_a), statistics.variance(sample_b)
+    std_err = math.sqrt(var_a / n_a + var_b / n_b)
+
+    if std_err == 0:
+        # Échantillons constants : la différence est certaine (ou nulle)
+        if mean_a > mean_b:
+            return {"t": float('inf'), "p_value": 0.0}
+        return {"t": 0.0, "p_value": 1.0}
+
+    t = (mean_a - mean_b) / std_err
+    p_value = 0.5 * math.erfc(t / math.sqrt(2))
+    return {"t": t, "p_value": p_value}
+
+
+class EarlyStopping:
+    """
+    Contrôleur d'arrêt anticipé pour train_agent.
+
+    Toutes les `eval_interval` épisodes, l'agent est évalué sans exploration
+    sur un petit lot d'épisodes. Le contrôleur :
+    - garde la meilleure politique (copie de la Q-table, éventuellement sauvegardée)
+    - considère qu'il y a amélioration si le test de Welch est significatif
+      ou si le gain dépasse `min_delta`
+    - arrête après `patience` évaluations sans amélioration (plateau)
+    - arrête dès que `target` est atteint (convergence)
+    """
+
+    METRICS = {
+        "reward": "rewards_per_episode",
+        "success_rate": "success_per_episode",
+    }
+
+    def __init__(
+        self,
+        eval_interval: int = 100,
+        eval_episodes: int = 20,
+        patience: int = 5,
+        min_episodes: int = 200,
+        metric: str = "success_rate",
+        min_delta: float = 0.0,
+        significance: float = 0.05,
+        target: Optional[float] = None,
+        restore_best: bool = True,
+        checkpoint_path: Optional[str] = None
+    ):
+        """
+        Initialise le contrôleur.
+
+        Args:
+            eval_interval: Nombre d'épisodes d'entraînement entre deux évaluations
+            eval_episodes: Nombre d'épisodes gloutons par évaluation
+            patience: Évaluations sans amélioration avant l'arrêt
+            min_episodes: Nombre minimum d'épisodes avant de pouvoir s'arrêter
+            metric: "success_rate" (en %) ou "reward"
+            min_delta: Gain minimal de la moyenne considéré comme une amélioration
+            significance: Seuil de p-value du test de Welch
+            target: Score cible provoquant l'arrêt (None = désactivé)
+            restore_best: Restaurer la meilleure Q-table à la fin de l'entraînement
+            checkpoint_path: Fichier JSON où sauvegarder la meilleure politique
+        """
+        if metric not in self.METRICS:
+            raise ValueError(f"Métrique inconnue: {metric}")
+
+        self.eval_interval = max(1, eval_interval)
+        self.eval_episodes = max(2, eval_episodes)
+        self.patience = max(1, patience)
+        self.min_episodes = min_episodes
+        self.metric = metric
+        self.min_delta = min_delta
+        self.significance = significance
+        self.target = target
+        self.restore_best = restore_best
+        self.checkpoint_path = checkpoint_path
+
+        self.reset()
+
+    def reset(self):
+        """Réinitialise l'état du contrôleur (nouvel entraînement)."""
+        self.best_score = float('-inf')
+        self.best_samples = []
+        self.best_episode = 0
+        self.best_Q = None
+        self.wait = 0
+        self.stop_reason = None
+        self.stopped_episode = None
+        self.history = []
+
+    def should_evaluate(self, episode: int) -> bool:
+        """Indique si une évaluation doit être lancée après cet épisode."""
+        return episode % self.eval_interval == 0
+
+    def _samples(self, eval_stats: Dict) -> List[float]:
+        """Extrait les valeurs par épisode de la métrique suivie."""
+        samples = [float(v) for v in eval_stats[self.METRICS[self.metric]]]
+        if self.metric == "success_rate":
+            samples = [v * 100 for v in samples]
+        return samples
+
+    def update(self, episode: int, eval_stats: Dict, agent) -> bool:
+        """
+        Prend en compte une évaluation et décide de l'arrêt.
+
+        Args:
+            episode: Numéro de l'épisode d'entraînement courant
+            eval_stats: Résultat de evaluate_agent (avec les listes par épisode)
+            agent: Agent en cours d'entraînement (pour le checkpoint)
+
+        Returns:
+            True si l'entraînement doit s'arrêter
+        """
+        samples = self._samples(eval_stats)
+        score = statistics.fmean(samples)
+
+        if self.best_Q is None:
+            improved = True
+            p_value = 0.0
+        else:
+            p_value = welch_t_test(samples, self.best_samples)["p_value"]
+            improved = (
+                p_value < self.significance
+                or (self.min_delta > 0 and score > self.best_score + self.min_delta)
+            )
+
+        if improved:
+            self.best_score = score
+            self.best_samples = samples
+            self.best_episode = episode
+            self.best_Q = dict(agent.Q)
+            self.wait = 0
+            if self.checkpoint_path:
+                agent.save(self.checkpoint_path)
+        else:
+            self.wait += 1
+
+        self.history.append({
+            "episode": episode,
+            "score": score,
+            "p_value": p_value,
+            "improved": improved
+        })
+
+        if episode < self.min_episodes:
+            return False
+
+        if self.target is not None and score >= self.target:
+            self.stop_reason = "converged"
+        elif self.wait >= self.patience:
+            self.stop_reason = "plateau"
+        else:
+            return False
+
+        self.stopped_episode = episode
+        return True
+
+    def finalize(self, agent):
+        """
+        Restaure la meilleure politique observée si demandé.
+
+        Args:
+            agent: Agent entraîné
+        """
+        if self.restore_best and self.best_Q is not None:
+            agent.Q = dict(self.best_Q)
+
+    def get_summary(self) -> Dict:
+        """
+        Retourne un résumé sérialisable du contrôleur.
+
+        Returns:
+            Dictionnaire de statistiques d'arrêt anticipé
+        """
+        return {
+            "metric": self.metric,
+            "stopped": self.stop_reason is not None,
+            "stop_reason": self.stop_reason,
+            "stopped_episode": self.stopped_episode,
+            "best_score": self.best_score if self.best_Q is not None else None,
+            "best_episode": self.best_episode,
+            "evaluations": self.history
+        }
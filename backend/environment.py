@@ -25,6 +25,7 @@ class MiniPacmanEnv:
     """
     
     ACTIONS = ["up", "down", "left", "right"]
+    STATE_ENCODINGS = ["zones", "features"]
     
     def __init__(
         self, 
@@ -34,6 +35,7 @@ class MiniPacmanEnv:
         coins_per_row: int = 10,
         num_lives: int = 3,
         enable_powerups: bool = True,
+        state_encoding: str = "zones",
         seed: int = None
     ):
         """
@@ -46,6 +48,9 @@ class MiniPacmanEnv:
             coins_per_row: Nombre de pièces par ligne (total = coins_per_row * grid_size)
             num_lives: Nombre de vies de Pacman (1-10)
             enable_powerups: Activer les power-ups (True/False)
+            state_encoding: État renvoyé par get_state_for_agent : "zones"
+                (abstraction tabulaire) ou "features" (avec position exacte et
+                écart au fantôme, pour l'approximation linéaire)
             seed: Graine pour reproductibilité
         """
         self.grid_size = grid_size
@@ -54,9 +59,14 @@ class MiniPacmanEnv:
         self.coins_per_row = coins_per_row
         self.num_lives = max(1, min(10, num_lives))  # Entre 1 et 10
         self.enable_powerups = enable_powerups
+        if state_encoding not in self.STATE_ENCODINGS:
+            raise ValueError(f"Encodage d'état inconnu: {state_encoding} (disponibles: {', '.join(self.STATE_ENCODINGS)})")
+        self.state_encoding = state_encoding
         
-        if seed is not None:
-            random.seed(seed)
+        # Générateur propre à l'environnement : créer ou jouer un environnement ne
+        # modifie pas le module random (boucle d'entraînement, autres threads).
+        # Sans graine, il est dérivé du module random (reproductible avec random.seed())
+        self.rng = random.Random(seed if seed is not None else random.getrandbits(64))
         
         # Initialisation des positions
         self.pacman_pos = None
@@ -116,13 +126,13 @@ class MiniPacmanEnv:
         mid_y = self.grid_size // 2
         
         # Mur vertical au milieu (avec ouvertures)
-        gap_y = random.randint(1, self.grid_size - 2)
+        gap_y = self.rng.randint(1, self.grid_size - 2)
         for y in range(1, self.grid_size - 1):
             if y != gap_y and y != gap_y + 1:  # Deux ouvertures pour plus de fluidité
                 self.walls.add((mid_x, y))
         
         # Mur horizontal au milieu (avec ouvertures)
-        gap_x = random.randint(1, self.grid_size - 2)
+        gap_x = self.rng.randint(1, self.grid_size - 2)
         for x in range(1, self.grid_size - 1):
             if x != gap_x and x != gap_x + 1:
                 self.walls.add((x, mid_y))
@@ -146,15 +156,15 @@ class MiniPacmanEnv:
             return
         
         # Ajouter quelques petits murs aléatoires
-        num_small_walls = random.randint(1, 2)
+        num_small_walls = self.rng.randint(1, 2)
         for _ in range(num_small_walls):
             # Mur de 2-3 cases (en fonction de l'espace disponible)
             max_length = min(3, width - 3, height - 3)
             if max_length < 2:
                 continue
             
-            length = random.randint(2, max_length)
-            orientation = random.choice(['horizontal', 'vertical'])
+            length = self.rng.randint(2, max_length)
+            orientation = self.rng.choice(['horizontal', 'vertical'])
             
             if orientation == 'horizontal':
                 # Vérifier qu'il y a assez d'espace
@@ -164,8 +174,8 @@ class MiniPacmanEnv:
                 min_y = y_start + 1
                 
                 if max_x >= min_x and max_y >= min_y:
-                    x = random.randint(min_x, max_x)
-                    y = random.randint(min_y, max_y)
+                    x = self.rng.randint(min_x, max_x)
+                    y = self.rng.randint(min_y, max_y)
                     for i in range(length):
                         self.walls.add((x + i, y))
             else:
@@ -176,8 +186,8 @@ class MiniPacmanEnv:
                 min_y = y_start + 1
                 
                 if max_x >= min_x and max_y >= min_y:
-                    x = random.randint(min_x, max_x)
-                    y = random.randint(min_y, max_y)
+                    x = self.rng.randint(min_x, max_x)
+                    y = self.rng.randint(min_y, max_y)
                     for i in range(length):
                         self.walls.add((x, y + i))
     
@@ -189,8 +199,8 @@ class MiniPacmanEnv:
         max_attempts = max_walls * 3
         
         while len(self.walls) < max_walls and attempts < max_attempts:
-            x = random.randint(1, self.grid_size - 2)
-            y = random.randint(1, self.grid_size - 2)
+            x = self.rng.randint(1, self.grid_size - 2)
+            y = self.rng.randint(1, self.grid_size - 2)
             pos = (x, y)
             
             # Ne pas mettre de mur sur les bords pour laisser de l'espace
@@ -222,7 +232,7 @@ class MiniPacmanEnv:
         
         while not self._has_path(start, end) and removals < max_removals and self.walls:
             # Enlever un mur aléatoire
-            wall_to_remove = random.choice(list(self.walls))
+            wall_to_remove = self.rng.choice(list(self.walls))
             self.walls.remove(wall_to_remove)
             removals += 1
     
@@ -272,8 +282,8 @@ class MiniPacmanEnv:
         for _ in range(self.num_ghosts):
             while True:
                 ghost_pos = (
-                    random.randint(0, self.grid_size - 1),
-                    random.randint(0, self.grid_size - 1)
+                    self.rng.randint(0, self.grid_size - 1),
+                    self.rng.randint(0, self.grid_size - 1)
                 )
                 # Éviter Pacman, autres fantômes et murs
                 if (ghost_pos != self.pacman_pos and 
@@ -304,7 +314,7 @@ class MiniPacmanEnv:
         ]
         
         # Réserver des emplacements pour les power-ups (2-3)
-        num_powerups_to_reserve = random.randint(2, 3) if self.enable_powerups else 0
+        num_powerups_to_reserve = self.rng.randint(2, 3) if self.enable_powerups else 0
         num_positions_for_powerups = min(num_powerups_to_reserve, len(available_positions))
         
         # Calculer le nombre de pièces en fonction de l'espace disponible APRÈS réservation
@@ -314,7 +324,7 @@ class MiniPacmanEnv:
         
         # Sélectionner aléatoirement les positions des pièces
         if total_coins > 0 and len(available_positions) > 0:
-            coin_positions = random.sample(available_positions, total_coins)
+            coin_positions = self.rng.sample(available_positions, total_coins)
             self.coins = set(coin_positions)
             
             # Retirer les positions des pièces pour les power-ups
@@ -329,7 +339,7 @@ class MiniPacmanEnv:
         self.powerups = set()
         
         if self.enable_powerups:
-            num_powerups = min(random.randint(2, 3), len(available_positions))
+            num_powerups = min(self.rng.randint(2, 3), len(available_positions))
             
             if num_powerups > 0 and len(available_positions) > 0:
                 # Placer les power-ups stratégiquement (loin de Pacman, dans des zones intéressantes)
@@ -543,7 +553,7 @@ class MiniPacmanEnv:
         Returns:
             Nouvelle position du fantôme
         """
-        action = random.choice(self.ACTIONS)
+        action = self.rng.choice(self.ACTIONS)
         new_pos, _, _ = self._move_position(ghost_pos, action)
         return new_pos
     
@@ -826,6 +836,13 @@ class MiniPacmanEnv:
         - Direction vers objectif (pièce/power-up)
         - Progression (% pièces collectées)
         
+        Avec state_encoding="features", l'état est suivi de la position exacte
+        de Pacman, de l'écart (dx, dy) au fantôme le plus proche et de la
+        taille de la grille : (..., px, py, ghost_dx, ghost_dy, grid_size).
+        Sans fantôme, l'écart vaut (grid_size, grid_size), impossible sur la
+        grille (distinct de (0, 0), fantôme sur la case de Pacman).
+        Les 7 premières valeurs restent celles de l'abstraction par zones.
+        
         Returns:
             Tuple représentant l'état simplifié
         """
@@ -863,18 +880,81 @@ class MiniPacmanEnv:
         
         # 6. Direction du fantôme le plus proche (pour évitement)
         ghost_direction = "none"
-        if self.ghosts_pos and not is_invincible:
+        dx = dy = self.grid_size
+        if self.ghosts_pos:
             closest_ghost = min(self.ghosts_pos, 
                                key=lambda g: abs(g[0] - px) + abs(g[1] - py))
             gx, gy = closest_ghost
             dx, dy = gx - px, gy - py
-            if abs(dx) > abs(dy):
-                ghost_direction = "right" if dx > 0 else "left"
-            else:
-                ghost_direction = "down" if dy > 0 else "up"
+            if not is_invincible:
+                if abs(dx) > abs(dy):
+                    ghost_direction = "right" if dx > 0 else "left"
+                else:
+                    ghost_direction = "down" if dy > 0 else "up"
         
         # ESPACE D'ÉTATS RÉDUIT : ~4*4*2*5*5*2 = 1600 états (vs ~100k avant)
-        return (zone_x, zone_y, danger_close, target_direction, progress_bucket, is_invincible, ghost_direction)
+        state = (zone_x, zone_y, danger_close, target_direction, progress_bucket, is_invincible, ghost_direction)
+        if self.state_encoding == "features":
+            return state + (px, py, dx, dy, self.grid_size)
+        return state
+
+    @classmethod
+    def encode_raw_state(cls, raw: Dict, grid_size: int = 10, state_encoding: str = "zones") -> Tuple:
+        """
+        Encode un état de jeu brut (ex: produit par un simulateur externe)
+        avec la même représentation que get_state_for_agent.
+
+        Args:
+            raw: {"pacman_pos", "ghosts_pos", "coins", "powerups" (optionnel),
+                "invincible_timer" (défaut 0), "coins_collected" (défaut 0),
+                "initial_coins_count" (défaut collectées + restantes),
+                "grid_size" (optionnel)}
+            grid_size: Taille de la grille si absente de `raw`
+            state_encoding: "zones" ou "features" (voir __init__)
+
+        Returns:
+            Tuple représentant l'état simplifié
+        """
+        # Instance minimale : seuls les attributs lus par get_state_for_agent
+        env = cls.__new__(cls)
+        env.grid_size = raw.get("grid_size", grid_size)
+        env.state_encoding = state_encoding
+        env.pacman_pos = tuple(raw["pacman_pos"])
+        env.ghosts_pos = [tuple(g) for g in raw.get("ghosts_pos", [])]
+        env.coins = {tuple(c) for c in raw.get("coins", [])}
+        env.powerups = {tuple(p) for p in raw.get("powerups", [])}
+        env.invincible_timer = raw.get("invincible_timer", 0)
+        env.coins_collected = raw.get("coins_collected", 0)
+        env.initial_coins_count = raw.get("initial_coins_count", env.coins_collected + len(env.coins))
+        return env.get_state_for_agent()
+
+    @classmethod
+    def state_space(cls, has_ghosts: bool = True) -> List[Tuple]:
+        """
+        Énumère les états que get_state_for_agent peut produire.
+
+        Contraintes : en mode invincible, pas de danger ni de direction de
+        fantôme ; sinon la direction du fantôme le plus proche est toujours
+        définie (s'il y a des fantômes).
+
+        Args:
+            has_ghosts: L'environnement contient des fantômes
+
+        Returns:
+            Liste des états (3600 avec fantômes)
+        """
+        directions = ["up", "down", "left", "right", "none"]
+        ghost_directions = ["up", "down", "left", "right"] if has_ghosts else ["none"]
+        states = []
+        for zone_x in range(4):
+            for zone_y in range(4):
+                for target in directions:
+                    for progress in range(5):
+                        for danger in ((0, 1) if has_ghosts else (0,)):
+                            for ghost in ghost_directions:
+                                states.append((zone_x, zone_y, danger, target, progress, 0, ghost))
+                        states.append((zone_x, zone_y, 0, target, progress, 1, "none"))
+        return states
 
 
 if __name__ == "__main__":
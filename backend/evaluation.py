@@ -0,0 +1,345 @@
+"""
+Évaluation reproductible et parallèle des agents Mini-Pacman
+Suite de graines fixe, pool de processus, intervalles de confiance bootstrap
+"""
+
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union
+
+import numpy as np
+
+from environment import MiniPacmanEnv
+from agent import QLearningAgent, RandomAgent
+from run_config import agent_class
+
+
+# Métriques collectées pour chaque épisode
+METRICS = ["reward", "coins", "steps", "success", "lives_lost"]
+
+# Agents chargés une seule fois par processus (initializer du pool)
+_worker_agents = {}
+
+
+def process_pool_context():
+    """
+    Contexte des pools de processus d'évaluation.
+
+    L'appelant peut être multithreadé (API Flask, tâches d'entraînement) : un
+    fork copierait des verrous tenus par d'autres threads. "forkserver" crée
+    les processus à partir d'un serveur monothread lancé par exec (module
+    principal importé une fois), "spawn" à défaut.
+
+    Returns:
+        Contexte multiprocessing
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def make_seed_suite(num_episodes: int, base_seed: int = 0) -> List[int]:
+    """
+    Génère une suite de graines fixe (un labyrinthe par graine).
+
+    Args:
+        num_episodes: Nombre d'épisodes (= nombre de graines)
+        base_seed: Première graine de la suite
+
+    Returns:
+        Liste de graines
+    """
+    return list(range(base_seed, base_seed + num_episodes))
+
+
+def load_agent(spec: Union[str, object]):
+    """
+    Construit un agent à partir d'une spécification.
+
+    Args:
+        spec: "random", chemin d'un modèle JSON sauvegardé (classe d'après son
+            "agent_type"), ou agent déjà construit
+
+    Returns:
+        Agent possédant une méthode choose_action(state, explore, rng)
+    """
+    if not isinstance(spec, str):
+        return spec
+    if spec == "random":
+        return RandomAgent(MiniPacmanEnv.ACTIONS)
+    with open(spec) as f:
+        agent_type = json.load(f).get("agent_type", "qlearning")
+    agent = agent_class(agent_type)(MiniPacmanEnv.ACTIONS)
+    agent.load(spec)
+    return agent
+
+
+def run_seeded_episode(agent, env_config: Dict, seed: int, max_steps: int) -> Dict:
+    """
+    Joue un épisode glouton sur le labyrinthe défini par la graine.
+
+    La graine fixe le labyrinthe, les positions initiales et toute la suite
+    aléatoire (fantômes, départage des actions) : deux agents évalués sur la
+    même graine partent exactement du même état. L'environnement et l'agent
+    tirent dans leurs propres générateurs : le module random (boucle
+    d'entraînement en cours, autres threads) n'est pas modifié.
+
+    Args:
+        agent: Agent à évaluer
+        env_config: Paramètres de MiniPacmanEnv (sans seed)
+        seed: Graine de l'épisode
+        max_steps: Nombre maximum de pas
+
+    Returns:
+        Dictionnaire des métriques de l'épisode
+    """
+    env = MiniPacmanEnv(**env_config, seed=seed)
+    rng = random.Random(seed)
+    agent_state = env.get_state_for_agent()
+
+    total_reward = 0.0
+    info = {"coins_collected": 0}
+    step = 0
+    for step in range(max_steps):
+        action = agent.choose_action(agent_state, explore=False, rng=rng)
+        _, reward, done, info = env.step(action)
+        agent_state = env.get_state_for_agent()
+        total_reward += reward
+        if done:
+            break
+
+    return {
+        "seed": seed,
+        "reward": total_reward,
+        "coins": info['coins_collected'],
+        "steps": step + 1,
+        "success": 1 if info.get('reason') == 'all_coins_collected' else 0,
+        "lives_lost": env.lives_lost
+    }
+
+
+def _init_worker(agent_specs: Dict):
+    """Charge les agents dans le processus de travail (une seule fois)."""
+    global _worker_agents
+    _worker_agents = {name: load_agent(spec) for name, spec in agent_specs.items()}
+
+
+def _run_chunk(env_config: Dict, seeds: List[int], max_steps: int) -> Dict[str, List[Dict]]:
+    """Évalue tous les agents du processus sur un lot de graines."""
+    return {
+        name: [run_seeded_episode(agent, env_config, seed, max_steps) for seed in seeds]
+        for name, agent in _worker_agents.items()
+    }
+
+
+def bootstrap_ci(
+    values,
+    num_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: int = 0
+) -> Dict:
+    """
+    Intervalle de confiance bootstrap (percentile) de la moyenne.
+
+    Args:
+        values: Échantillon (liste ou tableau NumPy)
+        num_resamples: Nombre de rééchantillonnages
+        confidence: Niveau de confiance
+        seed: Graine du générateur (résultats reproductibles)
+
+    Returns:
+        Dictionnaire {"mean", "ci_low", "ci_high"}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n == 0:
+        return {"mean": 0.0, "ci_low": 0.0, "ci_high": 0.0}
+
+    rng = np.random.default_rng(seed)
+    means = np.empty(num_resamples)
+    # Rééchantillonnage par blocs pour limiter la mémoire sur 10 000+ épisodes
+    block = max(1, min(num_resamples, 2_000_000 // n))
+    for start in range(0, num_resamples, block):
+        stop = min(start + block, num_resamples)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[start:stop] = values[idx].mean(axis=1)
+
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return {"mean": float(values.mean()), "ci_low": float(low), "ci_high": float(high)}
+
+
+def summarize_episodes(episodes: List[Dict], num_resamples: int = 1000, seed: int = 0) -> Dict:
+    """
+    Résume les épisodes d'un agent avec des intervalles de confiance.
+
+    Args:
+        episodes: Résultats de run_seeded_episode
+        num_resamples: Nombre de rééchantillonnages bootstrap
+        seed: Graine du bootstrap
+
+    Returns:
+        Dictionnaire {métrique: {"mean", "ci_low", "ci_high"}}
+    """
+    summary = {}
+    for metric in METRICS:
+        values = [ep[metric] for ep in episodes]
+        if metric == "success":
+            values = [v * 100 for v in values]
+        summary[metric] = bootstrap_ci(values, num_resamples, seed=seed)
+    return summary
+
+
+def paired_comparison(
+    episodes: List[Dict],
+    baseline_episodes: List[Dict],
+    num_resamples: int = 1000,
+    seed: int = 0
+) -> Dict:
+    """
+    Compare deux agents graine par graine (différences appariées).
+
+    Args:
+        episodes: Épisodes de l'agent évalué
+        baseline_episodes: Épisodes de l'agent de référence (mêmes graines)
+        num_resamples: Nombre de rééchantillonnages bootstrap
+        seed: Graine du bootstrap
+
+    Returns:
+        Dictionnaire {métrique: IC de la différence moyenne, "win_rate": ...}
+    """
+    baseline_by_seed = {ep["seed"]: ep for ep in baseline_episodes}
+    pairs = [(ep, baseline_by_seed[ep["seed"]]) for ep in episodes if ep["seed"] in baseline_by_seed]
+
+    comparison = {}
+    for metric in METRICS:
+        scale = 100 if metric == "success" else 1
+        diffs = [(a[metric] - b[metric]) * scale for a, b in pairs]
+        comparison[metric] = bootstrap_ci(diffs, num_resamples, seed=seed)
+
+    wins = sum(1 for a, b in pairs if a["reward"] > b["reward"])
+    comparison["win_rate"] = wins / len(pairs) * 100 if pairs else 0.0
+    return comparison
+
+
+def evaluate_suite(
+    agents: Dict[str, Union[str, object]],
+    env_config: Dict,
+    seeds: List[int],
+    max_steps: int = 500,
+    workers: int = None,
+    baseline: str = "random",
+    num_resamples: int = 1000,
+    chunk_size: int = 200,
+    verbose: bool = True
+) -> Dict:
+    """
+    Évalue plusieurs agents sur la même suite de graines, en parallèle.
+
+    Args:
+        agents: {nom: spécification} (voir load_agent). L'agent de référence
+            `baseline` est ajouté automatiquement s'il est absent.
+        env_config: Paramètres de MiniPacmanEnv (sans seed)
+        seeds: Suite de graines (voir make_seed_suite)
+        max_steps: Nombre maximum de pas par épisode
+        workers: Nombre de processus (None = nombre de CPU, 1 = séquentiel)
+        baseline: Nom de l'agent de référence pour les comparaisons appariées
+        num_resamples: Nombre de rééchantillonnages bootstrap
+        chunk_size: Nombre de graines par tâche envoyée au pool
+        verbose: Afficher le classement
+
+    Returns:
+        Dictionnaire contenant le résumé par agent et les comparaisons appariées
+    """
+    agents = dict(agents)
+    if baseline == "random" and baseline not in agents:
+        agents[baseline] = "random"
+
+    env_config = {k: v for k, v in env_config.items() if k != "seed"}
+    workers = workers or os.cpu_count() or 1
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    start_time = time.time()
+    episodes = {name: [] for name in agents}
+
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(agents)
+        results = [_run_chunk(env_config, chunk, max_steps) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=process_pool_context(),
+            initializer=_init_worker,
+            initargs=(agents,)
+        ) as pool:
+            results = list(pool.map(
+                _run_chunk,
+                [env_config] * len(chunks),
+                chunks,
+                [max_steps] * len(chunks)
+            ))
+
+    # pool.map conserve l'ordre des lots : les résultats suivent l'ordre des graines
+    for chunk_result in results:
+        for name, chunk_episodes in chunk_result.items():
+            episodes[name].extend(chunk_episodes)
+
+    report = {
+        "num_episodes": len(seeds),
+        "max_steps": max_steps,
+        "env_config": env_config,
+        "baseline": baseline if baseline in agents else None,
+        "agents": {
+            name: summarize_episodes(agent_episodes, num_resamples)
+            for name, agent_episodes in episodes.items()
+        },
+        "comparisons": {},
+        "evaluation_time": time.time() - start_time
+    }
+
+    if baseline in agents:
+        for name, agent_episodes in episodes.items():
+            if name != baseline:
+                report["comparisons"][name] = paired_comparison(
+                    agent_episodes, episodes[baseline], num_resamples
+                )
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"Évaluation sur {len(seeds)} graines ({report['evaluation_time']:.2f}s)")
+        for name, summary in report["agents"].items():
+            success = summary["success"]
+            reward = summary["reward"]
+            print(f"{name:>15} | Succès: {success['mean']:.1f}% "
+                  f"[{success['ci_low']:.1f}, {success['ci_high']:.1f}] | "
+                  f"Récompense: {reward['mean']:.2f} "
+                  f"[{reward['ci_low']:.2f}, {reward['ci_high']:.2f}]")
+        print(f"{'='*60}\n")
+
+    return report
+
+
+if __name__ == "__main__":
+    # Comparaison d'un agent fraîchement entraîné avec l'agent aléatoire
+    from training import train_agent
+
+    env_config = {
+        "grid_size": 8,
+        "num_ghosts": 2,
+        "ghost_behavior": "random",
+        "coins_per_row": 6
+    }
+
+    env = MiniPacmanEnv(**env_config, seed=42)
+    agent = QLearningAgent(env.ACTIONS, alpha=0.5, gamma=0.95, epsilon=1.0)
+    train_agent(env, agent, num_episodes=300, max_steps=300, verbose=False)
+
+    evaluate_suite(
+        agents={"qlearning": agent},
+        env_config=env_config,
+        seeds=make_seed_suite(2000, base_seed=10_000),
+        max_steps=300
+    )
@@ -0,0 +1,254 @@
+"""
+Q-Learning hors ligne (fitted Q iteration) sur un journal de transitions
+Balayages vectorisés (NumPy) de tout le jeu de données, sans simuler l'environnement
+
+Exemple :
+    python fitted_q.py runs/linear/seed_0/transitions --gamma 0.95 --output agent.json
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agent import QLearningAgent
+from transition_log import REASON_CODES, TransitionDataset
+
+
+# Événements reconstruits à partir des colonnes du journal (voir event_rewards)
+EVENTS = ["recorded", "coin", "ghost_eaten", "life_lost", "game_over", "victory"]
+
+
+class FittedQIteration:
+    """
+    Itération de Q ajustée, version tabulaire.
+
+    Les transitions sont chargées une seule fois : états remplacés par des
+    indices de ligne, paires (état, action) aplaties. Chaque balayage calcule
+    toutes les cibles r + γ·(1 - done)·max_a' Q(s', a') d'un coup, puis
+    remplace Q(s, a) par la moyenne de ses cibles (np.bincount). C'est
+    l'itération de la valeur sur le MDP empirique : elle converge pour γ < 1.
+
+    Le même jeu de données chargé peut être réajusté avec un autre γ ou
+    d'autres récompenses en quelques secondes.
+    """
+
+    def __init__(self, dataset: TransitionDataset, explore_only: bool = False):
+        """
+        Args:
+            dataset: Journal de transitions
+            explore_only: Ignorer les transitions d'évaluation gloutonne
+        """
+        self.dataset = dataset
+        self.actions = dataset.actions
+
+        columns = {name: dataset.column(name) for name in dataset.columns}
+        if explore_only:
+            keep = columns["explore"]
+            columns = {name: values[keep] for name, values in columns.items()}
+        self.columns = columns
+
+        # Indices des états : lignes identiques de "state"/"next_state" -> même indice
+        rows = np.concatenate([columns["state"], columns["next_state"]])
+        rows = np.ascontiguousarray(rows)
+        keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        self.state_rows = rows[first]
+        self.num_states = len(first)
+
+        count = len(columns["action"])
+        self.state_index = inverse[:count]
+        self.next_state_index = inverse[count:]
+        self.pair_index = self.state_index * len(self.actions) + columns["action"].astype(np.int64)
+        self.not_done = ~columns["done"]
+
+        num_pairs = self.num_states * len(self.actions)
+        self.pair_counts = np.bincount(self.pair_index, minlength=num_pairs)
+        self.visited = self.pair_counts > 0
+
+        self.Q = np.zeros((self.num_states, len(self.actions)))
+
+    def __len__(self) -> int:
+        return len(self.pair_index)
+
+    def event_rewards(self, weights: Dict[str, float]) -> np.ndarray:
+        """
+        Récompenses recalculées à partir des événements de chaque transition.
+
+        Événements (voir EVENTS) : "recorded" (récompense enregistrée), "coin"
+        (pièces ramassées), "ghost_eaten", "life_lost", "game_over", "victory".
+        Par exemple {"recorded": 1.0, "ghost_eaten": 100.0} double le bonus de
+        50 pour un fantôme mangé, {"coin": 1.0, "game_over": -1.0} remplace la
+        récompense façonnée par une récompense minimale.
+
+        Args:
+            weights: {événement: poids} (événements absents : poids 0)
+
+        Returns:
+            Récompense de chaque transition
+        """
+        unknown = set(weights) - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Événements inconnus: {', '.join(sorted(unknown))} (disponibles: {', '.join(EVENTS)})")
+
+        columns = self.columns
+        first_step = columns["step"] == 0
+
+        def increments(name: str) -> np.ndarray:
+            # Compteur cumulé dans l'épisode -> incrément de chaque transition
+            values = columns[name].astype(np.float64)
+            previous = np.concatenate([[0.0], values[:-1]])
+            previous[first_step] = 0.0
+            return values - previous
+
+        reason = columns["reason"]
+        events = {
+            "recorded": lambda: columns["reward"].astype(np.float64),
+            "coin": lambda: increments("coins_collected"),
+            "ghost_eaten": lambda: increments("ghosts_eaten"),
+            "life_lost": lambda: (reason == REASON_CODES["life_lost"]).astype(np.float64),
+            "game_over": lambda: (reason == REASON_CODES["game_over"]).astype(np.float64),
+            "victory": lambda: (reason == REASON_CODES["all_coins_collected"]).astype(np.float64),
+        }
+
+        rewards = np.zeros(len(self))
+        for event, weight in weights.items():
+            if weight:
+                rewards += weight * events[event]()
+        return rewards
+
+    def fit(
+        self,
+        gamma: float = 0.9,
+        rewards: Optional[np.ndarray] = None,
+        max_iterations: int = 1000,
+        tol: float = 1e-4,
+        warm_start: bool = False
+    ) -> Dict:
+        """
+        Ajuste la Q-table jusqu'à convergence.
+
+        Args:
+            gamma: Facteur de discount
+            rewards: Récompense de chaque transition (défaut: celles enregistrées ;
+                voir event_rewards)
+            max_iterations: Nombre maximum de balayages
+            tol: Arrêt quand la plus grande variation de Q est inférieure
+            warm_start: Repartir de la Q-table précédente (sinon de zéro)
+
+        Returns:
+            Statistiques (iterations, converged, max_delta, fit_time...)
+        """
+        start_time = time.time()
+        if rewards is None:
+            rewards = self.columns["reward"].astype(np.float64)
+        if len(rewards) != len(self):
+            raise ValueError(f"{len(rewards)} récompenses pour {len(self)} transitions")
+
+        num_pairs = self.num_states * len(self.actions)
+        counts = np.maximum(self.pair_counts, 1)
+        # Somme des récompenses par paire : constante d'un balayage à l'autre
+        reward_sums = np.bincount(self.pair_index, weights=rewards, minlength=num_pairs)
+        discount = gamma * self.not_done
+
+        Q = self.Q.ravel().copy() if warm_start else np.zeros(num_pairs)
+        delta = float("inf")
+        iteration = 0
+        while iteration < max_iterations and delta >= tol:
+            iteration += 1
+            best_next = Q.reshape(self.num_states, -1).max(axis=1)
+            future_sums = np.bincount(self.pair_index, weights=discount * best_next[self.next_state_index],
+                                      minlength=num_pairs)
+            new_Q = np.where(self.visited, (reward_sums + future_sums) / counts, Q)
+            delta = float(np.abs(new_Q - Q).max())
+            Q = new_Q
+
+        self.Q = Q.reshape(self.num_states, -1)
+        return {
+            "transitions": len(self),
+            "states": self.num_states,
+            "visited_pairs": int(self.visited.sum()),
+            "gamma": gamma,
+            "iterations": iteration,
+            "converged": delta < tol,
+            "max_delta": delta,
+            "fit_time": time.time() - start_time,
+        }
+
+    def q_table(self) -> Dict[Tuple, float]:
+        """
+        Q-table au format de QLearningAgent (paires jamais observées omises :
+        l'agent les évalue à 0, comme pendant l'ajustement).
+
+        Returns:
+            {(état, action): valeur}
+        """
+        decode = self.dataset.decode_state
+        states = [decode(row) for row in self.state_rows]
+        q_table = {}
+        for state_index, action_index in zip(*np.nonzero(self.visited.reshape(self.num_states, -1))):
+            q_table[(states[state_index], self.actions[action_index])] = float(self.Q[state_index, action_index])
+        return q_table
+
+    def to_agent(self, agent: Optional[QLearningAgent] = None, **agent_params) -> QLearningAgent:
+        """
+        Agent exploitant la Q-table ajustée.
+
+        Args:
+            agent: Agent dont la Q-table est remplacée (défaut: nouveau QLearningAgent)
+            **agent_params: Paramètres du nouvel agent (défaut: epsilon=0, pur exploitation)
+
+        Returns:
+            Agent
+        """
+        if agent is None:
+            agent_params.setdefault("epsilon", 0.0)
+            agent = QLearningAgent(list(self.actions), **agent_params)
+        agent.Q = self.q_table()
+        return agent
+
+
+def parse_weights(text: str) -> Dict[str, float]:
+    """
+    Lit des poids d'événements "coin=1,game_over=-10".
+
+    Args:
+        text: Poids séparés par des virgules
+
+    Returns:
+        {événement: poids}
+    """
+    weights = {}
+    for item in text.split(","):
+        name, _, value = item.partition("=")
+        weights[name.strip()] = float(value)
+    return weights
+
+
+def main(argv: List[str] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Q-Learning hors ligne sur un journal de transitions")
+    parser.add_argument("dataset", help="dossier du journal (voir transition_log.py)")
+    parser.add_argument("--gamma", type=float, default=0.9)
+    parser.add_argument("--rewards", help=f"poids des événements, ex: recorded=1,ghost_eaten=50 ({', '.join(EVENTS)})")
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--tol", type=float, default=1e-4)
+    parser.add_argument("--explore-only", action="store_true", help="ignorer les transitions d'évaluation")
+    parser.add_argument("--output", help="fichier où enregistrer l'agent (format QLearningAgent.save)")
+    args = parser.parse_args(argv)
+
+    learner = FittedQIteration(TransitionDataset(args.dataset), explore_only=args.explore_only)
+    rewards = learner.event_rewards(parse_weights(args.rewards)) if args.rewards else None
+    stats = learner.fit(gamma=args.gamma, rewards=rewards, max_iterations=args.max_iterations, tol=args.tol)
+
+    if args.output:
+        learner.to_agent(gamma=args.gamma).save(args.output)
+        stats["agent_file"] = args.output
+    print(json.dumps(stats))
+    return stats
+
+
+if __name__ == "__main__":
+    main()
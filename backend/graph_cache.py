@@ -0,0 +1,103 @@
+"""
+Cache des graphiques d'entraînement
+Rendu unique en arrière-plan par entraînement, images PNG servies telles quelles
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+
+class GraphCache:
+    """
+    Images PNG des graphiques, indexées par identifiant d'entraînement.
+
+    Le rendu (matplotlib) est lancé une seule fois par entraînement, dans un
+    unique thread dédié : pyplot n'est pas thread-safe et les requêtes ne
+    paient plus le coût du rendu. Chaque image a un ETag stable construit à
+    partir de l'identifiant d'entraînement et de `version` (à incrémenter
+    quand le style des graphiques change) : un client qui possède déjà
+    l'image reçoit une réponse 304.
+    """
+
+    def __init__(self, renderer: Callable[[Dict], Dict[str, bytes]], version: int = 1, max_entries: int = 8):
+        """
+        Initialise le cache.
+
+        Args:
+            renderer: Fonction stats -> {nom du graphique: octets PNG}
+            version: Version du rendu (intégrée aux ETag)
+            max_entries: Nombre d'entraînements conservés (les plus anciens sont oubliés)
+        """
+        self.renderer = renderer
+        self.version = version
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {run_id: Future -> {nom: octets}}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="graph-render")
+
+    def etag(self, run_id: str, name: str) -> str:
+        """
+        Retourne l'ETag d'un graphique.
+
+        Args:
+            run_id: Identifiant de l'entraînement
+            name: Nom du graphique
+
+        Returns:
+            Valeur d'ETag (sans guillemets)
+        """
+        return f"{run_id}-v{self.version}-{name}"
+
+    def submit(self, run_id: str, stats: Dict) -> Future:
+        """
+        Programme le rendu des graphiques d'un entraînement (sans effet s'il est déjà connu).
+
+        Args:
+            run_id: Identifiant de l'entraînement
+            stats: Statistiques d'entraînement (séries par épisode)
+
+        Returns:
+            Future du rendu
+        """
+        with self._lock:
+            future = self._entries.get(run_id)
+            if future is None:
+                future = self._executor.submit(self.renderer, stats)
+                self._entries[run_id] = future
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(run_id)
+            return future
+
+    def get(self, run_id: str, name: str, stats: Dict = None, timeout: float = 30) -> Optional[Tuple[bytes, str]]:
+        """
+        Retourne un graphique, en attendant la fin du rendu si nécessaire.
+
+        Args:
+            run_id: Identifiant de l'entraînement
+            name: Nom du graphique
+            stats: Statistiques à rendre si l'entraînement n'est pas (ou plus) en cache
+            timeout: Délai maximum d'attente du rendu en secondes
+
+        Returns:
+            (octets PNG, ETag), ou None si inconnu
+        """
+        if stats is not None:
+            future = self.submit(run_id, stats)
+        else:
+            with self._lock:
+                future = self._entries.get(run_id)
+            if future is None:
+                return None
+        image = future.result(timeout=timeout).get(name)
+        if image is None:
+            return None
+        return image, self.etag(run_id, name)
+
+    def clear(self):
+        """Oublie tous les rendus."""
+        with self._lock:
+            self._entries.clear()
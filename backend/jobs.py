@@ -0,0 +1,489 @@
+"""
+Gestionnaire de tâches d'entraînement en arrière-plan
+File d'attente équitable par client, pool de threads borné, annulation coopérative,
+flux d'événements de progression
+"""
+
+import functools
+import os
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from multiprocessing.managers import BaseManager, RemoteError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import TRAINING_REGISTRY
+
+
+class Job:
+    """
+    Tâche d'entraînement soumise au JobManager.
+
+    Le runner reçoit l'objet Job : il lit `config` et doit consulter
+    `cancel_event` régulièrement (train_agent le fait à chaque épisode).
+    Il peut publier des événements de progression avec `publish()` ; les
+    `max_events` plus récents sont conservés, numérotés à partir de 1.
+    """
+
+    def __init__(self, config: Dict, owner: str, max_events: int = 500):
+        self.id = uuid.uuid4().hex[:12]
+        self.owner = owner
+        self.config = config
+        self.status = "queued"  # queued, running, completed, failed, cancelled
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.progress = None
+        self.events = deque(maxlen=max_events)  # [(id, type, données)]
+        self.last_event_id = 0
+        self._condition = None  # Condition du JobManager (réveil des abonnés)
+
+    def publish(self, event_type: str, data: Dict):
+        """
+        Publie un événement et réveille les clients abonnés au flux.
+
+        Args:
+            event_type: Type d'événement ("progress", ...)
+            data: Données sérialisables en JSON
+        """
+        condition = self._condition or threading.Condition()
+        with condition:
+            self.last_event_id += 1
+            self.events.append((self.last_event_id, event_type, data))
+            if event_type == "progress":
+                self.progress = data
+            condition.notify_all()
+
+    def to_dict(self) -> Dict:
+        """
+        Retourne l'état de la tâche (sans le résultat complet).
+
+        Returns:
+            Dictionnaire sérialisable en JSON
+        """
+        return {
+            "job_id": self.id,
+            "owner": self.owner,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "progress": self.progress
+        }
+
+
+class JobManager:
+    """
+    Exécute des tâches dans un pool de `max_workers` threads.
+
+    Les tâches en attente sont rangées par propriétaire (client) et servies
+    à tour de rôle : un client qui soumet dix entraînements ne bloque pas
+    celui qui en soumet un seul.
+    """
+
+    FINISHED = ("completed", "failed", "cancelled")
+
+    def __init__(self, runner: Callable[[Job], Dict], max_workers: int = 2, max_history: int = 100):
+        """
+        Initialise le gestionnaire et démarre les threads de travail.
+
+        Args:
+            runner: Fonction exécutant une tâche et retournant son résultat
+            max_workers: Nombre maximum de tâches exécutées simultanément
+            max_history: Nombre de tâches terminées conservées en mémoire
+        """
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.max_history = max_history
+        self.jobs = OrderedDict()
+        self._queues = OrderedDict()  # {owner: deque de tâches en attente}
+        self._running = {}  # {owner: nombre de tâches en cours}
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        TRAINING_REGISTRY.gauge(
+            "pacman_jobs", "Tâches d'entraînement connues, par état", ("status",)
+        ).set_function(self._count_by_status)
+
+    def submit(self, config: Dict, owner: str = "anonymous") -> str:
+        """
+        Ajoute une tâche à la file d'attente.
+
+        Args:
+            config: Configuration transmise au runner
+            owner: Identifiant du client (pour l'équité)
+
+        Returns:
+            Identifiant de la tâche
+        """
+        job = Job(config, owner)
+        job._condition = self._condition
+        with self._condition:
+            self.jobs[job.id] = job
+            self._queues.setdefault(owner, deque()).append(job)
+            self._prune_history()
+            self._condition.notify()
+        return job.id
+
+    def _next_job(self) -> Optional[Job]:
+        """
+        Prend la prochaine tâche : le propriétaire ayant le moins de tâches en
+        cours est servi en premier, à égalité dans l'ordre du tourniquet.
+        """
+        owner = self._next_owner(self._queues, self._running)
+        if owner is None:
+            return None
+        queue = self._queues.pop(owner)
+        job = queue.popleft()
+        # Le propriétaire servi passe en fin de tourniquet
+        if queue:
+            self._queues[owner] = queue
+        return job
+
+    @staticmethod
+    def _next_owner(queues: Dict, running: Dict) -> Optional[str]:
+        """Propriétaire à servir : le moins de tâches en cours, puis l'ordre du tourniquet."""
+        owners = [owner for owner, queue in queues.items() if queue]
+        if not owners:
+            return None
+        return min(owners, key=lambda owner: running.get(owner, 0))
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None and not self._shutdown:
+                    self._condition.wait()
+                    job = self._next_job()
+                if job is None:
+                    return
+                job.status = "running"
+                job.started_at = time.time()
+                self._running[job.owner] = self._running.get(job.owner, 0) + 1
+
+            try:
+                result = self.runner(job)
+                status, error = ("cancelled" if job.cancel_event.is_set() else "completed"), None
+            except Exception as e:
+                traceback.print_exc()
+                result, status, error = None, "failed", str(e)
+
+            with self._condition:
+                job.result = result
+                job.status = status
+                job.error = error
+                job.finished_at = time.time()
+                self._running[job.owner] -= 1
+                if not self._running[job.owner]:
+                    del self._running[job.owner]
+                self._condition.notify_all()
+
+    def _prune_history(self):
+        """Oublie les tâches terminées les plus anciennes au-delà de max_history."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in self.FINISHED]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self.jobs[job_id]
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """
+        Retourne l'état d'une tâche (avec sa position dans la file si en attente).
+
+        Args:
+            job_id: Identifiant de la tâche
+
+        Returns:
+            Dictionnaire d'état, ou None si la tâche est inconnue
+        """
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            state = job.to_dict()
+            if job.status == "queued":
+                state["queue_position"] = self._queue_position(job)
+            return state
+
+    def _queue_position(self, job: Job) -> int:
+        """Position (0 = prochaine) de la tâche en simulant l'ordonnancement."""
+        queues = OrderedDict((owner, deque(queue)) for owner, queue in self._queues.items())
+        running = dict(self._running)
+        position = 0
+        while True:
+            owner = self._next_owner(queues, running)
+            if owner is None:
+                return position
+            queue = queues.pop(owner)
+            if queue.popleft() is job:
+                return position
+            if queue:
+                queues[owner] = queue
+            running[owner] = running.get(owner, 0) + 1
+            position += 1
+
+    def list_jobs(self) -> List[Dict]:
+        """Retourne l'état de toutes les tâches connues."""
+        with self._condition:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def events_since(self, job_id: str, last_id: int = 0, timeout: float = None) -> Optional[Tuple[List, bool]]:
+        """
+        Attend les événements publiés après `last_id`.
+
+        Args:
+            job_id: Identifiant de la tâche
+            last_id: Identifiant du dernier événement déjà reçu
+            timeout: Délai maximum d'attente en secondes (None = illimité)
+
+        Returns:
+            (événements [(id, type, données)], tâche terminée),
+            ou None si la tâche est inconnue
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            while job.last_event_id <= last_id and job.status not in self.FINISHED:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            events = [event for event in job.events if event[0] > last_id]
+            return events, job.status in self.FINISHED
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """
+        Retourne le résultat d'une tâche terminée.
+
+        Args:
+            job_id: Identifiant de la tâche
+
+        Returns:
+            Résultat du runner, ou None si inconnu / pas encore terminé
+        """
+        with self._condition:
+            job = self.jobs.get(job_id)
+            return job.result if job is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Annule une tâche : retirée de la file si en attente, arrêt coopératif sinon.
+
+        Args:
+            job_id: Identifiant de la tâche
+
+        Returns:
+            True si l'annulation a été prise en compte
+        """
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.status in self.FINISHED:
+                return False
+            job.cancel_event.set()
+            if job.status == "queued":
+                queue = self._queues[job.owner]
+                queue.remove(job)
+                if not queue:
+                    del self._queues[job.owner]
+                job.status = "cancelled"
+                job.finished_at = time.time()
+                self._condition.notify_all()
+            return True
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict]:
+        """
+        Attend la fin d'une tâche.
+
+        Args:
+            job_id: Identifiant de la tâche
+            timeout: Délai maximum en secondes (None = illimité)
+
+        Returns:
+            État final de la tâche (ou état courant si le délai expire)
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            job = self.jobs.get(job_id)
+            while job is not None and job.status not in self.FINISHED:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+        return self.status(job_id)
+
+    def _count_by_status(self) -> Dict[Tuple[str], int]:
+        counts = {(status,): 0 for status in ("queued", "running") + self.FINISHED}
+        with self._condition:
+            for job in self.jobs.values():
+                counts[(job.status,)] = counts.get((job.status,), 0) + 1
+        return counts
+
+    def metrics(self) -> str:
+        """
+        Métriques des tâches et des entraînements de ce processus.
+
+        Returns:
+            Texte au format Prometheus
+        """
+        return TRAINING_REGISTRY.render()
+
+    def shutdown(self):
+        """Annule les tâches en cours et arrête les threads de travail."""
+        with self._condition:
+            self._shutdown = True
+            for job in self.jobs.values():
+                if job.status not in self.FINISHED:
+                    job.cancel_event.set()
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=5)
+
+
+class ProgressBatcher:
+    """
+    Agrège les métriques par épisode avant publication.
+
+    train_agent appelle le callback à chaque épisode (plusieurs centaines par
+    seconde sur une petite grille) : le lot est publié au plus toutes les
+    `interval` secondes, avec les moyennes des épisodes agrégés et les
+    valeurs les plus récentes (epsilon, débit, temps écoulé).
+    """
+
+    def __init__(self, publish: Callable[[str, Dict], None], interval: float = 0.25,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialise l'agrégateur.
+
+        Args:
+            publish: Fonction de publication (ex: Job.publish)
+            interval: Intervalle minimal entre deux publications (secondes)
+            clock: Horloge monotone
+        """
+        self.publish = publish
+        self.interval = interval
+        self.clock = clock
+        self._last_publish = float('-inf')
+        self._batch = []
+
+    def __call__(self, progress: Dict):
+        """Callback de progression de train_agent / run_curriculum."""
+        self._batch.append(progress)
+        now = self.clock()
+        if now - self._last_publish >= self.interval:
+            self._last_publish = now
+            self.flush()
+
+    def flush(self):
+        """Publie le lot en attente (à appeler en fin d'entraînement)."""
+        batch = self._batch
+        if not batch:
+            return
+        self._batch = []
+        last = batch[-1]
+        count = len(batch)
+        event = {
+            "episode": last["episode"],
+            "num_episodes": last["num_episodes"],
+            "episodes_in_batch": count,
+            "reward": sum(p["reward"] for p in batch) / count,
+            "coins": sum(p["coins"] for p in batch) / count,
+            "steps": sum(p["steps"] for p in batch) / count,
+            "success_rate": sum(1 for p in batch if p["success"]) / count * 100,
+            "epsilon": last["epsilon"],
+            "elapsed": last["elapsed"],
+            "steps_per_sec": last["steps_per_sec"]
+        }
+        if "stage" in last:
+            event["stage"] = last["stage"]
+        self.publish("progress", event)
+
+
+# Méthodes du JobManager accessibles depuis un autre processus
+REMOTE_METHODS = ("submit", "status", "list_jobs", "result", "cancel", "wait", "events_since", "metrics")
+
+
+class _JobManagerServer(BaseManager):
+    """Serveur multiprocessing exposant un JobManager (voir serve_job_manager)."""
+
+
+def serve_job_manager(manager: JobManager, address, authkey: bytes):
+    """
+    Expose un JobManager aux autres processus (bloquant).
+
+    Les entraînements tournent dans le processus appelant ; les processus
+    de requêtes ne font que soumettre, interroger et annuler via
+    RemoteJobManager. Chaque connexion cliente est servie par son propre
+    thread : une attente longue (wait, events_since) ne bloque pas les autres.
+
+    Args:
+        manager: Gestionnaire de tâches local
+        address: Adresse d'écoute ((hôte, port) ou chemin d'un socket Unix)
+        authkey: Clé d'authentification partagée avec les clients
+    """
+    _JobManagerServer.register("get_job_manager", callable=lambda: manager, exposed=REMOTE_METHODS)
+    server = _JobManagerServer(address=address, authkey=authkey).get_server()
+    server.serve_forever()
+
+
+class RemoteJobManager:
+    """
+    Client d'un JobManager servi par serve_job_manager, même interface.
+
+    La connexion est ouverte à la première utilisation et rouverte après un
+    fork : l'objet peut être créé avant de lancer les processus de travail.
+    Elle est aussi rouverte (un seul nouvel essai) quand le serveur a été
+    redémarré : les références de l'ancien proxy n'y existent plus.
+    """
+
+    def __init__(self, address, authkey: bytes):
+        """
+        Initialise le client (sans se connecter).
+
+        Args:
+            address: Adresse du serveur ((hôte, port) ou chemin d'un socket Unix)
+            authkey: Clé d'authentification
+        """
+        self.address = address
+        self.authkey = authkey
+        self._proxy = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _get_proxy(self):
+        with self._lock:
+            if self._proxy is None or self._pid != os.getpid():
+                client = _JobManagerServer(address=self.address, authkey=self.authkey)
+                client.connect()
+                self._proxy = client.get_job_manager()
+                self._pid = os.getpid()
+            return self._proxy
+
+    def _call(self, name: str, *args, **kwargs):
+        proxy = self._get_proxy()
+        try:
+            return getattr(proxy, name)(*args, **kwargs)
+        except (OSError, EOFError, RemoteError):
+            # Serveur injoignable ou redémarré : nouvelle connexion, puis nouvel essai
+            with self._lock:
+                if self._proxy is proxy:
+                    self._proxy = None
+            return getattr(self._get_proxy(), name)(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        if name not in REMOTE_METHODS:
+            raise AttributeError(name)
+        return functools.partial(self._call, name)
+
+
+_JobManagerServer.register("get_job_manager", exposed=REMOTE_METHODS)
@@ -0,0 +1,419 @@
+"""
+Agent Q-Learning à approximation linéaire pour Mini-Pacman
+Tile coding multi-résolution (position, écart au fantôme, directions cibles), poids NumPy
+
+Nécessite l'encodage d'état "features" de l'environnement :
+    env = MiniPacmanEnv(grid_size=30, state_encoding="features")
+"""
+
+import random
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from agent import QLearningAgent
+
+
+# Directions possibles de la cible et du fantôme (voir get_state_for_agent)
+DIRECTIONS = ["up", "down", "left", "right", "none"]
+
+# Largeur des états "features" : 7 valeurs de l'abstraction par zones + px, py, ghost_dx, ghost_dy, grid_size
+FEATURE_WIDTH = 12
+
+# Tranches de distance (Manhattan) au fantôme le plus proche : 0-1, 2, 3-4, 5-8, 9+
+GHOST_DISTANCE_BOUNDS = [1, 2, 4, 8]
+
+
+class TileCoder:
+    """
+    Tile coding d'un état "features" en une liste d'indices de tuiles actives.
+
+    - Position : pour chaque résolution r, `num_tilings` pavages de r x r
+      tuiles décalés (pas de 1/num_tilings de tuile, décalage asymétrique en
+      x et en y). La position est rapportée à la taille de la grille : le
+      nombre de tuiles ne dépend pas de la grille, une tuile grossière couvre
+      plus de cases sur une grande grille et généralise d'autant.
+    - Fantôme : écart (dx, dy) exact borné à ±ghost_range, et direction x
+      tranche de distance, chacun croisé avec le mode invincible ; une tuile
+      dédiée de chaque groupe code l'absence de fantôme.
+    - Cible : direction x progression, direction x direction du fantôme x danger.
+    - Un biais toujours actif.
+
+    Chaque état active exactement une tuile par pavage (num_active tuiles),
+    parmi num_features : la mémoire est fixée à la construction.
+    """
+
+    def __init__(self, resolutions: Sequence[int] = (4, 8, 16), num_tilings: int = 4,
+                 ghost_range: int = 4, cache_size: int = 65536):
+        """
+        Args:
+            resolutions: Nombre de tuiles par côté de chaque niveau de position
+            num_tilings: Nombre de pavages décalés par niveau
+            ghost_range: Borne de l'écart au fantôme (en cases)
+            cache_size: Nombre d'états encodés gardés en cache (vidé au-delà)
+        """
+        self.resolutions = [int(r) for r in resolutions]
+        self.num_tilings = num_tilings
+        self.ghost_range = ghost_range
+        self.cache_size = cache_size
+        self._cache = {}
+
+        # Décalages (en fraction de tuile) de chaque pavage de position
+        self._shifts = [(t / num_tilings, (3 * t) % num_tilings / num_tilings) for t in range(num_tilings)]
+
+        # Disposition des groupes de tuiles dans le vecteur de poids
+        offset = 0
+        self._position_offsets = []
+        for resolution in self.resolutions:
+            side = resolution + 1  # +1 : les pavages décalés débordent d'une tuile
+            self._position_offsets.append([offset + t * side * side for t in range(num_tilings)])
+            offset += num_tilings * side * side
+        ghost_side = 2 * ghost_range + 1
+        self._ghost_offset = offset
+        offset += 2 * ghost_side * ghost_side + 1  # +1 : aucun fantôme
+        self._ghost_coarse_offset = offset
+        offset += 2 * (len(GHOST_DISTANCE_BOUNDS) + 1) * 9 + 1
+        self._target_offset = offset
+        offset += len(DIRECTIONS) * 5
+        self._target_ghost_offset = offset
+        offset += len(DIRECTIONS) * len(DIRECTIONS) * 2
+        self._bias = offset
+        self.num_features = offset + 1
+        self.num_active = len(self.resolutions) * num_tilings + 5
+
+    def config(self) -> Dict:
+        """Paramètres du codage (pour le recréer à l'identique)."""
+        return {"resolutions": self.resolutions, "num_tilings": self.num_tilings, "ghost_range": self.ghost_range}
+
+    def encode(self, state: Tuple) -> np.ndarray:
+        """
+        Indices des tuiles actives d'un état.
+
+        Args:
+            state: État "features" (voir MiniPacmanEnv.get_state_for_agent)
+
+        Returns:
+            Tableau de num_active indices distincts
+        """
+        tiles = self._cache.get(state)
+        if tiles is not None:
+            return tiles
+        if len(state) != FEATURE_WIDTH:
+            raise ValueError(f"État de largeur {len(state)} (attendu {FEATURE_WIDTH} : "
+                             f"environnement avec state_encoding=\"features\")")
+
+        _, _, danger, target, progress, invincible, ghost_direction, px, py, dx, dy, grid_size = state
+        indices = []
+        for resolution, offsets in zip(self.resolutions, self._position_offsets):
+            side = resolution + 1
+            ux = (px + 0.5) * resolution / grid_size
+            uy = (py + 0.5) * resolution / grid_size
+            for offset, (shift_x, shift_y) in zip(offsets, self._shifts):
+                indices.append(offset + int(ux + shift_x) * side + int(uy + shift_y))
+
+        g = self.ghost_range
+        ghost_side = 2 * g + 1
+        num_buckets = len(GHOST_DISTANCE_BOUNDS) + 1
+        if dx >= grid_size:
+            # Aucun fantôme (écart hors grille, voir get_state_for_agent)
+            indices.append(self._ghost_offset + 2 * ghost_side * ghost_side)
+            indices.append(self._ghost_coarse_offset + 2 * num_buckets * 9)
+        else:
+            cx = min(max(dx, -g), g) + g
+            cy = min(max(dy, -g), g) + g
+            indices.append(self._ghost_offset + (invincible * ghost_side + cx) * ghost_side + cy)
+
+            distance = abs(dx) + abs(dy)
+            bucket = sum(1 for bound in GHOST_DISTANCE_BOUNDS if distance > bound)
+            sx = (dx > 0) - (dx < 0) + 1
+            sy = (dy > 0) - (dy < 0) + 1
+            indices.append(self._ghost_coarse_offset + ((invincible * num_buckets + bucket) * 3 + sx) * 3 + sy)
+
+        target_index = DIRECTIONS.index(target)
+        indices.append(self._target_offset + target_index * 5 + min(progress, 4))
+        indices.append(self._target_ghost_offset
+                       + (target_index * len(DIRECTIONS) + DIRECTIONS.index(ghost_direction)) * 2 + danger)
+        indices.append(self._bias)
+
+        tiles = np.array(indices, dtype=np.int64)
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[state] = tiles
+        return tiles
+
+    def encode_batch(self, states: Sequence[Tuple]) -> np.ndarray:
+        """
+        Tuiles actives d'un lot d'états.
+
+        Args:
+            states: États "features"
+
+        Returns:
+            Matrice (len(states) x num_active)
+        """
+        if not states:
+            return np.zeros((0, self.num_active), dtype=np.int64)
+        return np.stack([self.encode(state) for state in states])
+
+
+class _WeightTable(Mapping):
+    """Vue {(indice de tuile, action): poids} des poids non nuls d'un LinearQAgent."""
+
+    def __init__(self, agent: "LinearQAgent"):
+        self.agent = agent
+
+    def __getitem__(self, key: Tuple[int, str]) -> float:
+        feature, action = key
+        return float(self.agent.weights[self.agent._action_index[action], feature])
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        actions = self.agent.actions
+        for a, feature in zip(*np.nonzero(self.agent.weights)):
+            yield (int(feature), actions[a])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.agent.weights))
+
+
+class LinearQAgent(QLearningAgent):
+    """
+    Variante de QLearningAgent à approximation linéaire.
+
+    Q(s, a) = somme des poids de a sur les tuiles actives de s (voir
+    TileCoder). Une mise à jour Q-Learning ne touche que ces num_active
+    poids, avec un pas alpha / num_active :
+
+        w[a, tuiles(s)] += (alpha / num_active) * [r + γ * max_a' Q(s',a') - Q(s,a)]
+
+    Les poids forment un tableau (actions x num_features) dont la taille ne
+    dépend ni de la grille ni du nombre d'états rencontrés ; les positions
+    voisines partagent leurs tuiles grossières, l'apprentissage se transmet
+    donc d'une case à l'autre.
+
+    self.Q est une vue {(indice de tuile, action): poids} des poids non nuls
+    (len(agent.Q) = paramètres appris) ; l'affecter remplace les poids (ex:
+    restauration d'un checkpoint). Les compteurs de couverture sont tenus
+    sur l'abstraction par zones (7 premières valeurs de l'état).
+    """
+
+    AGENT_TYPE = "linear"
+
+    def __init__(
+        self,
+        actions: List[str],
+        alpha: float = 0.1,
+        gamma: float = 0.9,
+        epsilon: float = 0.3,
+        epsilon_min: float = 0.01,
+        epsilon_decay: float = 0.995,
+        resolutions: Sequence[int] = (4, 8, 16),
+        num_tilings: int = 4,
+        ghost_range: int = 4,
+        seed: int = None
+    ):
+        """
+        Initialise l'agent linéaire.
+
+        Args:
+            actions: Liste des actions possibles
+            alpha: Taux d'apprentissage (learning rate) [0, 1], réparti sur les tuiles actives
+            gamma: Facteur de discount (importance du futur) [0, 1]
+            epsilon: Probabilité d'exploration initiale [0, 1]
+            epsilon_min: Valeur minimale d'epsilon
+            epsilon_decay: Facteur de décroissance d'epsilon par épisode
+            resolutions: Tuiles par côté de chaque niveau de position (voir TileCoder)
+            num_tilings: Pavages décalés par niveau
+            ghost_range: Borne de l'écart au fantôme (en cases)
+            seed: Graine de l'exploration, des ex æquo et du replay
+        """
+        self._action_index = {a: i for i, a in enumerate(actions)}
+        self.coder = TileCoder(resolutions, num_tilings, ghost_range)
+        self.weights = np.zeros((len(actions), self.coder.num_features))
+        super().__init__(actions, alpha, gamma, epsilon, epsilon_min, epsilon_decay, seed)
+
+    @property
+    def Q(self) -> Mapping:
+        """Vue {(indice de tuile, action): poids} des poids non nuls."""
+        return _WeightTable(self)
+
+    @Q.setter
+    def Q(self, table: Dict):
+        """Remplace les poids (ex: restauration d'un checkpoint)."""
+        self.weights[:] = 0.0
+        for (feature, action), value in table.items():
+            self.weights[self._action_index[action], feature] = value
+
+    def q_values(self, state: Tuple) -> np.ndarray:
+        """
+        Valeurs Q de toutes les actions d'un état.
+
+        Args:
+            state: État "features"
+
+        Returns:
+            Tableau (len(actions),)
+        """
+        return self.weights[:, self.coder.encode(state)].sum(axis=1)
+
+    def get_Q(self, state: Tuple, action: str) -> float:
+        """
+        Retourne la valeur Q(s,a) (somme des poids des tuiles actives).
+
+        Args:
+            state: État du jeu
+            action: Action à évaluer
+
+        Returns:
+            Valeur Q(s,a)
+        """
+        return float(self.weights[self._action_index[action], self.coder.encode(state)].sum())
+
+    def choose_action(self, state: Tuple, explore: bool = True, rng: random.Random = None) -> str:
+        """
+        Choisit une action selon la politique ε-greedy.
+
+        Args:
+            state: État actuel du jeu
+            explore: Si True, utilise ε-greedy; si False, toujours exploite (pour évaluation)
+            rng: Générateur pour l'exploration et les ex æquo (défaut: self.rng)
+
+        Returns:
+            Action choisie
+        """
+        rng = rng or self.rng
+        if explore and rng.random() < self.epsilon:
+            return rng.choice(self.actions)
+        q_values = self.q_values(state).tolist()
+        max_q = max(q_values)
+        return rng.choice([self.actions[i] for i, q in enumerate(q_values) if q == max_q])
+
+    def _td_update(self, state: Tuple, action: str, reward: float, next_state: Tuple, done: bool,
+                   alpha: float) -> float:
+        """Mise à jour creuse des poids des tuiles actives ; retourne l'erreur TD."""
+        tiles = self.coder.encode(state)
+        a = self._action_index[action]
+        future_q = 0.0 if done else float(self.q_values(next_state).max())
+        td_error = reward + self.gamma * future_q - float(self.weights[a, tiles].sum())
+        self.weights[a, tiles] += (alpha / self.coder.num_active) * td_error
+        return td_error
+
+    def update(self, state: Tuple, action: str, reward: float, next_state: Tuple, done: bool):
+        """
+        Met à jour les poids avec la formule du Q-Learning.
+
+        Args:
+            state: État avant l'action
+            action: Action effectuée
+            reward: Récompense reçue
+            next_state: État après l'action
+            done: Si True, l'épisode est terminé
+        """
+        self.store_experience(state, action, reward, next_state, done)
+        td_error = self._td_update(state, action, reward, next_state, done, self.alpha)
+        self.counters.record_visit(state[:7], action, td_error)
+
+    def replay_experience(self, batch_size: int = 32):
+        """
+        Rejoue des expériences du buffer (même priorisation que QLearningAgent).
+
+        Args:
+            batch_size: Nombre d'expériences à rejouer
+
+        Returns:
+            Nombre de mises à jour effectuées (0 si le buffer est trop petit)
+        """
+        if len(self.experience_buffer) < batch_size:
+            return 0
+
+        weights = [abs(exp[2]) + 0.1 for exp in self.experience_buffer]
+        batch = self.rng.choices(self.experience_buffer, weights=weights, k=batch_size)
+        replay_alpha = max(self.alpha * 0.7, 0.02)
+
+        for state, action, reward, next_state, done in batch:
+            td_error = self._td_update(state, action, reward, next_state, done, replay_alpha)
+            self.counters.record_update(state[:7], action, td_error)
+        return batch_size
+
+    def _q_table_data(self) -> Dict:
+        """Pas de Q-table sauvegardée : les valeurs se déduisent des poids."""
+        return {}
+
+    def _save_data(self) -> Dict:
+        """Contenu de la sauvegarde : poids et paramètres du tile coding au lieu de la Q-table."""
+        data = super()._save_data()
+        data["tile_coding"] = self.coder.config()
+        data["weights"] = self.weights.tolist()
+        return data
+
+    def _load_data(self, data: Dict):
+        """Restaure l'agent, tile coding et poids compris."""
+        super()._load_data(data)
+        self._action_index = {a: i for i, a in enumerate(self.actions)}
+        self.coder = TileCoder(**data["tile_coding"])
+        self.weights = np.array(data["weights"], dtype=np.float64).reshape(len(self.actions), self.coder.num_features)
+
+    def get_stats(self) -> Dict:
+        """
+        Retourne des statistiques sur l'agent (dont le tile coding).
+
+        Returns:
+            Dictionnaire de statistiques
+        """
+        stats = super().get_stats()
+        stats.update({
+            "num_features": self.coder.num_features,
+            "active_tiles": self.coder.num_active,
+            "num_weights": int(self.weights.size),
+            **self.coder.config()
+        })
+        return stats
+
+
+class LinearPolicy:
+    """
+    Politique gloutonne figée d'un LinearQAgent (même interface que
+    policy.PolicyTable) : tuiles d'un lot d'états, puis une seule somme
+    vectorisée des poids.
+    """
+
+    def __init__(self, actions: List[str], coder: TileCoder, weights: np.ndarray):
+        """
+        Args:
+            actions: Actions (ordre des colonnes)
+            coder: Tile coding de l'agent
+            weights: Poids (actions x num_features), copiés
+        """
+        self.actions = list(actions)
+        self.coder = coder
+        self.weights = np.array(weights)
+
+    @classmethod
+    def from_agent(cls, agent: LinearQAgent) -> "LinearPolicy":
+        return cls(agent.actions, agent.coder, agent.weights)
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.weights.any(axis=0)))
+
+    def act(self, states: Sequence[Tuple]) -> Dict:
+        """
+        Calcule les actions gloutonnes d'un lot d'états.
+
+        Args:
+            states: États "features"
+
+        Returns:
+            {"actions": indices d'actions, "q_values": matrice (lot x actions),
+             "known": booléens (au moins une tuile active apprise, hors biais)}
+        """
+        tiles = self.coder.encode_batch(states)
+        # (actions, lot, tuiles actives) -> somme sur les tuiles
+        selected = self.weights[:, tiles]
+        q_values = selected.sum(axis=2).T
+        # Le biais (dernière tuile active) est appris dès la première mise à jour
+        known = selected[:, :, :-1].any(axis=(0, 2))
+        return {
+            "actions": q_values.argmax(axis=1),
+            "q_values": q_values,
+            "known": known,
+        }
@@ -0,0 +1,361 @@
+"""
+Test de charge de l'API Mini-Pacman
+Générateur de trafic local (en processus ou via HTTP) : débit, latences p50/p95/p99,
+croissance mémoire, par mélange de requêtes et niveau de concurrence
+
+Usage:
+    python loadtest.py --mix results=6,replay=3 --mix results=6,replay=3,train=1 \\
+        --concurrency 1,4,16 --duration 10
+    python loadtest.py --url http://localhost:5000 --pid <pid du serveur> --concurrency 8,32
+
+En processus, l'application tourne dans ce processus (client de test Flask,
+un par thread) avec des dossiers de modèles et de résultats temporaires :
+mesure le code de l'API, sans réseau ni serveur WSGI. Via HTTP (--url), un
+serveur lancé à part (api.py ou server.py) est mesuré de bout en bout.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Requêtes disponibles dans les mélanges : (méthode, chemin, corps JSON)
+REQUESTS = {
+    "health": ("GET", "/api/health", None),
+    "results": ("GET", "/api/results?series=false", None),
+    "series": ("GET", "/api/results/series?points=300", None),
+    "graph": ("GET", "/api/results/graphs/rewards", None),
+    "replay": ("POST", "/api/replay", {"max_steps": 200}),
+    "replay_delta": ("POST", "/api/replay", {"max_steps": 200, "format": "delta"}),
+    "act": ("POST", "/api/act", {"states": [[0, 0, 0, 0, 0, 0, 0]] * 64}),
+    "train": ("POST", "/api/train", {"num_episodes": 50, "max_steps": 200}),
+}
+
+# Entraînement préalable quand aucun modèle n'existe (results, replay... renvoient 404 sinon)
+WARMUP_TRAINING = {"num_episodes": 100, "max_steps": 200}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Lit un mélange de requêtes "nom=poids,nom=poids".
+
+    Args:
+        text: Mélange (ex: "results=6,replay=3,train=1")
+
+    Returns:
+        {nom: poids}
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in REQUESTS:
+            raise ValueError(f"Requête inconnue: {name} (disponibles: {', '.join(REQUESTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Percentile par interpolation linéaire.
+
+    Args:
+        sorted_values: Valeurs triées
+        q: Percentile (0-100)
+
+    Returns:
+        Valeur du percentile (0.0 si aucune valeur)
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def _process_tree(pid: int) -> List[int]:
+    """Processus et ses descendants (Linux)."""
+    pids = [pid]
+    for current in pids:
+        try:
+            for tid in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{tid}/children") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return pids
+
+
+def rss_bytes(pid: int = None) -> Optional[int]:
+    """
+    Mémoire résidente d'un processus et de ses descendants.
+
+    Avec server.py, le pid du maître couvre les processus de requêtes et
+    celui des tâches ; les pages partagées (modèles préchargés) sont
+    comptées dans chaque processus : seule l'évolution est significative.
+
+    Args:
+        pid: Processus (None = processus courant, sans descendants)
+
+    Returns:
+        Octets, ou None si indisponible
+    """
+    total = None
+    for current in (_process_tree(pid) if pid else ["self"]):
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total = (total or 0) + int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    if total is None and pid is None:
+        # Hors Linux : pic de mémoire (ko sous Linux, octets sous macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    return total
+
+
+class InProcessClient:
+    """Client de test Flask (un par thread)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, int]:
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, len(response.get_data())
+
+
+class HttpClient:
+    """Connexion HTTP persistante (keep-alive) vers un serveur lancé à part."""
+
+    def __init__(self, url: str, timeout: float = 300.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, int]:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, len(response.read())
+            except (http.client.HTTPException, ConnectionError):
+                # Connexion fermée par le serveur (rechargement...) : une seconde tentative
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+
+def run_level(make_client: Callable, mix: Dict[str, float], concurrency: int,
+              duration: float = None, num_requests: int = None, seed: int = 0,
+              server_pid: int = None) -> Dict:
+    """
+    Envoie le mélange de requêtes depuis `concurrency` threads.
+
+    Chaque thread tire ses requêtes selon les poids du mélange et enchaîne
+    sans pause (boucle fermée) : le débit mesuré est la capacité du serveur
+    à ce niveau de concurrence.
+
+    Args:
+        make_client: Fabrique de client (appelée une fois par thread)
+        mix: {nom de requête: poids}
+        concurrency: Nombre de threads clients
+        duration: Durée du palier (s), si num_requests n'est pas fourni
+        num_requests: Nombre total de requêtes du palier
+        seed: Graine du tirage des requêtes
+        server_pid: Processus dont la mémoire est suivie (None = courant)
+
+    Returns:
+        Rapport du palier (voir summarize)
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    # Jetons de requêtes : next() sur itertools.count est atomique, sans verrou
+    tokens = itertools.count()
+    samples = [[] for _ in range(concurrency)]  # un tableau par thread : aucun verrou
+    start_barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index: int):
+        client = make_client()
+        rng = random.Random(seed * 1000 + index)
+        out = samples[index]
+        start_barrier.wait()
+        while True:
+            if num_requests is not None:
+                if next(tokens) >= num_requests:
+                    return
+            elif time.perf_counter() >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            method, path, body = REQUESTS[name]
+            begin = time.perf_counter()
+            try:
+                status, size = client.request(method, path, body)
+            except Exception:
+                status, size = 0, 0
+            out.append((name, time.perf_counter() - begin, status, size))
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    rss_start = rss_bytes(server_pid)
+    started = time.perf_counter()
+    deadline = started + (duration or 0)
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    rss_end = rss_bytes(server_pid)
+
+    report = summarize([s for per_thread in samples for s in per_thread], elapsed)
+    report.update({
+        "mix": mix,
+        "concurrency": concurrency,
+        "rss_start_mb": rss_start / 2**20 if rss_start is not None else None,
+        "rss_end_mb": rss_end / 2**20 if rss_end is not None else None,
+        "rss_growth_mb": (rss_end - rss_start) / 2**20 if None not in (rss_start, rss_end) else None,
+    })
+    return report
+
+
+def _latency_stats(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+    }
+
+
+def summarize(samples: List[Tuple], elapsed: float) -> Dict:
+    """
+    Agrège les mesures d'un palier, globalement et par requête.
+
+    Args:
+        samples: [(nom, latence s, statut HTTP, octets)] (statut 0 = erreur réseau)
+        elapsed: Durée du palier (s)
+
+    Returns:
+        {"elapsed", "total": stats, "by_request": {nom: stats}} avec stats =
+        requests, errors, throughput (req/s), mean/p50/p95/p99/max_ms
+    """
+    by_name = {}
+    for name, latency, status, _ in samples:
+        entry = by_name.setdefault(name, ([], [0]))
+        entry[0].append(latency)
+        if not 200 <= status < 400:
+            entry[1][0] += 1
+
+    return {
+        "elapsed": elapsed,
+        "total": _latency_stats(
+            [s[1] for s in samples],
+            sum(errors[0] for _, errors in by_name.values()),
+            elapsed
+        ),
+        "by_request": {
+            name: _latency_stats(latencies, errors[0], elapsed)
+            for name, (latencies, errors) in sorted(by_name.items())
+        },
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Tableau texte d'un palier."""
+    mix = ",".join(f"{name}={weight:g}" for name, weight in report["mix"].items())
+    lines = [f"\n[{mix}] concurrence {report['concurrency']} | {report['elapsed']:.1f} s"]
+    if report["rss_growth_mb"] is not None:
+        lines[0] += (f" | RSS {report['rss_start_mb']:.0f} -> {report['rss_end_mb']:.0f} Mo "
+                     f"({report['rss_growth_mb']:+.1f})")
+    lines.append(f"  {'requête':<14}{'n':>7}{'err':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    rows = list(report["by_request"].items()) + [("total", report["total"])]
+    for name, stats in rows:
+        lines.append(
+            f"  {name:<14}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def ensure_model(client):
+    """Entraîne un premier modèle si l'API n'en a aucun."""
+    # /api/results répond 200 même sans modèle ; /api/replay répond 404
+    status, _ = client.request("POST", "/api/replay", {"max_steps": 1})
+    if status == 404:
+        print("Aucun modèle : entraînement préalable...")
+        client.request("POST", "/api/train", WARMUP_TRAINING)
+
+
+def main(argv: List[str] = None) -> List[Dict]:
+    parser = argparse.ArgumentParser(description="Test de charge de l'API Mini-Pacman")
+    parser.add_argument("--url", help="serveur à mesurer (défaut: application en processus)")
+    parser.add_argument("--pid", type=int, help="processus du serveur dont la mémoire est suivie, descendants compris (avec --url)")
+    parser.add_argument("--mix", action="append",
+                        help=f"mélange nom=poids,... (répétable ; requêtes: {', '.join(REQUESTS)})")
+    parser.add_argument("--concurrency", default="1,4,16", help="niveaux de concurrence (ex: 1,4,16)")
+    parser.add_argument("--duration", type=float, default=10.0, help="durée de chaque palier (s)")
+    parser.add_argument("--requests", type=int, help="nombre de requêtes par palier (au lieu de --duration)")
+    parser.add_argument("--train-episodes", type=int, default=50, help="épisodes des requêtes train")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="fichier où écrire le rapport complet")
+    args = parser.parse_args(argv)
+
+    mixes = [parse_mix(text) for text in (args.mix or ["results=6,replay=3,train=1"])]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    REQUESTS["train"][2]["num_episodes"] = args.train_episodes
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+        server_pid = args.pid
+    else:
+        # Dossiers temporaires : les modèles entraînés par le test ne polluent pas saved_models
+        data_dir = tempfile.mkdtemp(prefix="pacman-loadtest-")
+        os.environ.setdefault("PACMAN_MODELS_DIR", os.path.join(data_dir, "models"))
+        os.environ.setdefault("PACMAN_RESULTS_DIR", os.path.join(data_dir, "results"))
+        import api
+        make_client = lambda: InProcessClient(api.app)
+        server_pid = None
+
+    ensure_model(make_client())
+
+    reports = []
+    for mix in mixes:
+        for level in levels:
+            report = run_level(make_client, mix, level, duration=args.duration,
+                               num_requests=args.requests, seed=args.seed, server_pid=server_pid)
+            print(format_report(report), flush=True)
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nRapport écrit dans {args.json}")
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+"""
+Métriques opérationnelles au format texte Prometheus
+Compteurs, jauges et histogrammes à écriture sans verrou (un fragment par thread)
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# Bornes (secondes) des histogrammes de latence : des requêtes de lecture
+# (quelques ms) aux entraînements synchrones (plusieurs minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Nombre de fragments au-delà duquel ceux des threads terminés sont fusionnés
+_MAX_SHARDS = 64
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Shards:
+    """
+    Tableaux de valeurs, un par thread écrivain.
+
+    Chaque thread n'écrit que dans son propre fragment (pas de verrou ni de
+    mise à jour perdue) ; le verrou n'est pris qu'à la création d'un
+    fragment et à la lecture. Les fragments des threads terminés (un thread
+    par requête avec le serveur threadé) sont fusionnés dans une base.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []  # [(thread, fragment)]
+        self._base = [0.0] * size
+
+    def get(self) -> List[float]:
+        """Fragment du thread courant."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0.0] * self.size
+            with self._lock:
+                if len(self._shards) >= _MAX_SHARDS:
+                    self._fold()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _fold(self):
+        """Fusionne les fragments des threads terminés (verrou pris)."""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                for i, value in enumerate(shard):
+                    self._base[i] += value
+        self._shards = alive
+
+    def total(self) -> List[float]:
+        """Somme de tous les fragments."""
+        with self._lock:
+            self._fold()
+            totals = list(self._base)
+            for _, shard in self._shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+        return totals
+
+
+class _Metric:
+    """Famille de métriques, avec ou sans étiquettes."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lookup = {}  # valeurs brutes -> série (évite de reconvertir à chaque appel)
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            # Sans étiquettes, la famille s'utilise directement comme sa série
+            # unique : méthodes liées une fois (aucune indirection à l'écriture)
+            child = self._children[()] = self._new_child()
+            for attr in ("inc", "set", "observe", "time", "value"):
+                if hasattr(child, attr):
+                    setattr(self, attr, getattr(child, attr))
+
+    def labels(self, *values):
+        """
+        Retourne la série correspondant aux valeurs d'étiquettes (créée au besoin).
+
+        Args:
+            *values: Valeurs, dans l'ordre de `labelnames`
+        """
+        child = self._lookup.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} attend les étiquettes {self.labelnames}")
+            key = tuple(str(v) for v in values)
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+                self._lookup[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self) -> Dict:
+        """
+        Valeurs courantes de la famille.
+
+        Returns:
+            {"kind", "help", "labelnames", "buckets", "series": {valeurs d'étiquettes: totaux}}
+        """
+        with self._lock:
+            children = list(self._children.items())
+        return {
+            "kind": self.kind,
+            "help": self.documentation,
+            "labelnames": self.labelnames,
+            "buckets": getattr(self, "buckets", ()),
+            "series": {values: child.totals() for values, child in children},
+        }
+
+
+class _CounterChild:
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, amount: float = 1.0):
+        self._shards.get()[0] += amount
+
+    def value(self) -> float:
+        return self._shards.total()[0]
+
+    def totals(self) -> List[float]:
+        return self._shards.total()
+
+
+class Counter(_Metric):
+    """Compteur monotone (le débit s'obtient avec rate() côté Prometheus)."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def value(self) -> float:
+        return self._value
+
+    def totals(self) -> List[float]:
+        return [self._value]
+
+
+class Gauge(_Metric):
+    """
+    Valeur instantanée, fixée par set() ou calculée à la lecture.
+
+    Une jauge calculée (set_function) ne coûte rien hors des lectures de
+    /metrics : la fonction retourne une valeur, ou un dictionnaire
+    {valeurs d'étiquettes: valeur} pour une famille étiquetée.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self._function = None
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set_function(self, function: Callable):
+        """
+        Calcule la jauge à chaque lecture.
+
+        Args:
+            function: Fonction sans argument retournant la valeur
+                (ou {tuple de valeurs d'étiquettes: valeur})
+        """
+        self._function = function
+
+    def collect(self) -> Dict:
+        family = super().collect()
+        if self._function is not None:
+            result = self._function()
+            if not self.labelnames:
+                result = {(): result}
+            family["series"] = {tuple(str(v) for v in values): [value] for values, value in result.items()}
+        return family
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Un compteur par intervalle (dernier = au-delà de la dernière borne), puis la somme
+        self._shards = _Shards(len(buckets) + 2)
+
+    def observe(self, value: float):
+        shard = self._shards.get()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def time(self):
+        """Contexte mesurant la durée de son bloc."""
+        return _Timer(self)
+
+    def totals(self) -> List[float]:
+        return self._shards.total()
+
+
+class _Timer:
+    def __init__(self, histogram: _HistogramChild):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    """Distribution d'observations par intervalles (latences)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+
+def _render_family(name: str, family: Dict) -> List[str]:
+    """Lignes au format texte Prometheus d'une famille collectée."""
+    labelnames = tuple(family["labelnames"])
+    lines = [f"# HELP {name} {family['help']}", f"# TYPE {name} {family['kind']}"]
+    for values, totals in family["series"].items():
+        labels = _format_labels(labelnames, values)
+        if family["kind"] != "histogram":
+            lines.append(f"{name}{labels} {_format_value(totals[0])}")
+            continue
+        cumulative = 0.0
+        for bound, count in zip(tuple(family["buckets"]) + (float("inf"),), totals[:-1]):
+            cumulative += count
+            bucket_labels = _format_labels(labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{name}_bucket{bucket_labels} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{labels} {_format_value(totals[-1])}")
+        lines.append(f"{name}_count{labels} {_format_value(cumulative)}")
+    return lines
+
+
+class MetricsRegistry:
+    """
+    Ensemble de familles de métriques rendues ensemble.
+
+    Avec plusieurs processus servant les mêmes requêtes (server.py), chacun
+    peut partager ses compteurs et histogrammes via un dossier commun
+    (share) : chaque processus y écrit périodiquement ses totaux et
+    render() les additionne, y compris ceux des processus arrêtés
+    (les compteurs restent monotones après un rechargement).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._shared_dir = None
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Métrique {name} déjà enregistrée ({metric.kind})")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Retourne le compteur `name` (créé au premier appel)."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Retourne la jauge `name` (créée au premier appel)."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Retourne l'histogramme `name` (créé au premier appel)."""
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def collect(self) -> Dict[str, Dict]:
+        """Valeurs courantes de toutes les familles ({nom: famille})."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.collect() for metric in metrics}
+
+    def share(self, directory: str, interval: float = 5.0):
+        """
+        Partage les compteurs et histogrammes de ce processus (après fork).
+
+        Args:
+            directory: Dossier commun aux processus
+            interval: Intervalle d'écriture des totaux (s)
+        """
+        self._shared_dir = directory
+        self._shared_path = os.path.join(directory, f"{os.getpid()}.json")
+        self.write_shared()
+        thread = threading.Thread(target=self._share_loop, args=(interval,), name="metrics-share", daemon=True)
+        thread.start()
+
+    def _share_loop(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.write_shared()
+
+    def write_shared(self):
+        """Écrit les totaux de ce processus dans le dossier partagé (écriture atomique)."""
+        if self._shared_dir is None:
+            return
+        snapshot = {
+            name: dict(family, series=[[list(values), totals] for values, totals in family["series"].items()])
+            for name, family in self.collect().items()
+            if family["kind"] != "gauge"
+        }
+        tmp_path = self._shared_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self._shared_path)
+
+    def _merge_shared(self, families: Dict[str, Dict]):
+        """Ajoute aux familles locales les totaux écrits par les autres processus."""
+        for filename in os.listdir(self._shared_dir):
+            path = os.path.join(self._shared_dir, filename)
+            if not filename.endswith(".json") or path == self._shared_path:
+                continue
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, other in snapshot.items():
+                family = families.setdefault(name, dict(other, series={}))
+                for values, totals in other["series"]:
+                    values = tuple(values)
+                    current = family["series"].get(values)
+                    family["series"][values] = (
+                        totals if current is None else [a + b for a, b in zip(current, totals)]
+                    )
+
+    def render(self) -> str:
+        """
+        Rend toutes les familles au format texte Prometheus (version 0.0.4).
+
+        Returns:
+            Texte terminé par un saut de ligne
+        """
+        families = self.collect()
+        if self._shared_dir is not None:
+            self._merge_shared(families)
+        lines = []
+        for name, family in families.items():
+            lines.extend(_render_family(name, family))
+        return "\n".join(lines) + "\n"
+
+
+# Métriques du processus servant les requêtes (latences HTTP)
+REGISTRY = MetricsRegistry()
+
+# Métriques du processus exécutant les entraînements (le même en
+# développement, le processus des tâches avec server.py)
+TRAINING_REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- Entraînements ---
+
+ENV_STEPS = TRAINING_REGISTRY.counter(
+    "pacman_env_steps_total", "Pas d'environnement joués pendant les entraînements")
+AGENT_UPDATES = TRAINING_REGISTRY.counter(
+    "pacman_agent_updates_total", "Mises à jour de la Q-table (réelles, replay et planification)")
+EPISODES = TRAINING_REGISTRY.counter(
+    "pacman_training_episodes_total", "Épisodes d'entraînement terminés")
+
+# Entraînements en cours : {agent: débits du dernier épisode}, oubliés avec l'agent
+_active_trainings = weakref.WeakKeyDictionary()
+_active_lock = threading.Lock()
+
+
+def training_started(agent) -> Dict:
+    """
+    Déclare un entraînement en cours (jauges Q-table, buffer et débits).
+
+    Args:
+        agent: Agent entraîné
+
+    Returns:
+        État à passer à record_episode
+    """
+    run = {"steps_per_sec": 0.0, "updates_per_sec": 0.0}
+    with _active_lock:
+        _active_trainings[agent] = run
+    return run
+
+
+def training_finished(agent):
+    """Retire un entraînement des jauges."""
+    with _active_lock:
+        _active_trainings.pop(agent, None)
+
+
+def record_episode(run: Dict, steps: int, updates: int, duration: float):
+    """
+    Enregistre un épisode d'entraînement (appelé une fois par épisode).
+
+    Args:
+        run: État retourné par training_started
+        steps: Pas joués
+        updates: Mises à jour de la Q-table
+        duration: Durée de l'épisode (s)
+    """
+    ENV_STEPS.inc(steps)
+    AGENT_UPDATES.inc(updates)
+    EPISODES.inc()
+    if duration > 0:
+        run["steps_per_sec"] = steps / duration
+        run["updates_per_sec"] = updates / duration
+
+
+def _snapshot() -> List[Tuple]:
+    with _active_lock:
+        return list(_active_trainings.items())
+
+
+def _sum_over_trainings(value: Callable) -> Callable[[], float]:
+    return lambda: sum(value(agent, run) for agent, run in _snapshot())
+
+
+TRAINING_REGISTRY.gauge(
+    "pacman_trainings_active", "Entraînements en cours dans ce processus"
+).set_function(lambda: len(_snapshot()))
+TRAINING_REGISTRY.gauge(
+    "pacman_env_steps_per_second", "Pas d'environnement par seconde (dernier épisode, somme des entraînements)"
+).set_function(_sum_over_trainings(lambda agent, run: run["steps_per_sec"]))
+TRAINING_REGISTRY.gauge(
+    "pacman_agent_updates_per_second", "Mises à jour par seconde (dernier épisode, somme des entraînements)"
+).set_function(_sum_over_trainings(lambda agent, run: run["updates_per_sec"]))
+TRAINING_REGISTRY.gauge(
+    "pacman_qtable_entries", "Entrées des Q-tables en cours d'entraînement"
+).set_function(_sum_over_trainings(lambda agent, run: len(agent.Q)))
+TRAINING_REGISTRY.gauge(
+    "pacman_replay_buffer_entries", "Transitions dans les buffers de replay en cours d'entraînement"
+).set_function(_sum_over_trainings(lambda agent, run: len(getattr(agent, "experience_buffer", ()))))
+TRAINING_REGISTRY.gauge(
+    "pacman_replay_buffer_capacity", "Capacité des buffers de replay en cours d'entraînement"
+).set_function(_sum_over_trainings(lambda agent, run: getattr(agent, "buffer_size", 0)))
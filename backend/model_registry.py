@@ -0,0 +1,405 @@
+"""
+Registre des modèles entraînés
+Catalogue indexé sur disque, agents et statistiques gardés en mémoire dans un cache LRU
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from environment import MiniPacmanEnv
+from policy import PolicyTable
+from run_config import ENV_KEYS, AGENT_TYPES, EXPERIMENTAL_AGENT_TYPES, agent_class
+
+
+class LRUCache:
+    """Dictionnaire borné : l'entrée la moins récemment utilisée est évincée."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, max_size)
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def peek(self, key):
+        """Lit une entrée sans la promouvoir ni compter de succès / échec."""
+        return self._data.get(key)
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ModelRegistry:
+    """
+    Catalogue des modèles entraînés.
+
+    Chaque modèle a un identifiant et des métadonnées (configuration,
+    résumé des statistiques, évaluations) rangées dans un index JSON unique
+    (`catalog.json`). La Q-table et les statistiques complètes sont dans des
+    fichiers séparés, chargés à la demande puis gardés dans un cache LRU
+    borné : les requêtes répétées sur un modèle ne relisent pas le disque et
+    la mémoire reste bornée quel que soit le nombre de modèles.
+
+    Les agents en cache sont partagés entre requêtes : ils ne doivent être
+    utilisés qu'en lecture (choose_action(explore=False)).
+    """
+
+    INDEX_FILE = "catalog.json"
+
+    def __init__(self, root_dir: str, cache_size: int = 8, clock: Callable[[], float] = time.time,
+                 refresh_interval: float = 1.0):
+        """
+        Initialise le registre (et le répertoire s'il n'existe pas).
+
+        Args:
+            root_dir: Répertoire des modèles
+            cache_size: Nombre maximum d'agents (et de statistiques) gardés en mémoire
+            clock: Horloge des dates de création
+            refresh_interval: Délai minimal (s) entre deux vérifications de
+                l'index sur disque par les lectures (resolve, list_models)
+        """
+        self.root_dir = root_dir
+        self.clock = clock
+        self.refresh_interval = refresh_interval
+        self._last_refresh = float('-inf')
+        self._lock = threading.RLock()
+        self._agents = LRUCache(cache_size)
+        self._stats = LRUCache(cache_size)
+        self._policies = LRUCache(cache_size)
+        os.makedirs(root_dir, exist_ok=True)
+        self._index_mtime = None
+        self._index = self._read_index()
+
+    # --- Index ---------------------------------------------------------
+
+    def _index_path(self) -> str:
+        return os.path.join(self.root_dir, self.INDEX_FILE)
+
+    def _read_index(self) -> Dict:
+        try:
+            self._index_mtime = os.stat(self._index_path()).st_mtime_ns
+            with open(self._index_path(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"latest": None, "models": {}}
+
+    def refresh(self, max_age: float = 0.0) -> bool:
+        """
+        Relit l'index s'il a été modifié par un autre processus (ex: un
+        entraînement terminé dans le processus des tâches).
+
+        Args:
+            max_age: Ne pas consulter le disque si la dernière vérification
+                date de moins de max_age secondes
+
+        Returns:
+            True si l'index a changé
+        """
+        now = time.monotonic()
+        if now - self._last_refresh < max_age:
+            return False
+        self._last_refresh = now
+        try:
+            mtime = os.stat(self._index_path()).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            if mtime == self._index_mtime:
+                return False
+            self._index = self._read_index()
+            # Modèles supprimés ailleurs : ne plus les servir depuis le cache
+            for cache in (self._agents, self._stats, self._policies):
+                for model_id in [key for key in cache._data if key not in self._index["models"]]:
+                    cache.pop(model_id)
+            return True
+
+    def catalog_signature(self) -> Tuple:
+        """
+        Résumé du catalogue qui change quand un modèle est ajouté ou supprimé
+        (pas quand ses métadonnées, ex: évaluations, sont modifiées).
+
+        Returns:
+            (dernier modèle, identifiants des modèles)
+        """
+        with self._lock:
+            return self._index["latest"], frozenset(self._index["models"])
+
+    def _write_index(self):
+        """Écrit l'index de façon atomique (fichier temporaire puis renommage)."""
+        tmp_path = f"{self._index_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self._index_path())
+        self._index_mtime = os.stat(self._index_path()).st_mtime_ns
+
+    def _path(self, model_id: str, kind: str) -> str:
+        return os.path.join(self.root_dir, f"{model_id}.{kind}.json")
+
+    def resolve(self, model_id: Optional[str]) -> Optional[str]:
+        """
+        Résout un identifiant ("latest" ou None = dernier modèle enregistré).
+
+        Args:
+            model_id: Identifiant de modèle
+
+        Returns:
+            Identifiant existant, ou None
+        """
+        self.refresh(self.refresh_interval)
+        with self._lock:
+            if model_id in (None, "", "latest"):
+                return self._index["latest"]
+            return model_id if model_id in self._index["models"] else None
+
+    # --- Enregistrement ------------------------------------------------
+
+    def register(self, model_id: str, agent, config: Dict, stats: Dict, env_config: Dict,
+                 agent_type: str = "qlearning") -> Dict:
+        """
+        Enregistre un modèle entraîné (fichiers, index) et le place en cache.
+
+        Args:
+            model_id: Identifiant (ex: identifiant de la tâche d'entraînement)
+            agent: Agent entraîné
+            config: Configuration d'entraînement
+            stats: Statistiques de train_agent / run_curriculum
+            env_config: Paramètres de MiniPacmanEnv (voir ENV_KEYS)
+            agent_type: Type d'agent (voir AGENT_TYPES)
+
+        Returns:
+            Métadonnées du modèle
+        """
+        agent.save(self._path(model_id, "agent"))
+        with open(self._path(model_id, "stats"), 'w') as f:
+            json.dump(stats, f)
+
+        metadata = {
+            "id": model_id,
+            "created_at": self.clock(),
+            "agent_type": agent_type,
+            "config": dict(config),
+            "env": {key: env_config[key] for key in ENV_KEYS if key in env_config},
+            "summary": {key: value for key, value in stats.items()
+                        if not isinstance(value, (list, dict))},
+            "evaluations": []
+        }
+
+        with self._lock:
+            self.refresh()
+            self._index["models"][model_id] = metadata
+            self._index["latest"] = model_id
+            self._write_index()
+            self._agents.put(model_id, agent)
+            self._stats.put(model_id, stats)
+        return metadata
+
+    def add_evaluation(self, model_id: str, evaluation: Dict):
+        """
+        Ajoute un résultat d'évaluation aux métadonnées d'un modèle.
+
+        Args:
+            model_id: Identifiant du modèle
+            evaluation: Résumé sérialisable en JSON
+        """
+        with self._lock:
+            self.refresh()
+            metadata = self._index["models"].get(model_id)
+            if metadata is None:
+                return
+            metadata["evaluations"].append(dict(evaluation, evaluated_at=self.clock()))
+            self._write_index()
+
+    def delete(self, model_id: str) -> bool:
+        """
+        Supprime un modèle (index, fichiers, cache).
+
+        Args:
+            model_id: Identifiant du modèle
+
+        Returns:
+            True si le modèle existait
+        """
+        with self._lock:
+            self.refresh()
+            if self._index["models"].pop(model_id, None) is None:
+                return False
+            if self._index["latest"] == model_id:
+                remaining = sorted(self._index["models"].values(), key=lambda m: m["created_at"])
+                self._index["latest"] = remaining[-1]["id"] if remaining else None
+            self._write_index()
+            self._agents.pop(model_id)
+            self._stats.pop(model_id)
+            self._policies.pop(model_id)
+        for kind in ("agent", "stats"):
+            try:
+                os.remove(self._path(model_id, kind))
+            except FileNotFoundError:
+                pass
+        return True
+
+    # --- Lecture -------------------------------------------------------
+
+    def list_models(self) -> List[Dict]:
+        """Retourne les métadonnées de tous les modèles, du plus récent au plus ancien."""
+        self.refresh(self.refresh_interval)
+        with self._lock:
+            return sorted(self._index["models"].values(), key=lambda m: m["created_at"], reverse=True)
+
+    def get_metadata(self, model_id: Optional[str]) -> Optional[Dict]:
+        """
+        Retourne les métadonnées d'un modèle.
+
+        Args:
+            model_id: Identifiant ("latest" ou None = dernier modèle)
+
+        Returns:
+            Métadonnées, ou None si inconnu
+        """
+        with self._lock:
+            resolved = self.resolve(model_id)
+            return self._index["models"].get(resolved) if resolved else None
+
+    def _cached(self, cache: LRUCache, model_id: Optional[str], loader: Callable[[str], object]):
+        """Lit une entrée en cache, ou la charge depuis le disque (hors verrou)."""
+        resolved = self.resolve(model_id)
+        if resolved is None:
+            return None
+        with self._lock:
+            value = cache.get(resolved)
+        if value is None:
+            try:
+                value = loader(resolved)
+            except (KeyError, FileNotFoundError):
+                return None  # Supprimé entre-temps
+            with self._lock:
+                # Un autre thread a pu le charger entre-temps : garder le premier
+                existing = cache.peek(resolved)
+                if existing is not None:
+                    return existing
+                cache.put(resolved, value)
+        return value
+
+    def _load_agent(self, model_id: str):
+        agent_type = self._index["models"][model_id].get("agent_type", "qlearning")
+        if agent_type not in AGENT_TYPES and agent_type not in EXPERIMENTAL_AGENT_TYPES:
+            agent_type = "qlearning"
+        agent = agent_class(agent_type)(MiniPacmanEnv.ACTIONS)
+        agent.load(self._path(model_id, "agent"))
+        return agent
+
+    def _load_stats(self, model_id: str) -> Dict:
+        with open(self._path(model_id, "stats"), 'r') as f:
+            return json.load(f)
+
+    def _load_policy(self, model_id: str) -> PolicyTable:
+        agent = self.get_agent(model_id)
+        if agent is None:
+            raise KeyError(model_id)
+        if hasattr(agent, "coder"):
+            # Agent linéaire : pas de Q-table, Q calculé à partir des tuiles actives
+            from linear_agent import LinearPolicy
+            return LinearPolicy.from_agent(agent)
+        return PolicyTable.from_agent(agent)
+
+    def get_agent(self, model_id: Optional[str] = None):
+        """
+        Retourne l'agent d'un modèle (depuis le cache, ou chargé depuis le disque).
+
+        Args:
+            model_id: Identifiant ("latest" ou None = dernier modèle)
+
+        Returns:
+            Agent (à utiliser en lecture seule), ou None si inconnu
+        """
+        return self._cached(self._agents, model_id, self._load_agent)
+
+    def get_stats(self, model_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Retourne les statistiques d'entraînement complètes d'un modèle.
+
+        Args:
+            model_id: Identifiant ("latest" ou None = dernier modèle)
+
+        Returns:
+            Statistiques (séries par épisode comprises), ou None si inconnu
+        """
+        return self._cached(self._stats, model_id, self._load_stats)
+
+    def get_policy(self, model_id: Optional[str] = None) -> Optional[PolicyTable]:
+        """
+        Retourne la Q-table d'un modèle figée en matrice (inférence par lots).
+
+        Args:
+            model_id: Identifiant ("latest" ou None = dernier modèle)
+
+        Returns:
+            PolicyTable, ou None si inconnu
+        """
+        return self._cached(self._policies, model_id, self._load_policy)
+
+    def make_env(self, model_id: Optional[str] = None) -> Optional[MiniPacmanEnv]:
+        """
+        Crée un environnement neuf avec la configuration d'entraînement du modèle.
+
+        Args:
+            model_id: Identifiant ("latest" ou None = dernier modèle)
+
+        Returns:
+            Environnement, ou None si le modèle est inconnu
+        """
+        metadata = self.get_metadata(model_id)
+        if metadata is None:
+            return None
+        return MiniPacmanEnv(**metadata["env"])
+
+    def preload(self, count: int = None) -> List[str]:
+        """
+        Charge en mémoire les modèles les plus récents (agent, statistiques, politique).
+
+        Appelé avant de créer des processus de travail par fork : les pages
+        mémoire des Q-tables sont alors partagées au lieu d'être rechargées
+        par chaque processus.
+
+        Args:
+            count: Nombre de modèles (None = taille du cache)
+
+        Returns:
+            Identifiants chargés
+        """
+        count = self._agents.max_size if count is None else min(count, self._agents.max_size)
+        model_ids = [metadata["id"] for metadata in self.list_models()[:count]]
+        # Du plus ancien au plus récent : le dernier modèle finit en tête du LRU
+        for model_id in reversed(model_ids):
+            self.get_agent(model_id)
+            self.get_stats(model_id)
+            self.get_policy(model_id)
+        return model_ids
+
+    def cache_info(self) -> Dict:
+        """Retourne l'occupation et les taux de succès des caches."""
+        with self._lock:
+            return {
+                name: {"size": len(cache), "max_size": cache.max_size, "hits": cache.hits, "misses": cache.misses}
+                for name, cache in (("agents", self._agents), ("stats", self._stats), ("policies", self._policies))
+            }
@@ -0,0 +1,105 @@
+"""
+Graphiques d'entraînement (Matplotlib, backend non-interactif)
+Module séparé de l'API : importé au premier rendu, pas au démarrage
+"""
+
+from io import BytesIO
+import matplotlib
+matplotlib.use('Agg')  # Backend non-interactif pour serveur
+import matplotlib.pyplot as plt
+import numpy as np
+
+
+def generate_training_graphs(stats: dict) -> dict:
+    """
+    Génère les graphiques d'entraînement avec Matplotlib.
+    
+    Args:
+        stats: Statistiques d'entraînement
+        
+    Returns:
+        Dictionnaire {nom: image PNG}
+    """
+    graphs = {}
+    
+    # 1. Graphique des récompenses
+    fig, ax = plt.subplots(figsize=(10, 6))
+    rewards = stats['rewards_per_episode']
+    episodes = range(1, len(rewards) + 1)
+    
+    # Courbe brute et moyenne glissante
+    ax.plot(episodes, rewards, alpha=0.3, label='Récompense par épisode')
+    
+    # Moyenne glissante sur 50 épisodes
+    window = 50
+    if len(rewards) >= window:
+        moving_avg = np.convolve(rewards, np.ones(window)/window, mode='valid')
+        ax.plot(range(window, len(rewards) + 1), moving_avg, 
+                linewidth=2, label=f'Moyenne glissante ({window} épisodes)')
+    
+    ax.set_xlabel('Épisode')
+    ax.set_ylabel('Récompense totale')
+    ax.set_title('Évolution de la récompense pendant l\'entraînement')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    graphs['rewards'] = fig_to_png(fig)
+    plt.close(fig)
+    
+    # 2. Graphique des pièces collectées
+    fig, ax = plt.subplots(figsize=(10, 6))
+    coins = stats['coins_per_episode']
+    
+    ax.plot(episodes, coins, alpha=0.3, label='Pièces collectées par épisode')
+    
+    if len(coins) >= window:
+        moving_avg = np.convolve(coins, np.ones(window)/window, mode='valid')
+        ax.plot(range(window, len(coins) + 1), moving_avg,
+                linewidth=2, label=f'Moyenne glissante ({window} épisodes)')
+    
+    ax.set_xlabel('Épisode')
+    ax.set_ylabel('Nombre de pièces')
+    ax.set_title('Nombre de pièces collectées pendant l\'entraînement')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    
+    graphs['coins'] = fig_to_png(fig)
+    plt.close(fig)
+    
+    # 3. Graphique du taux de succès
+    fig, ax = plt.subplots(figsize=(10, 6))
+    successes = stats['success_per_episode']
+    
+    if len(successes) >= window:
+        success_rate = np.convolve(successes, np.ones(window)/window, mode='valid') * 100
+        ax.plot(range(window, len(successes) + 1), success_rate,
+                linewidth=2, label=f'Taux de succès ({window} épisodes)')
+    
+    ax.set_xlabel('Épisode')
+    ax.set_ylabel('Taux de succès (%)')
+    ax.set_title('Taux de succès pendant l\'entraînement')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.set_ylim(0, 105)
+    
+    graphs['success_rate'] = fig_to_png(fig)
+    plt.close(fig)
+    
+    return graphs
+
+
+def fig_to_png(fig) -> bytes:
+    """
+    Convertit une figure Matplotlib en image PNG.
+    
+    Args:
+        fig: Figure Matplotlib
+        
+    Returns:
+        Octets de l'image PNG
+    """
+    buffer = BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    image = buffer.getvalue()
+    buffer.close()
+    return image
@@ -0,0 +1,98 @@
+"""
+Inférence vectorisée de la politique gloutonne
+Q-table figée en matrice NumPy, actions et valeurs Q de milliers d'états en un passage
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class PolicyTable:
+    """
+    Vue figée (lecture seule) de la Q-table d'un agent.
+
+    La Q-table dictionnaire {(state, action): valeur} est convertie une fois
+    en une matrice (états x actions) et un index {state: ligne}. Un lot
+    d'états coûte ensuite une recherche dans l'index par état puis une seule
+    indexation NumPy et un argmax vectorisé.
+
+    Les états jamais vus ont des valeurs Q nulles (comme get_Q) ; à égalité,
+    la première action de `actions` est retenue (résultat déterministe, là
+    où choose_action tire au hasard parmi les ex æquo).
+    """
+
+    def __init__(self, actions: List[str], states: List[Tuple], q_matrix: np.ndarray):
+        """
+        Initialise la table.
+
+        Args:
+            actions: Actions (ordre des colonnes)
+            states: États (ordre des lignes)
+            q_matrix: Valeurs Q (len(states) x len(actions))
+        """
+        self.actions = list(actions)
+        self.index = {state: row for row, state in enumerate(states)}
+        # Dernière ligne : zéros, pour les états inconnus
+        self.q_matrix = np.vstack([q_matrix, np.zeros((1, len(self.actions)))])
+        self.unknown_row = len(states)
+
+    @classmethod
+    def from_agent(cls, agent) -> "PolicyTable":
+        """
+        Construit la table à partir de la Q-table d'un agent.
+
+        Args:
+            agent: Agent possédant `actions` et `Q` {(state, action): valeur}
+
+        Returns:
+            PolicyTable
+        """
+        action_index = {a: i for i, a in enumerate(agent.actions)}
+        rows = {}
+        entries = []
+        for (state, action), value in agent.Q.items():
+            row = rows.setdefault(state, len(rows))
+            entries.append((row, action_index[action], value))
+
+        q_matrix = np.zeros((len(rows), len(agent.actions)))
+        if entries:
+            r, c, v = zip(*entries)
+            q_matrix[list(r), list(c)] = v
+        return cls(agent.actions, list(rows), q_matrix)
+
+    def __len__(self) -> int:
+        return self.unknown_row
+
+    def lookup(self, states: Sequence[Tuple]) -> np.ndarray:
+        """
+        Retourne les lignes de la matrice correspondant aux états.
+
+        Args:
+            states: États (tuples hashables)
+
+        Returns:
+            Indices de lignes (unknown_row pour les états inconnus)
+        """
+        get = self.index.get
+        unknown = self.unknown_row
+        return np.fromiter((get(s, unknown) for s in states), dtype=np.int64, count=len(states))
+
+    def act(self, states: Sequence[Tuple]) -> Dict:
+        """
+        Calcule les actions gloutonnes d'un lot d'états.
+
+        Args:
+            states: États (tuples hashables)
+
+        Returns:
+            {"actions": indices d'actions, "q_values": matrice (lot x actions),
+             "known": booléens (état présent dans la Q-table)}
+        """
+        rows = self.lookup(states)
+        q_values = self.q_matrix[rows]
+        return {
+            "actions": q_values.argmax(axis=1),
+            "q_values": q_values,
+            "known": rows != self.unknown_row,
+        }
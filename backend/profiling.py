@@ -0,0 +1,174 @@
+"""
+Instrumentation optionnelle de la boucle d'entraînement
+Chronomètres et compteurs par phase, débits et tailles échantillonnées
+"""
+
+import json
+import time
+from typing import Callable, Dict
+
+
+class TrainingProfiler:
+    """
+    Profileur par phase pour train_agent.
+
+    Chaque phase (choose_action, env_step, ...) est mesurée en enveloppant la
+    fonction correspondante une seule fois avant la boucle : lorsque le
+    profileur est désactivé (None), train_agent appelle les fonctions
+    d'origine et l'instrumentation ne coûte rien.
+    """
+
+    PHASES = [
+        "choose_action",
+        "env_step",
+        "get_state_for_agent",
+        "update",
+        "replay_experience",
+        "decay_epsilon",
+        "evaluation",
+    ]
+
+    def __init__(self, sample_interval: int = 50, clock: Callable[[], float] = time.perf_counter):
+        """
+        Initialise le profileur.
+
+        Args:
+            sample_interval: Intervalle (en épisodes) d'échantillonnage des tailles et débits
+            clock: Horloge haute résolution (secondes)
+        """
+        self.sample_interval = max(1, sample_interval)
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Remet à zéro toutes les mesures."""
+        self.times = {phase: 0.0 for phase in self.PHASES}
+        self.calls = {phase: 0 for phase in self.PHASES}
+        self.total_steps = 0
+        self.total_updates = 0
+        self.episodes = 0
+        self.samples = []
+        self.start_time = self.clock()
+        self._last_sample = (self.start_time, 0, 0)
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        """
+        Enveloppe une fonction pour mesurer son temps d'exécution.
+
+        Args:
+            phase: Nom de la phase (voir PHASES)
+            func: Fonction à mesurer
+
+        Returns:
+            Fonction instrumentée (même signature)
+        """
+        clock = self.clock
+        times = self.times
+        calls = self.calls
+        if phase not in times:
+            times[phase] = 0.0
+            calls[phase] = 0
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            times[phase] += clock() - start
+            calls[phase] += 1
+            return result
+
+        return timed
+
+    def on_episode_end(self, episode: int, steps: int, updates: int, agent):
+        """
+        Enregistre la fin d'un épisode et échantillonne périodiquement les tailles.
+
+        Args:
+            episode: Numéro de l'épisode
+            steps: Nombre de pas joués pendant l'épisode
+            updates: Nombre de mises à jour Q effectuées (pas + replay + planification)
+            agent: Agent entraîné (taille de la Q-table et du buffer)
+        """
+        self.episodes = episode
+        self.total_steps += steps
+        self.total_updates += updates
+
+        if episode % self.sample_interval != 0:
+            return
+
+        now = self.clock()
+        last_time, last_steps, last_updates = self._last_sample
+        window = max(now - last_time, 1e-9)
+        self.samples.append({
+            "episode": episode,
+            "elapsed": now - self.start_time,
+            "steps_per_sec": (self.total_steps - last_steps) / window,
+            "updates_per_sec": (self.total_updates - last_updates) / window,
+            "q_table_size": len(agent.Q),
+            "replay_buffer_size": len(getattr(agent, 'experience_buffer', [])),
+        })
+        self._last_sample = (now, self.total_steps, self.total_updates)
+
+    def get_report(self) -> Dict:
+        """
+        Retourne le rapport de profilage (sérialisable en JSON).
+
+        Returns:
+            Dictionnaire {phases, débits globaux, échantillons}
+        """
+        elapsed = max(self.clock() - self.start_time, 1e-9)
+        measured = sum(self.times.values())
+        phases = {}
+        for phase, total in self.times.items():
+            calls = self.calls[phase]
+            phases[phase] = {
+                "total_time": total,
+                "calls": calls,
+                "mean_us": total / calls * 1e6 if calls else 0.0,
+                "share": total / measured * 100 if measured else 0.0,
+            }
+
+        return {
+            "elapsed": elapsed,
+            "episodes": self.episodes,
+            "total_steps": self.total_steps,
+            "total_updates": self.total_updates,
+            "steps_per_sec": self.total_steps / elapsed,
+            "updates_per_sec": self.total_updates / elapsed,
+            "unmeasured_time": max(elapsed - measured, 0.0),
+            "phases": phases,
+            "samples": self.samples,
+        }
+
+    def format_report(self) -> str:
+        """
+        Génère un rapport texte lisible.
+
+        Returns:
+            Tableau des phases triées par temps total
+        """
+        report = self.get_report()
+        lines = [
+            f"Profil d'entraînement : {report['episodes']} épisodes, "
+            f"{report['total_steps']} pas en {report['elapsed']:.2f}s",
+            f"Débit : {report['steps_per_sec']:.0f} pas/s | "
+            f"{report['updates_per_sec']:.0f} mises à jour/s",
+            f"{'Phase':<22}{'Appels':>10}{'Total (s)':>12}{'Moy. (µs)':>12}{'Part':>8}",
+        ]
+        phases = sorted(report["phases"].items(), key=lambda item: item[1]["total_time"], reverse=True)
+        for phase, data in phases:
+            lines.append(
+                f"{phase:<22}{data['calls']:>10}{data['total_time']:>12.3f}"
+                f"{data['mean_us']:>12.1f}{data['share']:>7.1f}%"
+            )
+        lines.append(f"{'(hors phases)':<22}{'':>10}{report['unmeasured_time']:>12.3f}")
+        return "\n".join(lines)
+
+    def export(self, filepath: str):
+        """
+        Exporte le rapport de profilage en JSON.
+
+        Args:
+            filepath: Chemin du fichier de sortie
+        """
+        with open(filepath, 'w') as f:
+            json.dump(self.get_report(), f, indent=2)
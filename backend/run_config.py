@@ -0,0 +1,278 @@
+"""
+Configuration d'un entraînement
+Lecture (YAML ou JSON), valeurs par défaut, construction de l'environnement et de l'agent
+(partagées par l'API et la CLI)
+"""
+
+import copy
+import importlib
+import json
+import os
+from typing import Dict, List
+
+from environment import MiniPacmanEnv
+
+
+# Paramètres de MiniPacmanEnv conservés dans les métadonnées d'un modèle
+ENV_KEYS = ["grid_size", "num_ghosts", "ghost_behavior", "coins_per_row", "num_lives", "enable_powerups",
+            "state_encoding"]
+
+# Classes d'agent par type (voir "agent_type" de la configuration d'entraînement),
+# sous forme "module:Classe" : un module (et ses dépendances, ex: NumPy pour
+# l'agent linéaire) n'est importé que si son type d'agent est utilisé
+AGENT_TYPES = {
+    "qlearning": "agent:QLearningAgent",
+    "linear": "linear_agent:LinearQAgent",
+}
+
+# Types expérimentaux : construits par build_agent (dyna_benchmark.py) et
+# rechargés depuis les sauvegardes, mais refusés par l'API et la CLI tant
+# que le banc d'essai ne montre pas de gain sur Q-Learning
+EXPERIMENTAL_AGENT_TYPES = {
+    "dyna_q": "dyna_agent:DynaQAgent",
+}
+
+# Encodage d'état de l'environnement par type d'agent (défaut: "zones")
+AGENT_STATE_ENCODINGS = {
+    "linear": "features",
+}
+
+ENV_DEFAULTS = {
+    "grid_size": 10,
+    "num_ghosts": 3,
+    "ghost_behavior": "random",
+    "coins_per_row": 10,
+    "num_lives": 3,
+    "enable_powerups": True,
+    "state_encoding": None,  # None = selon le type d'agent (voir AGENT_STATE_ENCODINGS)
+}
+
+AGENT_DEFAULTS = {
+    "agent_type": "qlearning",
+    "alpha": 0.1,
+    "gamma": 0.9,
+    "epsilon": 1.0,
+    "epsilon_min": 0.01,
+    "epsilon_decay": 0.995,
+    "planning_steps": 10,
+    "num_tilings": 4,
+    "resolutions": [4, 8, 16],
+}
+
+SCHEDULE_DEFAULTS = {
+    "num_episodes": 500,
+    "max_steps": 500,
+    "eval_episodes": 50,
+    "early_stopping": None,
+}
+
+OUTPUT_DEFAULTS = {
+    "dir": "runs",
+    "format": "jsonl",
+    "save_agent": True,
+    "transitions": False,
+}
+
+OUTPUT_FORMATS = ["jsonl", "csv"]
+
+
+def build_env(params: Dict, seed: int = None) -> MiniPacmanEnv:
+    """
+    Crée l'environnement à partir d'une configuration.
+
+    Args:
+        params: Paramètres (clés de ENV_KEYS ; les autres sont ignorées, sauf
+            agent_type qui fixe l'encodage d'état par défaut)
+        seed: Graine de l'environnement
+
+    Returns:
+        Environnement Mini-Pacman
+    """
+    values = {key: params.get(key, ENV_DEFAULTS[key]) for key in ENV_KEYS}
+    if values["state_encoding"] is None:
+        values["state_encoding"] = state_encoding_for(params.get("agent_type", AGENT_DEFAULTS["agent_type"]))
+    return MiniPacmanEnv(**values, seed=seed)
+
+
+def env_config(env: MiniPacmanEnv) -> Dict:
+    """
+    Paramètres d'un environnement (pour le recréer à l'identique).
+
+    Args:
+        env: Environnement Mini-Pacman
+
+    Returns:
+        {clé de ENV_KEYS: valeur}
+    """
+    return {key: getattr(env, key) for key in ENV_KEYS}
+
+
+def state_encoding_for(agent_type: str) -> str:
+    """
+    Encodage d'état attendu par un type d'agent.
+
+    Args:
+        agent_type: Type d'agent (voir AGENT_TYPES)
+
+    Returns:
+        "zones" ou "features" (voir MiniPacmanEnv)
+    """
+    return AGENT_STATE_ENCODINGS.get(agent_type, "zones")
+
+
+def agent_class(agent_type: str) -> type:
+    """
+    Classe d'agent d'un type (module importé au premier appel).
+
+    Args:
+        agent_type: Type d'agent (voir AGENT_TYPES et EXPERIMENTAL_AGENT_TYPES)
+
+    Returns:
+        Classe de l'agent
+    """
+    classes = {**AGENT_TYPES, **EXPERIMENTAL_AGENT_TYPES}
+    if agent_type not in classes:
+        raise ValueError(f"Type d'agent inconnu: {agent_type} (disponibles: {', '.join(AGENT_TYPES)})")
+    module_name, _, class_name = classes[agent_type].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def build_agent(params: Dict, actions: List[str] = None, seed: int = None):
+    """
+    Crée un agent à partir d'une configuration.
+
+    Args:
+        params: Paramètres (agent_type, alpha, gamma, epsilon, epsilon_min,
+            epsilon_decay, planning_steps pour Dyna-Q, num_tilings et
+            resolutions pour l'agent linéaire ; les autres sont ignorés)
+        actions: Actions possibles (défaut: MiniPacmanEnv.ACTIONS)
+        seed: Graine du générateur de l'agent
+
+    Returns:
+        Agent Q-Learning, linéaire ou Dyna-Q (expérimental)
+    """
+    agent_type = params.get("agent_type", AGENT_DEFAULTS["agent_type"])
+    cls = agent_class(agent_type)
+
+    agent_params = {
+        key: params.get(key, AGENT_DEFAULTS[key])
+        for key in ("alpha", "gamma", "epsilon", "epsilon_min", "epsilon_decay")
+    }
+    if agent_type == "dyna_q":
+        agent_params["planning_steps"] = params.get("planning_steps", AGENT_DEFAULTS["planning_steps"])
+    elif agent_type == "linear":
+        for key in ("num_tilings", "resolutions"):
+            agent_params[key] = params.get(key, AGENT_DEFAULTS[key])
+    return cls(actions or MiniPacmanEnv.ACTIONS, **agent_params, seed=seed)
+
+
+def load_run_config(path: str) -> Dict:
+    """
+    Lit un fichier de configuration d'exécution (.yaml, .yml ou .json).
+
+    Structure (toutes les sections sont optionnelles) :
+        name: nom de l'exécution (défaut: nom du fichier)
+        env: paramètres de l'environnement (voir ENV_DEFAULTS)
+        agent: type (ou agent_type) et hyperparamètres (voir AGENT_DEFAULTS)
+        schedule: num_episodes, max_steps, eval_episodes, early_stopping
+        seeds: graines (une exécution par graine)
+        output: dir, format ("jsonl" ou "csv"), save_agent, transitions
+            (journal des transitions, voir transition_log.py)
+
+    Args:
+        path: Chemin du fichier
+
+    Returns:
+        Configuration brute
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("PyYAML est nécessaire pour lire une configuration YAML (pip install pyyaml)")
+            config = yaml.safe_load(f) or {}
+        else:
+            config = json.load(f)
+
+    if not isinstance(config, dict):
+        raise ValueError(f"Configuration invalide: {path}")
+    config.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return config
+
+
+def apply_overrides(config: Dict, overrides: List[str]) -> Dict:
+    """
+    Modifie des valeurs de la configuration ("schedule.num_episodes=100").
+
+    La valeur est lue en JSON si possible (nombres, booléens, listes), sinon
+    gardée comme texte.
+
+    Args:
+        config: Configuration brute
+        overrides: Affectations "section.clé=valeur"
+
+    Returns:
+        Nouvelle configuration
+    """
+    config = copy.deepcopy(config)
+    for override in overrides:
+        path, sep, raw = override.partition("=")
+        if not sep:
+            raise ValueError(f"Affectation invalide (attendu clé=valeur): {override}")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        keys = path.strip().split(".")
+        target = config
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return config
+
+
+def normalize_run_config(config: Dict) -> Dict:
+    """
+    Complète une configuration avec les valeurs par défaut et la valide.
+
+    Args:
+        config: Configuration brute (voir load_run_config)
+
+    Returns:
+        {"name", "env", "agent", "schedule", "seeds", "output"} complets
+    """
+    unknown = set(config) - {"name", "env", "agent", "schedule", "seeds", "output"}
+    if unknown:
+        raise ValueError(f"Sections inconnues: {', '.join(sorted(unknown))}")
+
+    agent = dict(config.get("agent") or {})
+    if "type" in agent:
+        agent["agent_type"] = agent.pop("type")
+
+    sections = {
+        "env": (ENV_DEFAULTS, config.get("env") or {}),
+        "agent": (AGENT_DEFAULTS, agent),
+        "schedule": (SCHEDULE_DEFAULTS, config.get("schedule") or {}),
+        "output": (OUTPUT_DEFAULTS, config.get("output") or {}),
+    }
+    normalized = {"name": str(config.get("name", "run"))}
+    for section, (defaults, values) in sections.items():
+        unknown = set(values) - set(defaults)
+        if unknown:
+            raise ValueError(f"Clés inconnues dans {section}: {', '.join(sorted(unknown))}")
+        normalized[section] = {**defaults, **values}
+
+    if normalized["agent"]["agent_type"] not in AGENT_TYPES:
+        raise ValueError(f"Type d'agent inconnu: {normalized['agent']['agent_type']}")
+    if normalized["env"]["state_encoding"] is None:
+        normalized["env"]["state_encoding"] = state_encoding_for(normalized["agent"]["agent_type"])
+    if normalized["output"]["format"] not in OUTPUT_FORMATS:
+        raise ValueError(f"Format de sortie inconnu: {normalized['output']['format']} "
+                         f"(disponibles: {', '.join(OUTPUT_FORMATS)})")
+
+    seeds = config.get("seeds", [None])
+    if not isinstance(seeds, list):
+        seeds = [seeds]
+    normalized["seeds"] = seeds or [None]
+    return normalized
@@ -0,0 +1,193 @@
+"""
+Séries d'entraînement sous-échantillonnées pour les graphiques côté client
+LTTB ou min/max par paquets, moyennes glissantes précalculées, plage d'épisodes
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+
+# Séries par épisode exposées : {nom: (clé dans stats, facteur d'échelle)}
+SERIES = {
+    "reward": ("rewards_per_episode", 1.0),
+    "coins": ("coins_per_episode", 1.0),
+    "steps": ("steps_per_episode", 1.0),
+    "success": ("success_per_episode", 100.0),  # en %
+}
+
+METHODS = ["lttb", "minmax"]
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Moyenne glissante (fenêtre tronquée sur les premiers épisodes).
+
+    Contrairement à np.convolve(mode='valid'), la série garde la même
+    longueur que l'entrée : le point i est la moyenne des épisodes
+    max(0, i - window + 1) à i.
+
+    Args:
+        values: Série brute
+        window: Taille de la fenêtre
+
+    Returns:
+        Série lissée (même longueur)
+    """
+    window = max(1, window)
+    cumsum = np.concatenate([[0.0], np.cumsum(values, dtype=float)])
+    index = np.arange(1, len(values) + 1)
+    start = np.maximum(index - window, 0)
+    return (cumsum[index] - cumsum[start]) / (index - start)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Sous-échantillonnage Largest-Triangle-Three-Buckets.
+
+    Conserve le premier et le dernier point ; dans chaque paquet
+    intermédiaire, garde le point formant le plus grand triangle avec le
+    point retenu précédemment et la moyenne du paquet suivant. La forme
+    visuelle (pics compris) est préservée bien mieux qu'un pas régulier.
+
+    Args:
+        x: Abscisses (croissantes)
+        y: Ordonnées
+        num_points: Nombre de points souhaité (>= 3)
+
+    Returns:
+        Indices des points retenus
+    """
+    n = len(x)
+    if num_points >= n or num_points < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, num_points - 1).astype(int)
+    selected = np.empty(num_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(num_points - 2):
+        start, end = edges[i], edges[i + 1]
+        # Moyenne du paquet suivant (le dernier point pour le dernier paquet)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Aire (au facteur 1/2 près) de chaque triangle candidat
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        area = np.abs(
+            (x[previous] - avg_x) * (bucket_y - y[previous])
+            - (x[previous] - bucket_x) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+
+    return selected
+
+
+def minmax_buckets(y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Sous-échantillonnage min/max : le minimum et le maximum de chaque paquet.
+
+    Args:
+        y: Ordonnées
+        num_points: Nombre de points souhaité (deux par paquet)
+
+    Returns:
+        Indices des points retenus (croissants)
+    """
+    n = len(y)
+    num_buckets = num_points // 2
+    if num_points >= n or num_buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, num_buckets + 1).astype(int)
+    # Paquets de taille égale à 1 près : traitement vectorisé par reduceat
+    starts = edges[:-1]
+    lengths = np.diff(edges)
+    mins = np.minimum.reduceat(y, starts)
+    maxs = np.maximum.reduceat(y, starts)
+    bucket_of = np.repeat(np.arange(num_buckets), lengths)
+    is_min = y == mins[bucket_of]
+    is_max = y == maxs[bucket_of]
+    # Première occurrence du min et du max de chaque paquet
+    first_min = np.full(num_buckets, n)
+    first_max = np.full(num_buckets, n)
+    positions = np.arange(n)
+    np.minimum.at(first_min, bucket_of[is_min], positions[is_min])
+    np.minimum.at(first_max, bucket_of[is_max], positions[is_max])
+    return np.unique(np.concatenate([first_min, first_max]))
+
+
+def downsample_series(
+    stats: Dict,
+    num_points: int = 500,
+    start: int = 1,
+    end: int = None,
+    method: str = "lttb",
+    window: int = 50,
+    names: List[str] = None
+) -> Dict:
+    """
+    Extrait les séries par épisode d'un entraînement, sous-échantillonnées.
+
+    Les moyennes glissantes sont calculées sur la série complète (avant
+    découpage de la plage), puis sous-échantillonnées comme les séries brutes.
+
+    Args:
+        stats: Statistiques de train_agent / run_curriculum
+        num_points: Nombre maximum de points par série
+        start: Premier épisode de la plage (1-indexé, inclus)
+        end: Dernier épisode de la plage (inclus, None = dernier)
+        method: "lttb" ou "minmax"
+        window: Fenêtre des moyennes glissantes (en épisodes)
+        names: Séries à inclure (voir SERIES ; None = toutes)
+
+    Returns:
+        {"total_episodes", "from", "to", "method", "window",
+         "series": {nom: {"x", "y", "avg_x", "avg_y"}}}
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} (attendu : {', '.join(METHODS)})")
+    names = names or list(SERIES)
+    unknown = [name for name in names if name not in SERIES]
+    if unknown:
+        raise ValueError(f"Séries inconnues : {', '.join(unknown)}")
+
+    total = len(stats.get("rewards_per_episode", []))
+    start = min(max(1, start), max(total, 1))
+    end = total if end is None else min(max(end, start), total)
+    episodes = np.arange(start, end + 1, dtype=float)
+
+    def pick(values: np.ndarray) -> np.ndarray:
+        if method == "lttb":
+            return lttb(episodes, values, num_points)
+        return minmax_buckets(values, num_points)
+
+    series = {}
+    for name in names:
+        key, scale = SERIES[name]
+        values = np.asarray(stats.get(key, []), dtype=float) * scale
+        averages = moving_average(values, window)[start - 1:end]
+        values = values[start - 1:end]
+
+        raw_index = pick(values)
+        avg_index = pick(averages)
+        series[name] = {
+            "x": episodes[raw_index].astype(int).tolist(),
+            "y": np.round(values[raw_index], 4).tolist(),
+            "avg_x": episodes[avg_index].astype(int).tolist(),
+            "avg_y": np.round(averages[avg_index], 4).tolist(),
+        }
+
+    return {
+        "total_episodes": total,
+        "from": start if total else 0,
+        "to": end,
+        "method": method,
+        "window": window,
+        "series": series,
+    }
@@ -0,0 +1,298 @@
+"""
+Serveur de production pour l'API Mini-Pacman
+Processus préforkés partageant les modèles préchargés, entraînements dans un
+processus dédié, rechargement progressif quand un nouveau modèle est publié
+
+Usage:
+    python server.py --port 5000 --workers 4
+
+Signaux (processus maître):
+    SIGHUP           rechargement progressif des processus de requêtes
+    SIGTERM, SIGINT  arrêt (requêtes en cours terminées, puis arrêt forcé)
+"""
+
+import argparse
+import os
+import secrets
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+
+def _run_job_server(address: str, authkey: bytes):
+    """Processus des tâches : JobManager local exposé aux processus de requêtes."""
+    os.environ.pop('PACMAN_JOB_SERVER', None)
+    import api
+    from jobs import JobManager, serve_job_manager
+
+    # Au redémarrage, le processus est forké du maître, où api est déjà importé
+    # avec un RemoteJobManager (client de ce même socket) : JobManager local
+    manager = api.job_manager
+    if not isinstance(manager, JobManager):
+        manager = JobManager(
+            runner=api.run_training_job,
+            max_workers=int(os.environ.get('PACMAN_MAX_JOBS', 2))
+        )
+        api.job_manager = manager
+
+    # Les graphiques sont rendus par les processus de requêtes, à la demande
+    api.PRERENDER_GRAPHS = False
+
+    def stop(signum, frame):
+        manager.shutdown()
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    serve_job_manager(manager, address, authkey)
+
+
+def _run_worker(app, listen_fd: int, host: str, port: int, metrics_dir: str):
+    """Processus de requêtes : serveur WSGI multithread sur le socket hérité du maître."""
+    from werkzeug.serving import make_server
+    import metrics
+
+    # Latences additionnées entre processus de requêtes (/metrics)
+    metrics.REGISTRY.share(metrics_dir)
+    server = make_server(host, port, app, threaded=True, fd=listen_fd)
+    # Arrêt gracieux : server_close() attend la fin des requêtes en cours
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        # shutdown() attend la fin de serve_forever : à appeler depuis un autre thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server.serve_forever()
+    server.server_close()
+    metrics.REGISTRY.write_shared()
+
+
+class PreforkServer:
+    """
+    Maître du serveur de production.
+
+    Le maître ouvre le socket d'écoute, lance le processus des tâches, importe
+    l'application et précharge les modèles récents, puis crée les processus
+    de requêtes par fork : ils héritent du socket (le noyau répartit les
+    connexions) et partagent les pages mémoire des modèles préchargés.
+
+    Quand le catalogue des modèles change (entraînement terminé) ou sur
+    SIGHUP, le maître précharge à nouveau, crée une nouvelle génération de
+    processus puis arrête l'ancienne en la laissant finir ses requêtes.
+    """
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 5000, workers: int = None,
+                 preload: int = None, graceful_timeout: float = 30.0, watch_interval: float = 1.0):
+        """
+        Initialise le maître.
+
+        Args:
+            host: Adresse d'écoute
+            port: Port d'écoute
+            workers: Nombre de processus de requêtes (None = nombre de CPU)
+            preload: Nombre de modèles préchargés avant fork (None = taille du cache)
+            graceful_timeout: Délai laissé aux requêtes en cours avant arrêt forcé (s)
+            watch_interval: Intervalle de surveillance du catalogue et des processus (s)
+        """
+        self.host = host
+        self.port = port
+        self.num_workers = workers or os.cpu_count() or 1
+        self.preload = preload
+        self.graceful_timeout = graceful_timeout
+        self.watch_interval = watch_interval
+        self.workers = set()
+        self.retiring = {}  # {pid: date limite d'arrêt}
+        self.job_pid = None
+        self.api = None
+        self._catalog = None  # modèles servis et dernier modèle (voir catalog_signature)
+        self._reload_requested = False
+        self._stop_requested = False
+
+    def _fork(self, target, *args) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Gestionnaires du maître hérités : un SIGTERM reçu avant que le
+            # processus n'installe les siens doit l'arrêter, pas être ignoré
+            for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, signal.SIG_DFL)
+            code = 0
+            try:
+                target(*args)
+            except Exception:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        return pid
+
+    def _start_job_server(self):
+        if os.path.exists(self.job_address):
+            os.unlink(self.job_address)
+        self.job_pid = self._fork(_run_job_server, self.job_address, self.job_authkey)
+        deadline = time.time() + 30
+        while not os.path.exists(self.job_address):
+            if time.time() > deadline:
+                raise RuntimeError("Le processus des tâches n'a pas démarré")
+            time.sleep(0.05)
+
+    def _spawn_worker(self):
+        pid = self._fork(_run_worker, self.api.app, self.socket.fileno(), self.host, self.port, self.metrics_dir)
+        self.workers.add(pid)
+
+    def _spawn_workers(self):
+        for _ in range(self.num_workers):
+            self._spawn_worker()
+
+    def _preload(self):
+        loaded = self.api.registry.preload(self.preload)
+        print(f"[maître] {len(loaded)} modèle(s) préchargé(s)", flush=True)
+
+    def reload(self):
+        """Précharge le catalogue courant et remplace les processus de requêtes."""
+        self._preload()
+        old_workers = self.workers
+        self.workers = set()
+        self._spawn_workers()
+        deadline = time.time() + self.graceful_timeout
+        for pid in old_workers:
+            self._signal(pid, signal.SIGTERM)
+            self.retiring[pid] = deadline
+        print(f"[maître] rechargement : {len(self.workers)} nouveau(x) processus", flush=True)
+
+    @staticmethod
+    def _signal(pid: int, signum: int):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        """Récupère les processus terminés et remplace ceux qui sont morts inopinément."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.retiring:
+                del self.retiring[pid]
+            elif pid in self.workers:
+                self.workers.discard(pid)
+                if not self._stop_requested:
+                    print(f"[maître] processus {pid} arrêté (statut {status}), remplacement", flush=True)
+                    self._spawn_worker()
+            elif pid == self.job_pid and not self._stop_requested:
+                print("[maître] processus des tâches arrêté, redémarrage", flush=True)
+                self._start_job_server()
+                print(f"[maître] tâches: pid {self.job_pid}", flush=True)
+
+        now = time.time()
+        for pid, deadline in list(self.retiring.items()):
+            if now > deadline:
+                self._signal(pid, signal.SIGKILL)
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._reload_requested = True
+        else:
+            self._stop_requested = True
+
+    def stop(self):
+        """Arrête tous les processus (requêtes en cours terminées dans le délai imparti)."""
+        self._stop_requested = True
+        children = list(self.workers) + list(self.retiring) + [self.job_pid]
+        for pid in children:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.time() + self.graceful_timeout
+        remaining = set(children)
+        while remaining and time.time() < deadline:
+            for pid in list(remaining):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    remaining.discard(pid)
+            time.sleep(0.05)
+        for pid in remaining:
+            self._signal(pid, signal.SIGKILL)
+        self.socket.close()
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+    def run(self):
+        """Démarre le serveur et surveille les processus jusqu'à l'arrêt."""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(128)
+        self.socket.set_inheritable(True)
+
+        # Processus des tâches, lancé avant l'import de l'application (aucun thread à forker)
+        self.run_dir = tempfile.mkdtemp(prefix='pacman-server-')
+        self.job_address = os.path.join(self.run_dir, 'jobs.sock')
+        self.metrics_dir = os.path.join(self.run_dir, 'metrics')
+        os.makedirs(self.metrics_dir)
+        self.job_authkey = secrets.token_hex(16).encode()
+        self._start_job_server()
+        os.environ['PACMAN_JOB_SERVER'] = self.job_address
+        os.environ['PACMAN_JOB_AUTHKEY'] = self.job_authkey.decode()
+
+        import api
+        import plotting  # noqa: F401  (Matplotlib chargé une fois, partagé par les processus forkés)
+        self.api = api
+        self._catalog = api.registry.catalog_signature()
+        self._preload()
+        self._spawn_workers()
+
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, self._on_signal)
+        print(f"[maître] http://{self.host}:{self.port} | {self.num_workers} processus de requêtes "
+              f"| tâches: pid {self.job_pid}", flush=True)
+
+        try:
+            while not self._stop_requested:
+                time.sleep(self.watch_interval)
+                self._reap()
+                # Modèle publié ou supprimé, ou SIGHUP (une évaluation ajoutée au
+                # catalogue ne change pas les modèles servis : pas de rechargement)
+                catalog = self._catalog
+                if self.api.registry.refresh():
+                    catalog = self.api.registry.catalog_signature()
+                if self._reload_requested or catalog != self._catalog:
+                    self._reload_requested = False
+                    self._catalog = catalog
+                    self.reload()
+        finally:
+            self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serveur de production de l'API Mini-Pacman")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help="processus de requêtes (défaut: nombre de CPU)")
+    parser.add_argument('--preload', type=int, default=None, help="modèles préchargés avant fork")
+    parser.add_argument('--graceful-timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if not hasattr(os, 'fork'):
+        sys.exit("server.py nécessite fork (Linux, macOS) ; utiliser python api.py")
+
+    PreforkServer(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        preload=args.preload,
+        graceful_timeout=args.graceful_timeout
+    ).run()
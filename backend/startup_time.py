@@ -0,0 +1,134 @@
+"""
+Temps de démarrage des modules du backend
+Chaque import est mesuré dans un interpréteur neuf (processus de travail,
+CLI) ; le cœur d'entraînement ne doit charger ni NumPy, ni Matplotlib, ni Flask
+
+Exemple :
+    python startup_time.py --repeat 5 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+
+# Modules mesurés et dépendances lourdes qu'ils ne doivent pas charger
+MODULES = {
+    "training": ["numpy", "matplotlib", "flask"],
+    "cli": ["numpy", "matplotlib", "flask"],
+    "run_config": ["numpy", "matplotlib", "flask"],
+    "evaluation": ["matplotlib", "flask"],
+    "arena": ["matplotlib", "flask"],
+    "api": ["matplotlib"],
+    "plotting": [],
+}
+
+# Budgets par défaut (ms, médiane) : un processus de travail démarre en quelques dizaines de ms
+BUDGETS = {
+    "training": 100.0,
+    "cli": 100.0,
+    "run_config": 100.0,
+}
+
+HEAVY_MODULES = ["numpy", "matplotlib", "flask"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> Dict:
+    """
+    Mesure l'import d'un module dans des interpréteurs neufs.
+
+    Un premier import (non compté) compile les fichiers .pyc.
+
+    Args:
+        module: Nom du module (depuis le dossier backend)
+        repeat: Nombre de mesures
+
+    Returns:
+        Dictionnaire : médiane, minimum, maximum (ms) et dépendances lourdes chargées
+    """
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    samples = []
+    loaded = []
+    for _ in range(repeat + 1):
+        result = subprocess.run([sys.executable, "-c", code], cwd=backend_dir,
+                                capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(probe["ms"])
+        loaded = probe["loaded"]
+    samples = samples[1:]
+    return {
+        "module": module,
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "loaded": loaded,
+    }
+
+
+def check(results: List[Dict], budgets: Dict[str, float]) -> List[str]:
+    """
+    Compare les mesures aux budgets et aux dépendances interdites (voir MODULES).
+
+    Args:
+        results: Mesures (voir measure_import)
+        budgets: {module: budget en ms}
+
+    Returns:
+        Liste des dépassements (vide si tout est conforme)
+    """
+    failures = []
+    for result in results:
+        module = result["module"]
+        forbidden = [name for name in result["loaded"] if name in MODULES.get(module, [])]
+        if forbidden:
+            failures.append(f"{module} charge {', '.join(forbidden)}")
+        budget = budgets.get(module)
+        if budget is not None and result["median_ms"] > budget:
+            failures.append(f"{module} : {result['median_ms']:.0f} ms (budget {budget:.0f} ms)")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Temps de démarrage des modules du backend")
+    parser.add_argument("modules", nargs="*", help=f"modules à mesurer (défaut: {', '.join(MODULES)})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", action="append", default=[], metavar="MODULE=MS",
+                        help="budget d'import (répétable ; remplace les budgets par défaut)")
+    parser.add_argument("--json", help="fichier où écrire les mesures")
+    args = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        budgets[name] = float(value)
+
+    results = [measure_import(module, args.repeat) for module in args.modules or MODULES]
+    for result in results:
+        loaded = ", ".join(result["loaded"]) or "-"
+        print(f"{result['module']:>12} | {result['median_ms']:7.1f} ms "
+              f"[{result['min_ms']:.1f}, {result['max_ms']:.1f}] | chargés: {loaded}")
+
+    failures = check(results, budgets)
+    for failure in failures:
+        print(f"DÉPASSEMENT : {failure}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results, "failures": failures}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""
+Couverture de l'espace d'états et de la Q-table
+Compteurs compacts par (état, action) tenus par l'agent, et analyses associées
+"""
+
+import math
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class StateActionCounters:
+    """
+    Compteurs par paire (état, action), dans des tableaux `array` plats
+    (une ligne de len(actions) cases par état, dans l'ordre de découverte).
+
+    - visits : transitions réelles (pas de l'environnement)
+    - updates : toutes les mises à jour de Q(s, a) (réelles, replay, planification)
+    - erreur TD : moyenne et variance (Welford) des erreurs des mises à jour
+      réelles et de replay (pas de la planification, appliquée en lot)
+
+    Chaque enregistrement coûte une recherche dans un dictionnaire et
+    quelques écritures dans des tableaux : assez peu pour rester actif en
+    production. L'historique de couverture est relevé une fois par épisode.
+    """
+
+    # Nombre maximum de points de l'historique (ensuite, un point sur deux est retiré)
+    MAX_HISTORY = 512
+
+    def __init__(self, actions: List[str]):
+        """
+        Args:
+            actions: Actions de l'agent (ordre des colonnes)
+        """
+        self.actions = list(actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.width = len(self.actions)
+        self.rows = {}
+        self.states = []
+        self.visits = array("I")
+        self.updates = array("I")
+        self.td_mean = array("d")
+        self.td_m2 = array("d")
+        self.td_count = array("I")
+        self.states_visited = 0
+        self.pairs_visited = 0
+        self.total_updates = 0
+        self.history = []
+        self.history_stride = 1
+        self._episodes = 0
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def _add_row(self, state: Tuple) -> int:
+        row = len(self.states)
+        self.rows[state] = row
+        self.states.append(state)
+        self.visits.extend([0] * self.width)
+        self.updates.extend([0] * self.width)
+        self.td_mean.extend([0.0] * self.width)
+        self.td_m2.extend([0.0] * self.width)
+        self.td_count.extend([0] * self.width)
+        return row
+
+    def _first_visit(self, index: int):
+        self.pairs_visited += 1
+        base = index - index % self.width
+        if not any(self.visits[base:base + self.width]):
+            self.states_visited += 1
+
+    def _observe_td(self, index: int, td_error: float):
+        count = self.td_count[index] + 1
+        self.td_count[index] = count
+        mean = self.td_mean[index]
+        delta = td_error - mean
+        mean += delta / count
+        self.td_mean[index] = mean
+        self.td_m2[index] += delta * (td_error - mean)
+
+    def record_visit(self, state: Tuple, action: str, td_error: float) -> int:
+        """
+        Enregistre une transition réelle et la mise à jour de Q associée.
+
+        Args:
+            state: État de départ
+            action: Action effectuée
+            td_error: Erreur TD de la mise à jour
+
+        Returns:
+            Indice de la paire dans les tableaux (voir add_updates)
+        """
+        row = self.rows.get(state)
+        if row is None:
+            row = self._add_row(state)
+        index = row * self.width + self.action_index[action]
+        visits = self.visits[index]
+        if visits == 0:
+            self._first_visit(index)
+        self.visits[index] = visits + 1
+        self.updates[index] += 1
+        self.total_updates += 1
+        self._observe_td(index, td_error)
+        return index
+
+    def record_update(self, state: Tuple, action: str, td_error: float):
+        """
+        Enregistre une mise à jour sans transition réelle (replay).
+
+        Args:
+            state: État mis à jour
+            action: Action mise à jour
+            td_error: Erreur TD de la mise à jour
+        """
+        row = self.rows.get(state)
+        if row is None:
+            row = self._add_row(state)
+        index = row * self.width + self.action_index[action]
+        self.updates[index] += 1
+        self.total_updates += 1
+        self._observe_td(index, td_error)
+
+    def add_updates(self, indices: List[int]):
+        """
+        Compte un lot de mises à jour sans erreur TD (planification vectorisée).
+
+        Args:
+            indices: Indices de paires renvoyés par record_visit
+        """
+        updates = self.updates
+        for index in indices:
+            updates[index] += 1
+        self.total_updates += len(indices)
+
+    def end_episode(self, episode: int, q_entries: int):
+        """
+        Relève un point de l'historique de couverture (un épisode sur history_stride).
+
+        Args:
+            episode: Numéro de l'épisode terminé
+            q_entries: Taille de la Q-table
+        """
+        self._episodes += 1
+        if self._episodes % self.history_stride:
+            return
+        self.history.append((episode, self.states_visited, self.pairs_visited, q_entries, self.total_updates))
+        if len(self.history) >= self.MAX_HISTORY:
+            self.history = self.history[1::2]
+            self.history_stride *= 2
+
+    def to_dict(self) -> Dict:
+        """Représentation sérialisable en JSON (voir from_dict)."""
+        return {
+            "states": [list(state) for state in self.states],
+            "visits": self.visits.tolist(),
+            "updates": self.updates.tolist(),
+            "td_mean": self.td_mean.tolist(),
+            "td_m2": self.td_m2.tolist(),
+            "td_count": self.td_count.tolist(),
+            "total_updates": self.total_updates,
+            "history": self.history,
+            "history_stride": self.history_stride,
+            "episodes": self._episodes,
+        }
+
+    @classmethod
+    def from_dict(cls, actions: List[str], data: Dict) -> "StateActionCounters":
+        """
+        Recrée des compteurs sauvegardés avec to_dict.
+
+        Args:
+            actions: Actions de l'agent
+            data: Compteurs sauvegardés
+
+        Returns:
+            Compteurs
+        """
+        counters = cls(actions)
+        counters.states = [tuple(state) for state in data["states"]]
+        counters.rows = {state: row for row, state in enumerate(counters.states)}
+        counters.visits = array("I", data["visits"])
+        counters.updates = array("I", data["updates"])
+        counters.td_mean = array("d", data["td_mean"])
+        counters.td_m2 = array("d", data["td_m2"])
+        counters.td_count = array("I", data["td_count"])
+        counters.total_updates = data["total_updates"]
+        counters.history = [tuple(point) for point in data["history"]]
+        counters.history_stride = data["history_stride"]
+        counters._episodes = data["episodes"]
+        width = len(actions)
+        counters.pairs_visited = sum(1 for v in counters.visits if v)
+        counters.states_visited = sum(
+            1 for row in range(len(counters.states)) if any(counters.visits[row * width:(row + 1) * width])
+        )
+        return counters
+
+
+def coverage_report(
+    counters: StateActionCounters,
+    state_space: Optional[List[Tuple]] = None,
+    top: int = 20,
+    min_count: int = 10
+) -> Dict:
+    """
+    Analyse de la couverture et de la répartition de l'apprentissage.
+
+    Args:
+        counters: Compteurs de l'agent
+        state_space: États possibles (ex: MiniPacmanEnv.state_space()) pour
+            lister les états jamais visités (None = pas de comparaison)
+        top: Nombre d'états listés par catégorie
+        min_count: Nombre minimum d'erreurs TD observées pour classer une paire
+            par variance
+
+    Returns:
+        Dictionnaire : totaux, concentration des mises à jour, paires à forte
+        variance TD, états jamais visités, historique de couverture
+    """
+    width = len(counters.actions)
+    num_states = len(counters.states)
+
+    state_visits = [sum(counters.visits[row * width:(row + 1) * width]) for row in range(num_states)]
+    state_updates = [sum(counters.updates[row * width:(row + 1) * width]) for row in range(num_states)]
+    total_visits = sum(state_visits)
+    total_updates = counters.total_updates
+
+    # Concentration : part des mises à jour consacrée aux 1 %, 10 % états les plus mis à jour
+    ranked_updates = sorted(state_updates, reverse=True)
+    concentration = {}
+    for share in (0.01, 0.1, 0.5):
+        count = max(1, math.ceil(num_states * share)) if num_states else 0
+        concentration[f"top_{int(share * 100)}pct_states"] = (
+            sum(ranked_updates[:count]) / total_updates if total_updates else 0.0
+        )
+
+    busiest = sorted(range(num_states), key=lambda row: state_updates[row], reverse=True)[:top]
+
+    td_pairs = []
+    for index, count in enumerate(counters.td_count):
+        if count >= min_count:
+            variance = counters.td_m2[index] / (count - 1)
+            td_pairs.append((variance, index, count))
+    td_pairs.sort(reverse=True)
+
+    report = {
+        "states_seen": num_states,
+        "states_visited": counters.states_visited,
+        "pairs_visited": counters.pairs_visited,
+        "pairs_possible": num_states * width,
+        "total_visits": total_visits,
+        "total_updates": total_updates,
+        "single_visit_pairs": sum(1 for v in counters.visits if v == 1),
+        "update_concentration": concentration,
+        "busiest_states": [
+            {"state": list(counters.states[row]), "visits": state_visits[row], "updates": state_updates[row]}
+            for row in busiest
+        ],
+        "high_td_variance": [
+            {
+                "state": list(counters.states[index // width]),
+                "action": counters.actions[index % width],
+                "td_count": count,
+                "td_mean": counters.td_mean[index],
+                "td_std": math.sqrt(variance)
+            }
+            for variance, index, count in td_pairs[:top]
+        ],
+        "coverage_history": [
+            {"episode": episode, "states_visited": states, "pairs_visited": pairs,
+             "q_entries": q_entries, "total_updates": updates}
+            for episode, states, pairs, q_entries, updates in counters.history
+        ],
+    }
+
+    if state_space is not None:
+        visited = {counters.states[row] for row in range(num_states) if state_visits[row]}
+        never = [state for state in state_space if state not in visited]
+        report["state_space_size"] = len(state_space)
+        report["state_coverage"] = (len(state_space) - len(never)) / len(state_space) if state_space else 0.0
+        report["never_visited_count"] = len(never)
+        report["never_visited"] = [list(state) for state in never[:top]]
+        # États visités hors de l'espace énuméré (abstraction différente de celle attendue)
+        report["unexpected_states"] = len(visited - set(state_space))
+
+    return report
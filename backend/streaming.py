@@ -0,0 +1,105 @@
+"""
+Réponses HTTP en flux : NDJSON et compression gzip / deflate incrémentale
+"""
+
+import json
+import time
+import zlib
+from typing import Iterable, Iterator, Optional
+
+
+# Encodages supportés, par ordre de préférence, et leur paramètre wbits de zlib
+ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Choisit l'encodage de la réponse à partir de l'en-tête Accept-Encoding.
+
+    Args:
+        accept_encoding: Valeur de l'en-tête (ex: "gzip, deflate;q=0.5, br")
+
+    Returns:
+        "gzip", "deflate", ou None (pas de compression)
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def ndjson_lines(items: Iterable) -> Iterator[bytes]:
+    """
+    Sérialise des objets en NDJSON (un objet JSON compact par ligne).
+
+    Args:
+        items: Objets sérialisables en JSON
+
+    Yields:
+        Lignes encodées en UTF-8
+    """
+    dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+    for item in items:
+        yield (dumps(item) + "\n").encode("utf-8")
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: Optional[str], flush_bytes: int = 16384,
+                    flush_interval: float = 0.05) -> Iterator[bytes]:
+    """
+    Compresse un flux de morceaux sans attendre la fin.
+
+    Le premier morceau est émis immédiatement (temps avant la première image
+    minimal), puis les morceaux sont regroupés avant un Z_SYNC_FLUSH, au plus
+    tard après `flush_bytes` octets non compressés ou `flush_interval`
+    secondes : le client peut décompresser tout ce qu'il a reçu et ne reste
+    jamais longtemps sans image, et le dictionnaire est conservé d'un bloc à
+    l'autre (les images successives, très semblables, se compressent entre
+    elles).
+
+    Args:
+        chunks: Morceaux non compressés
+        encoding: "gzip", "deflate" ou None (flux renvoyé tel quel)
+        flush_bytes: Taille non compressée maximale entre deux vidages
+        flush_interval: Délai maximal (s) entre deux vidages
+
+    Yields:
+        Morceaux compressés
+    """
+    if encoding is None:
+        yield from chunks
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, ENCODINGS[encoding])
+    pending = 0
+    last_flush = None
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        pending += len(chunk)
+        now = time.monotonic()
+        if last_flush is None or pending >= flush_bytes or now - last_flush >= flush_interval:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+            last_flush = now
+        if data:
+            yield data
+    yield compressor.flush(zlib.Z_FINISH)
@@ -0,0 +1,230 @@
+import gzip
+import importlib
+import json
+import os
+
+import pytest
+
+TRAIN_CONFIG = {"grid_size": 6, "num_ghosts": 1, "coins_per_row": 3, "num_episodes": 10, "max_steps": 50}
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """Module api sur des dossiers de modèles et de résultats temporaires."""
+    root = tmp_path_factory.mktemp("api")
+    previous = {key: os.environ.get(key) for key in ("PACMAN_MODELS_DIR", "PACMAN_RESULTS_DIR")}
+    os.environ["PACMAN_MODELS_DIR"] = str(root / "models")
+    os.environ["PACMAN_RESULTS_DIR"] = str(root / "results")
+    try:
+        module = importlib.import_module("api")
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    yield module
+    module.job_manager.shutdown()
+
+
+@pytest.fixture(scope="module")
+def client(api):
+    return api.app.test_client()
+
+
+@pytest.fixture(scope="module")
+def model_id(client):
+    """Modèle entraîné une fois pour tout le module (POST /api/train)."""
+    response = client.post("/api/train", json=TRAIN_CONFIG)
+    assert response.status_code == 200
+    return response.get_json()["job_id"]
+
+
+def test_train_registers_latest_model(client, model_id):
+    models = client.get("/api/models").get_json()
+    assert models["latest"] == model_id
+    assert [model["id"] for model in models["models"]] == [model_id]
+
+    model = client.get(f"/api/models/{model_id}").get_json()["model"]
+    assert model["env"]["grid_size"] == 6
+    assert client.get("/api/models/latest").get_json()["model"]["id"] == model_id
+    assert client.get("/api/models/unknown").status_code == 404
+
+
+def test_delete_model(client, api):
+    job_id = client.post("/api/jobs", json=dict(TRAIN_CONFIG, num_episodes=5)).get_json()["job_id"]
+    api.job_manager.wait(job_id, timeout=60)
+    assert client.delete(f"/api/models/{job_id}").get_json() == {"success": True}
+    assert client.delete(f"/api/models/{job_id}").status_code == 404
+    assert client.get(f"/api/models/{job_id}").status_code == 404
+
+
+def test_jobs_lifecycle(client, api):
+    assert client.post("/api/jobs", data="null", content_type="application/json").status_code == 400
+
+    response = client.post("/api/jobs", json=dict(TRAIN_CONFIG, num_episodes=5), headers={"X-Client-Id": "alice"})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+    assert api.job_manager.wait(job_id, timeout=60)["status"] == "completed"
+
+    job = client.get(f"/api/jobs/{job_id}").get_json()["job"]
+    assert job["owner"] == "alice" and job["status"] == "completed"
+    assert job_id in [job["job_id"] for job in client.get("/api/jobs").get_json()["jobs"]]
+
+    result = client.get(f"/api/jobs/{job_id}/result").get_json()
+    assert result["stats"]["model_id"] == job_id and result["stats"]["num_episodes"] == 5
+
+    assert client.post(f"/api/jobs/{job_id}/cancel").status_code == 404
+    for path in ("", "/result"):
+        assert client.get(f"/api/jobs/unknown{path}").status_code == 404
+    api.registry.delete(job_id)
+
+
+def test_job_events(client, api):
+    job_id = client.post("/api/jobs", json=dict(TRAIN_CONFIG, num_episodes=5)).get_json()["job_id"]
+    api.job_manager.wait(job_id, timeout=60)
+
+    events = client.get(f"/api/jobs/{job_id}/events").get_data(as_text=True)
+    assert "event: progress" in events
+    assert events.rstrip().split("\n\n")[-1].startswith("event: status")
+    # Reprise après le dernier événement : seul l'état final est renvoyé
+    resumed = client.get(f"/api/jobs/{job_id}/events", headers={"Last-Event-ID": "1000"}).get_data(as_text=True)
+    assert "event: progress" not in resumed and "event: status" in resumed
+    assert client.get("/api/jobs/unknown/events").status_code == 404
+    api.registry.delete(job_id)
+
+
+def test_cancel_queued_job(client, api):
+    blocking = [client.post("/api/jobs", json=dict(TRAIN_CONFIG, num_episodes=5000)).get_json()["job_id"]
+                for _ in range(api.job_manager.max_workers + 1)]
+    queued = blocking[-1]
+    response = client.post(f"/api/jobs/{queued}/cancel")
+    assert response.status_code == 200
+    assert response.get_json()["job"]["status"] == "cancelled"
+    assert client.get(f"/api/jobs/{queued}/result").status_code == 409
+    for job_id in blocking[:-1]:
+        client.post(f"/api/jobs/{job_id}/cancel")
+        api.job_manager.wait(job_id, timeout=60)
+
+
+def test_curriculum_rejects_unsupported_options(client, api):
+    submitted = len(api.job_manager.list_jobs())
+    for option in ({"early_stopping": {"patience": 2}}, {"profile": True}):
+        for endpoint in ("/api/train", "/api/jobs"):
+            response = client.post(endpoint, json=dict(TRAIN_CONFIG, curriculum=True, **option))
+            assert response.status_code == 400
+            assert "curriculum" in response.get_json()["message"]
+    assert len(api.job_manager.list_jobs()) == submitted
+
+
+def test_train_rejects_experimental_agent_types(client):
+    for agent_type in ("dyna_q", "sarsa"):
+        response = client.post("/api/jobs", json=dict(TRAIN_CONFIG, agent_type=agent_type))
+        assert response.status_code == 400
+        assert agent_type in response.get_json()["message"]
+
+
+def test_results_series(client, model_id):
+    response = client.get("/api/results/series?points=5&series=reward,success")
+    data = response.get_json()
+    assert data["run_id"] == model_id and data["total_episodes"] == 10
+    assert set(data["series"]) == {"reward", "success"}
+    assert len(data["series"]["reward"]["x"]) <= 5
+
+    etag = response.headers["ETag"]
+    cached = client.get("/api/results/series?points=5&series=reward,success", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert client.get("/api/results/series?method=mean").status_code == 400
+
+
+def test_results_graphs(client, model_id):
+    response = client.get(f"/api/results/graphs/rewards?run={model_id}")
+    assert response.status_code == 200 and response.mimetype == "image/png"
+    assert response.data.startswith(b"\x89PNG")
+    assert "immutable" in response.headers["Cache-Control"]
+
+    cached = client.get(f"/api/results/graphs/rewards?run={model_id}",
+                        headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get("/api/results/graphs/unknown").status_code == 404
+
+    results = client.get("/api/results?series=false").get_json()
+    assert results["graphs"]["rewards"] == f"/api/results/graphs/rewards?run={model_id}"
+    assert "rewards_per_episode" not in results["stats"]
+
+
+def test_replay_stream(client, model_id):
+    frames = client.post("/api/replay/stream", json={"max_steps": 20}).get_data()
+    lines = [json.loads(line) for line in frames.splitlines()]
+    assert 1 < len(lines) <= 21
+
+    response = client.post("/api/replay/stream", json={"max_steps": 20, "format": "delta"},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    header, *deltas = [json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()]
+    assert "keyframe" in header and len(deltas) == len(lines) - 1
+
+    assert client.post("/api/replay/stream", json={"model_id": "unknown"}).status_code == 404
+
+
+def test_evaluate(client, api, model_id):
+    response = client.post("/api/evaluate", json={"num_episodes": 4, "max_steps": 30, "workers": 1})
+    report = response.get_json()["report"]
+    assert set(report["agents"]) == {model_id, "random"}
+    assert api.registry.get_metadata(model_id)["evaluations"][-1]["num_episodes"] == 4
+    assert client.post("/api/evaluate", json={"model_id": "unknown"}).status_code == 404
+    assert client.post("/api/evaluate", json={"models": ["unknown"], "num_episodes": 2}).status_code == 404
+
+
+def test_seeded_training_is_reproducible(client, api):
+    job_ids = [client.post("/api/train", json=dict(TRAIN_CONFIG, seed=7)).get_json()["job_id"] for _ in range(2)]
+    q_tables = [dict(api.registry.get_agent(job_id).Q) for job_id in job_ids]
+    for job_id in job_ids:
+        api.registry.delete(job_id)
+    assert q_tables[0] and q_tables[0] == q_tables[1]
+
+
+def test_arena(client, model_id):
+    response = client.post("/api/arena", json={"num_episodes": 4, "max_steps": 30, "workers": 1})
+    report = response.get_json()["report"]
+    assert [row["model_id"] for row in report["leaderboard"]] == [model_id]
+    assert report["episodes_played"] == 4
+
+    again = client.post("/api/arena", json={"num_episodes": 4, "max_steps": 30, "workers": 1}).get_json()
+    assert again["report"]["episodes_cached"] == 4
+    assert client.post("/api/arena", json={"models": ["unknown"]}).status_code == 404
+
+
+def test_act(client, api, model_id):
+    state = next(iter(api.registry.get_agent(model_id).Q))[0]
+    response = client.post("/api/act", json={"states": [list(state), [0, 0, 0, "up", 0, 0, "none"]]})
+    data = response.get_json()
+    assert data["model_id"] == model_id
+    assert data["known"] == [True, False]
+    assert len(data["q_values"]) == 2 and all(action in data["action_order"] for action in data["actions"])
+
+    raw = {"pacman_pos": [1, 1], "ghosts_pos": [[4, 4]], "coins": [[2, 1]]}
+    encoded = client.post("/api/act", json={"raw_states": [raw], "include_q": False}).get_json()
+    assert len(encoded["states"][0]) == 7 and "q_values" not in encoded
+
+    assert client.post("/api/act", json={"raw_states": [{"coins": []}]}).status_code == 400
+    too_many = [{}] * (api.MAX_ACT_BATCH + 1)
+    assert client.post("/api/act", json={"raw_states": too_many}).status_code == 413
+    assert client.post("/api/act", json={"model_id": "unknown", "states": []}).status_code == 404
+
+
+def test_model_coverage(client, model_id):
+    coverage = client.get(f"/api/models/{model_id}/coverage?top=3").get_json()["coverage"]
+    assert coverage["states_visited"] > 0
+    assert len(coverage["busiest_states"]) <= 3
+    assert coverage["coverage_history"][-1]["episode"] == 10
+    assert client.get("/api/models/unknown/coverage").status_code == 404
+
+
+def test_metrics(client, model_id):
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain")
+    text = response.get_data(as_text=True)
+    assert 'pacman_http_request_duration_seconds_count{route="/api/train",method="POST",status="200"}' in text
+    assert "pacman_training_episodes_total" in text
+    assert 'pacman_jobs{status="completed"}' in text
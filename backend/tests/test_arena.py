@@ -0,0 +1,26 @@
+from agent import QLearningAgent
+from arena import run_arena, suite_key
+from environment import MiniPacmanEnv
+
+
+def test_suite_key_depends_on_conditions():
+    assert suite_key({"grid_size": 6}, 100) == suite_key({"grid_size": 6}, 100)
+    assert suite_key({"grid_size": 6}, 100) != suite_key({"grid_size": 6}, 200)
+    assert suite_key({"grid_size": 6}, 100) != suite_key({"grid_size": 8}, 100)
+
+
+def test_arena_ranks_models_and_caches_episodes(registry):
+    registry.register("empty", QLearningAgent(MiniPacmanEnv.ACTIONS), {}, {}, registry.get_metadata("m1")["env"])
+    options = dict(seeds=list(range(6)), max_steps=40, workers=1, num_resamples=50, verbose=False)
+
+    report = run_arena(registry.root_dir, **options)
+    assert [row["rank"] for row in report["leaderboard"]] == [1, 2]
+    assert {row["model_id"] for row in report["leaderboard"]} == {"m1", "empty"}
+    assert report["episodes_played"] == 12 and report["episodes_cached"] == 0
+
+    again = run_arena(registry.root_dir, **options)
+    assert again["episodes_played"] == 0 and again["episodes_cached"] == 12
+    assert again["leaderboard"] == report["leaderboard"]
+
+    partial = run_arena(registry.root_dir, model_ids=["m1"], **dict(options, seeds=list(range(8))))
+    assert partial["episodes_played"] == 2
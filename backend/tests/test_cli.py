@@ -0,0 +1,38 @@
+import csv
+import json
+
+import pytest
+
+from cli import main
+from transition_log import TransitionDataset
+
+
+def test_cli_runs_each_seed(tmp_path, capsys):
+    config = tmp_path / "run.json"
+    config.write_text(json.dumps({
+        "name": "petit",
+        "env": {"grid_size": 6, "num_ghosts": 1, "coins_per_row": 3},
+        "schedule": {"num_episodes": 5, "max_steps": 40, "eval_episodes": 2},
+        "output": {"transitions": True},
+    }))
+    summaries = main([str(config), "--seeds", "0,1", "--output-dir", str(tmp_path / "runs"),
+                      "--format", "csv", "--quiet"])
+
+    assert [summary["seed"] for summary in summaries] == [0, 1]
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["num_episodes"] for line in lines] == [5, 5]
+
+    run_dir = tmp_path / "runs" / "petit" / "seed_0"
+    with open(run_dir / "episodes.csv") as f:
+        assert [row["episode"] for row in csv.DictReader(f)] == ["1", "2", "3", "4", "5"]
+    assert (run_dir / "agent.json").exists()
+    assert json.loads((run_dir / "summary.json").read_text())["evaluation"] is not None
+    # Entraînement et évaluation dans le même journal
+    assert TransitionDataset(summaries[0]["transitions_dir"]).num_episodes == 7
+
+
+def test_cli_reports_invalid_config(tmp_path):
+    config = tmp_path / "bad.json"
+    config.write_text(json.dumps({"agent": {"type": "sarsa"}}))
+    with pytest.raises(SystemExit):
+        main([str(config)])
@@ -0,0 +1,52 @@
+from agent import QLearningAgent
+from curriculum import make_stages, run_curriculum
+from environment import MiniPacmanEnv
+from linear_agent import LinearQAgent
+
+
+def test_make_stages_splits_the_total_budget():
+    stages = make_stages({"grid_size": 10, "num_ghosts": 3}, max_episodes=1000)
+    assert [stage["name"] for stage in stages] == ["facile", "moyen", "cible"]
+    assert sum(stage["max_episodes"] for stage in stages) == 1000
+    assert stages[-1]["max_episodes"] >= 500
+    assert stages[0]["max_episodes"] < stages[1]["max_episodes"]
+    assert stages[-1]["threshold"] is None
+
+
+def test_make_stages_drops_empty_stages():
+    stages = make_stages({"grid_size": 10}, max_episodes=4)
+    assert [stage["name"] for stage in stages] == ["moyen", "cible"]
+    assert [stage["max_episodes"] for stage in stages] == [1, 3]
+    assert [stage["name"] for stage in make_stages({"grid_size": 6})] == ["cible"]
+
+
+def test_make_stages_keeps_state_encoding():
+    stages = make_stages({"grid_size": 10, "state_encoding": "features"}, max_episodes=1000)
+    assert all(stage["env"]["state_encoding"] == "features" for stage in stages)
+    assert all("state_encoding" not in stage["env"] for stage in make_stages({"grid_size": 10})[:-1])
+
+
+def test_run_curriculum_reports_stages():
+    stages = [
+        {"name": "a", "env": {"grid_size": 6, "num_ghosts": 1, "coins_per_row": 2}, "threshold": 100.0,
+         "max_episodes": 10},
+        {"name": "b", "env": {"grid_size": 6, "num_ghosts": 1, "coins_per_row": 3}, "threshold": None,
+         "max_episodes": 5},
+    ]
+    progress = []
+    stats = run_curriculum(QLearningAgent(MiniPacmanEnv.ACTIONS), stages, max_steps=40, episodes_per_round=5,
+                           eval_episodes=3, verbose=False, progress_callback=progress.append)
+    assert stats["num_episodes"] == len(stats["rewards_per_episode"]) == 15
+    first, second = stats["curriculum"]
+    assert len(first["evaluations"]) == 2 and not first["promoted"]
+    assert second["evaluations"] == [] and second["final_success_rate"] is None
+    assert [p["episode"] for p in progress] == list(range(1, 16))
+    assert progress[-1]["stage"] == "b" and progress[-1]["num_episodes"] == 15
+
+
+def test_run_curriculum_applies_state_encoding():
+    stages = make_stages({"grid_size": 8, "num_ghosts": 1, "coins_per_row": 2}, max_episodes=6)
+    stats = run_curriculum(LinearQAgent(MiniPacmanEnv.ACTIONS), stages, max_steps=30, episodes_per_round=3,
+                           eval_episodes=2, state_encoding="features", verbose=False)
+    assert stats["num_episodes"] == 6
+    assert all(stage["env"]["state_encoding"] == "features" for stage in stats["curriculum"])
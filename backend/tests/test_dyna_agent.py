@@ -0,0 +1,63 @@
+import pytest
+
+from dyna_agent import DynaQAgent
+from environment import MiniPacmanEnv
+from evaluation import load_agent
+
+ACTIONS = ["left", "right"]
+
+
+def test_planning_converges_on_a_chain():
+    """Chaîne 0 -> 1 -> 2 -> 3 (terminal, +1) : la planification seule propage la valeur."""
+    agent = DynaQAgent(ACTIONS, alpha=0.5, gamma=0.5, planning_steps=0)
+    for state in range(3):
+        agent.update((state,), "right", 1.0 if state == 2 else 0.0, (state + 1,), state == 2)
+
+    for _ in range(200):
+        agent.plan(50)
+    assert agent.get_Q((2,), "right") == pytest.approx(1.0)
+    assert agent.get_Q((1,), "right") == pytest.approx(0.5)
+    assert agent.get_Q((0,), "right") == pytest.approx(0.25)
+    assert agent.planning_updates <= 200 * 3
+
+
+def test_model_counts_distinct_outcomes():
+    agent = DynaQAgent(ACTIONS, planning_steps=0, initial_capacity=2)
+    for next_state in [(1,), (2,), (1,), (3,), (4,)]:
+        agent.update((0,), "left", 1.0, next_state, False)
+    assert agent.model_size == 4
+    assert agent.sa_count[0] == 5
+    assert len(agent.q_values) >= len(agent.states) == 5
+
+
+def test_q_view_save_and_load(tmp_path):
+    env = MiniPacmanEnv(grid_size=6, num_ghosts=1, coins_per_row=3, seed=1)
+    agent = DynaQAgent(MiniPacmanEnv.ACTIONS, planning_steps=5)
+    env.reset()
+    state = env.get_state_for_agent()
+    for _ in range(30):
+        action = agent.choose_action(state)
+        _, reward, done, _ = env.step(action)
+        next_state = env.get_state_for_agent()
+        agent.update(state, action, reward, next_state, done)
+        if done:
+            env.reset()
+        state = env.get_state_for_agent()
+    for (s, a), value in agent.Q.items():
+        assert agent.q_values[agent.state_ids[s], agent._action_index[a]] == value
+
+    path = str(tmp_path / "dyna.json")
+    agent.save(path)
+    loaded = load_agent(path)
+    assert isinstance(loaded, DynaQAgent)
+    assert loaded.Q == agent.Q
+    assert loaded.get_stats()["model_size"] == 0
+
+
+def test_registry_reloads_experimental_agent(registry, small_env):
+    agent = DynaQAgent(MiniPacmanEnv.ACTIONS, planning_steps=2)
+    agent.update((0,), "up", 1.0, (1,), True)
+    registry.register("dyna", agent, {"agent_type": "dyna_q"}, {"num_episodes": 1}, {}, agent_type="dyna_q")
+    loaded = registry.get_agent("dyna")
+    assert isinstance(loaded, DynaQAgent)
+    assert loaded.Q == agent.Q
@@ -0,0 +1,63 @@
+import pytest
+
+from agent import QLearningAgent
+from early_stopping import EarlyStopping, welch_t_test
+from environment import MiniPacmanEnv
+from training import train_agent
+
+
+def eval_stats(successes):
+    return {"success_per_episode": successes, "rewards_per_episode": [0.0] * len(successes)}
+
+
+def test_welch_t_test():
+    assert welch_t_test([1.0], [0.0, 1.0])["p_value"] == 1.0
+    assert welch_t_test([2.0, 2.0], [1.0, 1.0])["p_value"] == 0.0
+    assert welch_t_test([1.0, 1.0], [1.0, 1.0])["p_value"] == 1.0
+
+    better = welch_t_test([10.0, 11.0, 12.0, 13.0], [0.0, 1.0, 2.0, 3.0])
+    worse = welch_t_test([0.0, 1.0, 2.0, 3.0], [10.0, 11.0, 12.0, 13.0])
+    assert better["t"] > 0 and better["p_value"] < 0.01
+    assert worse["p_value"] > 0.99
+
+
+def test_plateau_stops_after_patience_and_restores_best():
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS)
+    stopper = EarlyStopping(eval_interval=10, patience=2, min_episodes=0)
+
+    agent.Q = {("best", "up"): 1.0}
+    assert not stopper.update(10, eval_stats([1, 1, 0, 1]), agent)
+    agent.Q = {("later", "up"): 2.0}
+    assert not stopper.update(20, eval_stats([1, 0, 0, 1]), agent)
+    assert stopper.update(30, eval_stats([0, 1, 1, 0]), agent)
+
+    assert stopper.stop_reason == "plateau"
+    assert stopper.best_episode == 10
+    assert stopper.best_score == pytest.approx(75.0)
+    stopper.finalize(agent)
+    assert agent.Q == {("best", "up"): 1.0}
+
+
+def test_target_converges_after_min_episodes():
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS)
+    stopper = EarlyStopping(eval_interval=10, min_episodes=20, target=50.0)
+    assert not stopper.update(10, eval_stats([1, 1]), agent)
+    assert stopper.update(20, eval_stats([1, 1]), agent)
+    summary = stopper.get_summary()
+    assert summary["stop_reason"] == "converged"
+    assert summary["stopped_episode"] == 20
+    assert len(summary["evaluations"]) == 2
+
+
+def test_train_agent_stops_early():
+    env = MiniPacmanEnv(grid_size=6, num_ghosts=1, coins_per_row=3, seed=1)
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS)
+    stopper = EarlyStopping(eval_interval=5, eval_episodes=4, patience=1, min_episodes=0, target=0.0)
+    stats = train_agent(env, agent, num_episodes=100, max_steps=50, verbose=False, early_stopping=stopper)
+    assert stats["num_episodes"] == 5
+    assert stats["early_stopping"]["stop_reason"] == "converged"
+
+
+def test_unknown_metric():
+    with pytest.raises(ValueError):
+        EarlyStopping(metric="coins")
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from environment import MiniPacmanEnv
+
+
+def play(env, actions):
+    env.reset()
+    trace = []
+    for action in actions:
+        _, reward, done, _ = env.step(action)
+        trace.append((env.get_state_for_agent(), reward, done))
+        if done:
+            break
+    return trace
+
+
+def test_seed_fixes_maze_and_episode():
+    actions = [random.choice(MiniPacmanEnv.ACTIONS) for _ in range(60)]
+    first = MiniPacmanEnv(grid_size=8, num_ghosts=2, seed=7)
+    second = MiniPacmanEnv(grid_size=8, num_ghosts=2, seed=7)
+    assert first.walls == second.walls
+    assert play(first, actions) == play(second, actions)
+    # Le module random n'est pas consommé par l'environnement
+    state = random.getstate()
+    play(MiniPacmanEnv(grid_size=8, num_ghosts=2, seed=7), actions)
+    assert random.getstate() == state
+
+
+def test_features_encoding_extends_zones():
+    zones = MiniPacmanEnv(grid_size=8, num_ghosts=1, seed=3)
+    features = MiniPacmanEnv(grid_size=8, num_ghosts=1, seed=3, state_encoding="features")
+    state = features.get_state_for_agent()
+    assert state[:7] == zones.get_state_for_agent()
+    assert len(state) == 12 and state[-1] == 8
+    with pytest.raises(ValueError):
+        MiniPacmanEnv(state_encoding="pixels")
+
+
+def test_encode_raw_state_matches_environment():
+    env = MiniPacmanEnv(grid_size=8, num_ghosts=2, seed=5)
+    raw = {
+        "pacman_pos": env.pacman_pos,
+        "ghosts_pos": env.ghosts_pos,
+        "coins": env.coins,
+        "powerups": env.powerups,
+        "coins_collected": env.coins_collected,
+        "initial_coins_count": env.initial_coins_count,
+    }
+    assert MiniPacmanEnv.encode_raw_state(raw, grid_size=8) == env.get_state_for_agent()
+    env.state_encoding = "features"
+    assert MiniPacmanEnv.encode_raw_state(raw, grid_size=8, state_encoding="features") == env.get_state_for_agent()
+
+
+def test_no_ghost_offset_is_off_grid():
+    state = MiniPacmanEnv.encode_raw_state({"pacman_pos": (2, 2), "coins": [(3, 2)]}, grid_size=6,
+                                           state_encoding="features")
+    assert state[6] == "none"
+    assert state[9:] == (6, 6, 6)
+    same_cell = MiniPacmanEnv.encode_raw_state({"pacman_pos": (2, 2), "ghosts_pos": [(2, 2)], "coins": [(3, 2)]},
+                                               grid_size=6, state_encoding="features")
+    assert same_cell[9:11] == (0, 0)
+
+
+def test_state_space_covers_visited_states(trained_agent):
+    space = set(MiniPacmanEnv.state_space())
+    assert len(space) == 3600
+    assert {state for state, _ in trained_agent.Q} <= space
+    assert len(MiniPacmanEnv.state_space(has_ghosts=False)) == 4 * 4 * 5 * 5 * 2
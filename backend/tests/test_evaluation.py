@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from evaluation import bootstrap_ci, evaluate_suite, make_seed_suite, paired_comparison, run_seeded_episode
+
+ENV_CONFIG = {"grid_size": 6, "num_ghosts": 1, "coins_per_row": 3}
+
+
+def test_bootstrap_ci_brackets_the_mean():
+    values = np.random.default_rng(0).normal(5.0, 1.0, size=500)
+    ci = bootstrap_ci(values, num_resamples=500)
+    assert ci["ci_low"] < ci["mean"] < ci["ci_high"]
+    assert ci["mean"] == pytest.approx(values.mean())
+    assert bootstrap_ci(values, num_resamples=500) == ci
+    assert bootstrap_ci([]) == {"mean": 0.0, "ci_low": 0.0, "ci_high": 0.0}
+
+
+def test_paired_comparison_matches_seeds():
+    episodes = [{"seed": s, "reward": 2.0, "coins": 1, "steps": 10, "success": 1, "lives_lost": 0} for s in range(4)]
+    baseline = [{"seed": s, "reward": 1.0, "coins": 1, "steps": 10, "success": 0, "lives_lost": 1} for s in range(1, 5)]
+    comparison = paired_comparison(episodes, baseline, num_resamples=50)
+    assert comparison["reward"]["mean"] == pytest.approx(1.0)
+    assert comparison["success"]["mean"] == pytest.approx(100.0)
+    assert comparison["win_rate"] == pytest.approx(100.0)
+
+
+def test_seeded_episodes_are_reproducible(trained_agent):
+    seeds = make_seed_suite(5, base_seed=3)
+    assert len(set(seeds)) == 5 and seeds == make_seed_suite(5, base_seed=3)
+    first = [run_seeded_episode(trained_agent, ENV_CONFIG, seed, 50) for seed in seeds]
+    again = [run_seeded_episode(trained_agent, ENV_CONFIG, seed, 50) for seed in seeds]
+    assert first == again
+
+
+def test_evaluate_suite_adds_random_baseline(trained_agent, tmp_path):
+    saved_agent = str(tmp_path / "agent.json")
+    trained_agent.save(saved_agent)
+    report = evaluate_suite({"trained": trained_agent, "saved": saved_agent},
+                            ENV_CONFIG, make_seed_suite(6), max_steps=50, workers=1,
+                            num_resamples=50, chunk_size=4, verbose=False)
+    assert set(report["agents"]) == {"trained", "saved", "random"}
+    assert set(report["comparisons"]) == {"trained", "saved"}
+    assert report["agents"]["saved"] == report["agents"]["trained"]
+    assert report["num_episodes"] == 6 and report["baseline"] == "random"
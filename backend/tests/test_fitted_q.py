@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from fitted_q import FittedQIteration, main, parse_weights
+from transition_log import TransitionDataset, TransitionLog
+
+ACTIONS = ["left", "right"]
+
+
+@pytest.fixture
+def chain_dataset(tmp_path):
+    """Chaîne 0 -> 1 -> 2 : "right" avance, la pièce est au bout (épisode terminé)."""
+    with TransitionLog(str(tmp_path), ACTIONS) as log:
+        for _ in range(3):
+            log.append(0, (0,), "right", 0.0, (1,), False, {"coins_collected": 0}, lives=3)
+            log.append(1, (1,), "left", 0.0, (0,), False, {"coins_collected": 0}, lives=3)
+            log.append(2, (0,), "right", 0.0, (1,), False, {"coins_collected": 0}, lives=3)
+            log.append(3, (1,), "right", 10.0, (2,), True,
+                       {"coins_collected": 1, "reason": "all_coins_collected"}, lives=3)
+    return TransitionDataset(str(tmp_path))
+
+
+def test_fit_converges_to_value_iteration(chain_dataset):
+    learner = FittedQIteration(chain_dataset)
+    stats = learner.fit(gamma=0.5, tol=1e-10)
+    assert stats["converged"]
+    assert stats["visited_pairs"] == 3
+
+    q_table = learner.q_table()
+    assert q_table[((1,), "right")] == pytest.approx(10.0)
+    assert q_table[((0,), "right")] == pytest.approx(5.0)
+    assert q_table[((1,), "left")] == pytest.approx(2.5)
+    assert ((0,), "left") not in q_table
+
+
+def test_event_rewards(chain_dataset):
+    learner = FittedQIteration(chain_dataset)
+    np.testing.assert_allclose(learner.event_rewards({"coin": 1.0}), [0, 0, 0, 1] * 3)
+    np.testing.assert_allclose(learner.event_rewards({"victory": -1.0, "recorded": 0.5}), [0, 0, 0, 4] * 3)
+    with pytest.raises(ValueError):
+        learner.event_rewards({"score": 1.0})
+
+    learner.fit(gamma=0.5, rewards=learner.event_rewards({"coin": 1.0}), tol=1e-10)
+    assert learner.to_agent().get_Q((0,), "right") == pytest.approx(0.5)
+
+
+def test_parse_weights_and_cli(chain_dataset, tmp_path):
+    assert parse_weights("coin=1, game_over=-10") == {"coin": 1.0, "game_over": -10.0}
+    output = str(tmp_path / "agent.json")
+    stats = main([chain_dataset.path, "--gamma", "0.5", "--output", output])
+    assert stats["converged"] and stats["agent_file"] == output
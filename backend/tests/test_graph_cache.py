@@ -0,0 +1,28 @@
+import threading
+
+from graph_cache import GraphCache
+
+
+def test_renders_once_per_run_and_evicts_oldest():
+    calls = []
+    lock = threading.Lock()
+
+    def renderer(stats):
+        with lock:
+            calls.append(stats["id"])
+        return {"rewards": f"png-{stats['id']}".encode()}
+
+    cache = GraphCache(renderer, version=2, max_entries=2)
+    assert cache.get("a", "rewards") is None
+    assert cache.get("a", "rewards", {"id": "a"}) == (b"png-a", "a-v2-rewards")
+    assert cache.get("a", "rewards", {"id": "a"}) == (b"png-a", "a-v2-rewards")
+    assert cache.get("a", "missing") is None
+    assert calls == ["a"]
+
+    cache.submit("b", {"id": "b"})
+    cache.submit("c", {"id": "c"}).result()
+    assert cache.get("a", "rewards") is None
+    assert cache.get("c", "rewards") == (b"png-c", "c-v2-rewards")
+
+    cache.clear()
+    assert cache.get("b", "rewards") is None
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from jobs import JobManager, ProgressBatcher
+
+
+@pytest.fixture
+def manager():
+    """Gestionnaire à un thread ; les tâches "block" attendent le signal `release`."""
+    release = threading.Event()
+
+    def runner(job):
+        if job.config.get("block"):
+            release.wait(5)
+        if job.config.get("fail"):
+            raise RuntimeError("échec")
+        job.publish("progress", {"episode": 1})
+        return {"value": job.config.get("value")}
+
+    manager = JobManager(runner, max_workers=1)
+    manager.release = release
+    yield manager
+    release.set()
+    manager.shutdown()
+
+
+def test_job_lifecycle(manager):
+    job_id = manager.submit({"value": 3})
+    assert manager.wait(job_id, timeout=5)["status"] == "completed"
+    assert manager.result(job_id) == {"value": 3}
+    assert manager.status("unknown") is None
+
+
+def test_events_since(manager):
+    job_id = manager.submit({"value": 3})
+    manager.wait(job_id, timeout=5)
+    assert manager.status(job_id)["progress"] == {"episode": 1}
+
+    events, finished = manager.events_since(job_id, 0, timeout=1)
+    assert finished and events == [(1, "progress", {"episode": 1})]
+    assert manager.events_since(job_id, 1, timeout=1) == ([], True)
+    assert manager.events_since("unknown") is None
+
+
+def test_failed_job_reports_error(manager):
+    job_id = manager.submit({"fail": True})
+    state = manager.wait(job_id, timeout=5)
+    assert state["status"] == "failed" and state["error"] == "échec"
+    assert manager.result(job_id) is None
+
+
+def test_fair_queue_and_cancel(manager):
+    blocker = manager.submit({"block": True}, owner="alice")
+    alice = [manager.submit({"value": i}, owner="alice") for i in range(3)]
+    bob = manager.submit({"value": "b"}, owner="bob")
+    while manager.status(blocker)["status"] == "queued":
+        time.sleep(0.01)
+
+    # alice a une tâche en cours : bob passe devant
+    assert manager.status(bob)["queue_position"] == 0
+    assert manager.status(alice[0])["queue_position"] == 1
+
+    assert manager.cancel(alice[1])
+    assert manager.status(alice[1])["status"] == "cancelled"
+    assert manager.status(alice[2])["queue_position"] == 2
+
+    manager.release.set()
+    assert manager.wait(alice[2], timeout=5)["status"] == "completed"
+    assert not manager.cancel(alice[2])
+    assert [job["status"] for job in manager.list_jobs()].count("completed") == 4
+
+
+def test_progress_batcher_aggregates():
+    published = []
+    now = [0.0]
+    batcher = ProgressBatcher(lambda kind, data: published.append(data), interval=1.0, clock=lambda: now[0])
+
+    def progress(episode, success):
+        return {"episode": episode, "num_episodes": 10, "reward": float(episode), "coins": 1, "steps": 2,
+                "success": success, "epsilon": 0.5, "elapsed": 0.1, "steps_per_sec": 20.0}
+
+    batcher(progress(1, True))
+    batcher(progress(2, False))
+    batcher(progress(3, True))
+    assert len(published) == 1
+    batcher.flush()
+    assert published[1]["episodes_in_batch"] == 2
+    assert published[1]["episode"] == 3 and published[1]["reward"] == pytest.approx(2.5)
+    assert published[1]["success_rate"] == pytest.approx(50.0)
+    batcher.flush()
+    assert len(published) == 2
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from environment import MiniPacmanEnv
+from evaluation import load_agent
+from linear_agent import LinearPolicy, LinearQAgent, TileCoder
+
+
+def features_state(ghosts_pos, pacman_pos=(2, 3), grid_size=8):
+    return MiniPacmanEnv.encode_raw_state(
+        {"pacman_pos": pacman_pos, "ghosts_pos": ghosts_pos, "coins": [(5, 5)]},
+        grid_size=grid_size, state_encoding="features")
+
+
+def test_encode_one_tile_per_group():
+    coder = TileCoder()
+    assert coder.num_features == 1910
+    tiles = coder.encode(features_state([(4, 3)]))
+    assert len(tiles) == coder.num_active == len(set(tiles.tolist()))
+    assert tiles.max() < coder.num_features
+    assert tiles[-1] == coder._bias
+    with pytest.raises(ValueError):
+        coder.encode(features_state([(4, 3)])[:7])
+
+
+def test_no_ghost_has_dedicated_tiles():
+    coder = TileCoder()
+    none = coder.encode(features_state([]))
+    same_cell = coder.encode(features_state([(2, 3)]))
+    # Seules les tuiles fantôme diffèrent (la direction du fantôme aussi, via la cible)
+    ghost_tiles = slice(len(coder.resolutions) * coder.num_tilings, -3)
+    assert set(none[ghost_tiles].tolist()).isdisjoint(same_cell[ghost_tiles].tolist())
+    assert none[ghost_tiles].tolist() == [coder._ghost_coarse_offset - 1, coder._target_offset - 1]
+
+
+def test_known_ignores_bias():
+    agent = LinearQAgent(MiniPacmanEnv.ACTIONS)
+    seen, unseen = features_state([(4, 3)], (1, 1)), features_state([(4, 3)], (6, 6))
+    agent.weights[:, agent.coder._bias] = 1.0
+    assert LinearPolicy.from_agent(agent).act([seen, unseen])["known"].tolist() == [False, False]
+
+    agent.update(seen, "up", 5.0, seen, True)
+    result = LinearPolicy.from_agent(agent).act([seen, unseen])
+    shared = set(agent.coder.encode(seen)[:-1].tolist()) & set(agent.coder.encode(unseen)[:-1].tolist())
+    assert result["known"].tolist() == [True, bool(shared)]
+    np.testing.assert_allclose(result["q_values"][0], agent.q_values(seen))
+
+
+def test_update_moves_q_towards_target():
+    agent = LinearQAgent(MiniPacmanEnv.ACTIONS, alpha=0.5)
+    state = features_state([(4, 3)])
+    agent.update(state, "left", 10.0, state, True)
+    assert agent.get_Q(state, "left") == pytest.approx(5.0)
+    assert len(agent.Q) == agent.coder.num_active
+
+
+def test_save_and_load(tmp_path):
+    agent = LinearQAgent(MiniPacmanEnv.ACTIONS, resolutions=(4, 8), num_tilings=2)
+    state = features_state([(4, 3)])
+    agent.update(state, "down", 3.0, state, True)
+
+    path = str(tmp_path / "linear.json")
+    agent.save(path)
+    loaded = load_agent(path)
+    assert isinstance(loaded, LinearQAgent)
+    assert loaded.coder.config() == agent.coder.config()
+    np.testing.assert_array_equal(loaded.weights, agent.weights)
+    assert loaded.get_Q(state, "down") == pytest.approx(agent.get_Q(state, "down"))
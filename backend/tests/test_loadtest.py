@@ -0,0 +1,17 @@
+import pytest
+
+from loadtest import parse_mix, percentile
+
+
+def test_parse_mix():
+    assert parse_mix("results=6, replay=3,train") == {"results": 6.0, "replay": 3.0, "train": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("results=1,unknown=2")
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == pytest.approx(2.5)
+    assert percentile(values, 100) == 4.0
+    assert percentile([], 99) == 0.0
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def test_counter_sums_thread_shards():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requêtes", ("route",))
+
+    def work():
+        for _ in range(1000):
+            counter.labels("/api").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counter.labels("/api").value() == 4000
+    assert 'requests_total{route="/api"} 4000' in registry.render()
+
+
+def test_histogram_and_gauge_rendering():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latence", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+    registry.gauge("jobs", "Tâches", ("status",)).set_function(lambda: {("running",): 2})
+    registry.gauge("up", "Actif").set(1)
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text and "latency_seconds_count 3" in text
+    assert 'jobs{status="running"} 2' in text
+    assert "up 1" in text
+    assert text.endswith("\n")
+
+
+def test_registry_rejects_kind_change_and_bad_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Événements", ("kind",))
+    assert registry.counter("events_total", "Événements", ("kind",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Événements")
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_shared_directory_adds_other_processes(tmp_path):
+    first, second = MetricsRegistry(), MetricsRegistry()
+    for registry, amount in ((first, 2), (second, 3)):
+        registry.counter("hits_total", "Hits").inc(amount)
+        registry.gauge("local", "Jauge locale").set(amount)
+        registry._shared_dir = str(tmp_path)
+        registry._shared_path = str(tmp_path / f"{amount}.json")
+        registry.write_shared()
+
+    text = first.render()
+    assert "hits_total 5" in text
+    # Les jauges ne sont pas partagées
+    assert "local 2" in text and "local 5" not in text
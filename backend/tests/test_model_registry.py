@@ -0,0 +1,57 @@
+import os
+import time
+
+from model_registry import LRUCache, ModelRegistry
+from policy import PolicyTable
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_register_resolve_and_load(registry, trained_agent):
+    assert registry.resolve("latest") == registry.resolve(None) == "m1"
+    assert registry.resolve("missing") is None
+    assert [m["id"] for m in registry.list_models()] == ["m1"]
+    assert registry.get_metadata("m1")["summary"] == {"num_episodes": 20}
+
+    # Relu depuis le disque par un autre registre
+    other = ModelRegistry(registry.root_dir)
+    assert other.get_agent("latest").Q == trained_agent.Q
+    assert other.get_stats("m1")["rewards_per_episode"] == [0.0] * 20
+    assert isinstance(other.get_policy("m1"), PolicyTable)
+    assert other.make_env("m1").grid_size == 6
+
+
+def test_delete_removes_files_and_latest(registry):
+    assert registry.delete("m1")
+    assert not registry.delete("m1")
+    assert registry.resolve("latest") is None
+    assert os.listdir(registry.root_dir) == [ModelRegistry.INDEX_FILE]
+
+
+def test_refresh_is_throttled_for_reads(registry, trained_agent):
+    reader = ModelRegistry(registry.root_dir, refresh_interval=60.0)
+    signature = reader.catalog_signature()
+    assert signature == ("m1", frozenset({"m1"}))
+    assert reader.resolve("latest") == "m1"
+
+    time.sleep(0.01)  # mtime distinct
+    registry.register("m2", trained_agent, {}, {}, {"grid_size": 6})
+    # Lecture récente : l'index n'est pas relu avant refresh_interval
+    assert reader.resolve("m2") is None
+    assert reader.refresh()
+    assert reader.resolve("m2") == "m2"
+    assert reader.catalog_signature() == ("m2", frozenset({"m1", "m2"}))
+    assert reader.catalog_signature() != signature
+
+    # Les évaluations ne changent pas la signature
+    registry.add_evaluation("m2", {"success": 1.0})
+    reader.refresh()
+    assert reader.catalog_signature() == ("m2", frozenset({"m1", "m2"}))
@@ -0,0 +1,26 @@
+import numpy as np
+
+from agent import QLearningAgent
+from policy import PolicyTable
+
+
+def test_policy_table_matches_q_table():
+    agent = QLearningAgent(["up", "down", "left"])
+    agent.Q = {(("a",), "up"): 1.0, (("a",), "left"): 3.0, (("b",), "down"): -1.0}
+    table = PolicyTable.from_agent(agent)
+    assert len(table) == 2
+
+    result = table.act([("a",), ("b",), ("unknown",)])
+    np.testing.assert_array_equal(result["q_values"], [[1.0, 0.0, 3.0], [0.0, -1.0, 0.0], [0.0, 0.0, 0.0]])
+    # À égalité, la première action l'emporte
+    assert result["actions"].tolist() == [2, 0, 0]
+    assert result["known"].tolist() == [True, True, False]
+
+
+def test_policy_table_of_trained_agent(trained_agent):
+    table = PolicyTable.from_agent(trained_agent)
+    states = list({state for state, _ in trained_agent.Q})
+    q_values = table.act(states)["q_values"]
+    for state, row in zip(states, q_values):
+        assert row.tolist() == [trained_agent.get_Q(state, a) for a in trained_agent.actions]
+    assert len(table.act([])["actions"]) == 0
@@ -0,0 +1,45 @@
+from agent import QLearningAgent
+from dyna_agent import DynaQAgent
+from environment import MiniPacmanEnv
+from profiling import TrainingProfiler
+from training import train_agent
+
+
+def test_wrap_times_calls_and_keeps_results():
+    ticks = iter(range(100))
+    profiler = TrainingProfiler(clock=lambda: float(next(ticks)))
+    double = profiler.wrap("update", lambda x: 2 * x)
+    assert double(3) == 6 and double(4) == 8
+    assert profiler.calls["update"] == 2
+    assert profiler.times["update"] == 2.0
+
+    custom = profiler.wrap("custom", lambda: None)
+    custom()
+    assert profiler.get_report()["phases"]["custom"]["calls"] == 1
+
+
+def test_training_profile(small_env, tmp_path):
+    profiler = TrainingProfiler(sample_interval=2)
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS)
+    stats = train_agent(small_env, agent, num_episodes=4, max_steps=50, verbose=False, profiler=profiler)
+
+    report = profiler.get_report()
+    assert report["episodes"] == 4
+    assert report["total_steps"] == sum(stats["steps_per_episode"])
+    assert report["phases"]["env_step"]["calls"] == report["total_steps"]
+    assert report["total_updates"] >= report["total_steps"]
+    assert [sample["episode"] for sample in report["samples"]] == [2, 4]
+    assert "env_step" in profiler.format_report()
+
+    profiler.export(str(tmp_path / "profile.json"))
+    assert (tmp_path / "profile.json").exists()
+
+
+def test_profile_counts_planning_updates(small_env):
+    profiler = TrainingProfiler()
+    agent = DynaQAgent(MiniPacmanEnv.ACTIONS, planning_steps=5)
+    train_agent(small_env, agent, num_episodes=4, max_steps=50, verbose=False, profiler=profiler)
+
+    report = profiler.get_report()
+    assert agent.planning_updates > 0
+    assert report["total_updates"] == report["total_steps"] + agent.planning_updates
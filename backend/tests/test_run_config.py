@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from agent import QLearningAgent
+from dyna_agent import DynaQAgent
+from linear_agent import LinearQAgent
+from run_config import (apply_overrides, build_agent, build_env, env_config, load_run_config,
+                        normalize_run_config)
+
+
+def test_normalize_fills_defaults_and_encoding():
+    config = normalize_run_config({"name": "x", "agent": {"type": "linear"}, "seeds": 3})
+    assert config["agent"]["agent_type"] == "linear"
+    assert config["env"]["state_encoding"] == "features"
+    assert config["schedule"]["num_episodes"] == 500
+    assert config["seeds"] == [3]
+    assert normalize_run_config({})["env"]["state_encoding"] == "zones"
+
+
+@pytest.mark.parametrize("config", [
+    {"training": {}},
+    {"env": {"size": 4}},
+    {"agent": {"type": "sarsa"}},
+    {"agent": {"type": "dyna_q"}},
+    {"output": {"format": "xml"}},
+])
+def test_normalize_rejects_invalid_configs(config):
+    with pytest.raises(ValueError):
+        normalize_run_config(config)
+
+
+def test_apply_overrides_parses_json_values():
+    config = {"schedule": {"num_episodes": 10}}
+    updated = apply_overrides(config, ["schedule.num_episodes=20", "env.ghost_behavior=chase", "seeds=[1,2]"])
+    assert updated == {"schedule": {"num_episodes": 20}, "env": {"ghost_behavior": "chase"}, "seeds": [1, 2]}
+    assert config == {"schedule": {"num_episodes": 10}}
+    with pytest.raises(ValueError):
+        apply_overrides(config, ["schedule.num_episodes"])
+
+
+def test_load_run_config_json(tmp_path):
+    path = tmp_path / "small.json"
+    path.write_text(json.dumps({"env": {"grid_size": 6}}))
+    assert load_run_config(str(path)) == {"env": {"grid_size": 6}, "name": "small"}
+    path.write_text("[1, 2]")
+    with pytest.raises(ValueError):
+        load_run_config(str(path))
+
+
+def test_build_env_and_agent():
+    env = build_env({"grid_size": 6, "num_ghosts": 1, "agent_type": "linear"}, seed=1)
+    assert env_config(env)["state_encoding"] == "features"
+    assert env_config(env)["grid_size"] == 6
+
+    assert type(build_agent({})) is QLearningAgent
+    dyna = build_agent({"agent_type": "dyna_q", "planning_steps": 3})
+    assert isinstance(dyna, DynaQAgent) and dyna.planning_steps == 3
+    linear = build_agent({"agent_type": "linear", "num_tilings": 2, "resolutions": [4]})
+    assert isinstance(linear, LinearQAgent) and linear.coder.num_tilings == 2
+    with pytest.raises(ValueError):
+        build_agent({"agent_type": "sarsa"})
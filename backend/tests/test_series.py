@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from series import downsample_series, lttb, minmax_buckets, moving_average
+
+
+def make_stats(n):
+    rng = np.random.default_rng(0)
+    return {
+        "rewards_per_episode": rng.normal(size=n).tolist(),
+        "coins_per_episode": rng.integers(0, 20, size=n).tolist(),
+        "steps_per_episode": rng.integers(1, 300, size=n).tolist(),
+        "success_per_episode": rng.integers(0, 2, size=n).tolist(),
+    }
+
+
+def test_moving_average_keeps_length_and_truncates_window():
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+    np.testing.assert_allclose(moving_average(values, 2), [1.0, 1.5, 2.5, 3.5])
+    np.testing.assert_allclose(moving_average(values, 10), [1.0, 1.5, 2.0, 2.5])
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    index = lttb(x, y, 20)
+    assert len(index) == 20
+    assert index[0] == 0 and index[-1] == 999
+    assert 437 in index
+    assert np.all(np.diff(index) > 0)
+
+
+def test_minmax_keeps_extremes_of_each_bucket():
+    y = np.array([3.0, 1.0, 2.0, 9.0, 5.0, 4.0, 0.0, 7.0])
+    index = minmax_buckets(y, 4)
+    assert index.tolist() == [1, 3, 6, 7]
+    assert minmax_buckets(y, 100).tolist() == list(range(8))
+
+
+def test_downsample_series_bounds_points_and_range():
+    stats = make_stats(5000)
+    result = downsample_series(stats, num_points=100, start=1001, end=2000, window=10)
+    assert result["total_episodes"] == 5000
+    assert (result["from"], result["to"]) == (1001, 2000)
+    for series in result["series"].values():
+        assert len(series["x"]) <= 100
+        assert series["x"][0] == 1001 and series["x"][-1] == 2000
+        assert len(series["avg_x"]) == len(series["avg_y"])
+    # success en %, moyennes calculées sur la série complète
+    assert set(result["series"]["success"]["y"]) <= {0.0, 100.0}
+    expected = moving_average(np.asarray(stats["coins_per_episode"], dtype=float), 10)[1000]
+    assert result["series"]["coins"]["avg_y"][0] == pytest.approx(expected, abs=1e-4)
+
+
+def test_downsample_series_small_and_empty():
+    result = downsample_series(make_stats(10), num_points=500, names=["reward"])
+    assert list(result["series"]) == ["reward"]
+    assert result["series"]["reward"]["x"] == list(range(1, 11))
+
+    empty = downsample_series({}, num_points=50)
+    assert empty["total_episodes"] == 0 and empty["from"] == 0
+    assert empty["series"]["coins"]["x"] == []
+
+
+def test_downsample_series_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        downsample_series(make_stats(10), method="mean")
+    with pytest.raises(ValueError):
+        downsample_series(make_stats(10), names=["score"])
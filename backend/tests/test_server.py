@@ -0,0 +1,87 @@
+import json
+import os
+import queue
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="server.py nécessite fork")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def pump(stream, lines):
+    for line in stream:
+        lines.put(line)
+
+
+def read_until(lines, pattern, timeout=30):
+    """Attend une ligne de sortie du serveur correspondant à pattern."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            line = lines.get(timeout=max(0.0, deadline - time.time()))
+        except queue.Empty:
+            raise AssertionError(f"sortie attendue absente : {pattern}")
+        match = re.search(pattern, line)
+        if match:
+            return match
+
+
+def train(port):
+    body = json.dumps({"num_episodes": 3, "max_steps": 30, "grid_size": 6, "seed": 0}).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/api/train", data=body,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.status, json.loads(response.read())
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = free_port()
+    env = dict(os.environ, PACMAN_MODELS_DIR=str(tmp_path / "models"),
+               PACMAN_RESULTS_DIR=str(tmp_path / "results"), PYTHONUNBUFFERED="1")
+    process = subprocess.Popen(
+        [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), "--workers", "1"],
+        cwd=BACKEND, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        start_new_session=True
+    )
+    # Sortie lue dans un thread : une ligne absente ne bloque pas le test
+    lines = queue.Queue()
+    threading.Thread(target=pump, args=(process.stdout, lines), daemon=True).start()
+    try:
+        job_pid = int(read_until(lines, r"tâches: pid (\d+)").group(1))
+        yield lines, port, job_pid
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+
+
+def test_jobs_run_after_job_server_restart(server):
+    lines, port, job_pid = server
+    status, data = train(port)
+    assert status == 200 and data["success"]
+
+    os.kill(job_pid, signal.SIGKILL)
+    read_until(lines, r"processus des tâches arrêté, redémarrage")
+    assert int(read_until(lines, r"tâches: pid (\d+)").group(1)) != job_pid
+
+    status, data = train(port)
+    assert status == 200 and data["success"]
+    assert data["stats"]["model_id"] == data["job_id"]
@@ -0,0 +1,11 @@
+from startup_time import check
+
+
+def test_startup_check_reports_budget_and_heavy_imports():
+    results = [
+        {"module": "training", "median_ms": 20.0, "loaded": []},
+        {"module": "cli", "median_ms": 250.0, "loaded": ["numpy"]},
+        {"module": "plotting", "median_ms": 900.0, "loaded": ["numpy", "matplotlib"]},
+    ]
+    failures = check(results, {"training": 100.0, "cli": 100.0})
+    assert failures == ["cli charge numpy", "cli : 250 ms (budget 100 ms)"]
@@ -0,0 +1,77 @@
+import json
+import statistics
+
+import pytest
+
+from state_coverage import StateActionCounters, coverage_report
+
+ACTIONS = ["up", "down", "left", "right"]
+
+
+def test_counters_track_visits_updates_and_td_variance():
+    counters = StateActionCounters(ACTIONS)
+    errors = [1.0, 3.0, 2.0, 6.0]
+    for td in errors:
+        index = counters.record_visit(("a",), "up", td)
+    counters.record_visit(("a",), "down", 0.5)
+    counters.record_update(("b",), "left", -1.0)
+    counters.add_updates([index, index])
+
+    assert len(counters) == 2
+    assert counters.states_visited == 1          # ("b",) n'a reçu qu'un replay
+    assert counters.pairs_visited == 2
+    assert counters.total_updates == 8
+    assert counters.visits[index] == 4 and counters.updates[index] == 6
+    assert counters.td_mean[index] == pytest.approx(statistics.fmean(errors))
+    assert counters.td_m2[index] / 3 == pytest.approx(statistics.variance(errors))
+
+
+def test_history_is_thinned_beyond_max_history():
+    counters = StateActionCounters(ACTIONS)
+    counters.MAX_HISTORY = 8
+    for episode in range(1, 41):
+        counters.end_episode(episode, q_entries=episode)
+    assert len(counters.history) < 8
+    assert counters.history_stride > 1
+    episodes = [point[0] for point in counters.history]
+    assert episodes == sorted(episodes)
+
+
+def test_to_dict_round_trip():
+    counters = StateActionCounters(ACTIONS)
+    counters.record_visit((1, "x"), "right", 2.0)
+    counters.record_update((2, "y"), "up", 1.0)
+    counters.end_episode(1, 2)
+
+    restored = StateActionCounters.from_dict(ACTIONS, json.loads(json.dumps(counters.to_dict())))
+    assert restored.states == counters.states
+    assert restored.visits == counters.visits
+    assert restored.states_visited == 1 and restored.pairs_visited == 1
+    assert restored.total_updates == 2
+    assert restored.history == counters.history
+    assert coverage_report(restored) == coverage_report(counters)
+
+
+def test_coverage_report():
+    counters = StateActionCounters(ACTIONS)
+    for i in range(12):
+        counters.record_visit(("busy",), "up", float(i))
+    counters.record_visit(("quiet",), "down", 0.0)
+
+    report = coverage_report(counters, state_space=[("busy",), ("quiet",), ("never",)], min_count=10)
+    assert report["states_visited"] == 2
+    assert report["pairs_possible"] == 8
+    assert report["single_visit_pairs"] == 1
+    assert report["busiest_states"][0] == {"state": ["busy"], "visits": 12, "updates": 12}
+    assert [pair["action"] for pair in report["high_td_variance"]] == ["up"]
+    assert report["update_concentration"]["top_50pct_states"] == pytest.approx(12 / 13)
+    assert report["never_visited"] == [["never"]]
+    assert report["state_coverage"] == pytest.approx(2 / 3)
+    assert report["unexpected_states"] == 0
+
+
+def test_agent_training_fills_counters(trained_agent):
+    report = coverage_report(trained_agent.counters)
+    assert report["states_visited"] > 0
+    assert report["total_updates"] >= report["total_visits"] > 0
+    assert report["coverage_history"][-1]["episode"] == 20
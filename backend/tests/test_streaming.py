@@ -0,0 +1,59 @@
+import gzip
+import json
+import time
+import zlib
+
+import pytest
+
+from streaming import compress_stream, ndjson_lines, negotiate_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("br", None),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0.5, deflate", "deflate"),
+    ("gzip;q=0, deflate;q=0", None),
+    ("*", "gzip"),
+    ("GZIP;q=abc, deflate;q=0.1", "deflate"),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_ndjson_lines():
+    lines = list(ndjson_lines([{"a": 1}, {"é": [1, 2]}]))
+    assert lines == [b'{"a":1}\n', '{"é":[1,2]}\n'.encode("utf-8")]
+    assert [json.loads(line) for line in lines] == [{"a": 1}, {"é": [1, 2]}]
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("gzip", gzip.decompress),
+    ("deflate", zlib.decompress),
+    (None, lambda data: data),
+])
+def test_compress_stream_round_trip(encoding, decompress):
+    chunks = list(ndjson_lines({"frame": i, "grid": "." * 50} for i in range(200)))
+    compressed = b"".join(compress_stream(iter(chunks), encoding))
+    assert decompress(compressed) == b"".join(chunks)
+
+
+def test_compress_stream_flushes_on_size_and_time():
+    decompressor = zlib.decompressobj()
+
+    def frames():
+        yield b"first\n"
+        for _ in range(10):
+            yield b"x" * 100 + b"\n"
+        time.sleep(0.02)
+        yield b"late\n"
+
+    received = []
+    for data in compress_stream(frames(), "deflate", flush_bytes=500, flush_interval=0.01):
+        received.append(decompressor.decompress(data))
+    # Premier morceau décodable immédiatement
+    assert received[0] == b"first\n"
+    # Vidage par taille : le client n'attend pas la fin du flux
+    assert sum(1 for data in received[1:11] if data) >= 2
+    assert b"late\n" in b"".join(received[:-1])
@@ -0,0 +1,53 @@
+import pytest
+
+from environment import MiniPacmanEnv
+from training import run_episode_with_replay, run_episode_trajectory
+from trajectory import FORMAT_VERSION, TrajectoryDecoder, decode_trajectory, encode_history
+
+
+def normalize(frame):
+    """Image comparable (ordre des pièces et power-ups sans importance)."""
+    return dict(frame,
+                pacman_pos=tuple(frame["pacman_pos"]),
+                ghosts_pos=[tuple(g) for g in frame["ghosts_pos"]],
+                coins=sorted(map(tuple, frame["coins"])),
+                powerups=sorted(map(tuple, frame["powerups"])),
+                walls=sorted(map(tuple, frame["walls"])))
+
+
+def play(trained_agent, runner):
+    trained_agent.rng.seed(3)
+    env = MiniPacmanEnv(grid_size=6, num_ghosts=1, coins_per_row=3, seed=7)
+    return runner(env, trained_agent, 100)
+
+
+def test_trajectory_decodes_to_full_history(trained_agent):
+    history = play(trained_agent, run_episode_with_replay)
+    trajectory = play(trained_agent, run_episode_trajectory)
+
+    assert trajectory["format"] == FORMAT_VERSION
+    assert len(trajectory["steps"]) == len(history) - 1
+    decoded = decode_trajectory(trajectory)
+    assert [normalize(f) for f in decoded] == [normalize(f) for f in history]
+
+
+def test_encode_history_round_trip(trained_agent):
+    history = play(trained_agent, run_episode_with_replay)
+    decoded = decode_trajectory(encode_history(history, grid_size=6))
+    assert [normalize(f) for f in decoded] == [normalize(f) for f in history]
+
+
+def test_seek_backwards_uses_checkpoints(trained_agent):
+    trajectory = play(trained_agent, run_episode_trajectory)
+    decoder = TrajectoryDecoder(trajectory, checkpoint_interval=5)
+    last = len(decoder) - 1
+    expected = normalize(decoder.frame(last))
+    decoder.seek(1)
+    assert normalize(decoder.seek(last)) == expected
+    with pytest.raises(IndexError):
+        decoder.frame(len(decoder))
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        TrajectoryDecoder({"format": "v0", "keyframe": {}, "steps": []})
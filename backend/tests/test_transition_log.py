@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from agent import QLearningAgent
+from environment import MiniPacmanEnv
+from training import train_agent
+from transition_log import REASON_CODES, TransitionDataset, TransitionLog
+
+
+def test_training_log_round_trip(tmp_path, small_env):
+    agent = QLearningAgent(MiniPacmanEnv.ACTIONS)
+    with TransitionLog(str(tmp_path), MiniPacmanEnv.ACTIONS, chunk_size=64) as log:
+        stats = train_agent(small_env, agent, num_episodes=5, max_steps=50, verbose=False, transition_log=log)
+
+    dataset = TransitionDataset(str(tmp_path))
+    assert len(dataset) == sum(stats["steps_per_episode"])
+    assert dataset.num_episodes == 5
+    assert len(dataset.manifest["chunks"]) > 1
+    np.testing.assert_allclose(dataset.episode_returns(), stats["rewards_per_episode"], rtol=1e-4)
+
+    # Les états décodés sont ceux vus par l'agent
+    states = {dataset.decode_state(row) for row in dataset.column("state")}
+    assert states <= {state for state, _ in agent.Q}
+
+
+def test_log_appends_to_existing_dataset(tmp_path):
+    actions = ["up", "down"]
+    for episode in range(2):
+        with TransitionLog(str(tmp_path), actions) as log:
+            log.append(0, (0, "left"), "up", 1.0, (1, "right"), False, {"coins_collected": 1}, lives=3)
+            log.append(1, (1, "right"), "down", -1.0, (0, "left"), True, {"reason": "game_over"}, lives=0)
+
+    dataset = TransitionDataset(str(tmp_path))
+    assert len(dataset) == 4 and dataset.num_episodes == 2
+    assert dataset.column("episode").tolist() == [0, 0, 1, 1]
+    assert dataset.column("reason").tolist()[1] == REASON_CODES["game_over"]
+    assert dataset.decode_state(dataset.column("next_state")[0]) == (1, "right")
+
+    with pytest.raises(ValueError):
+        TransitionLog(str(tmp_path), ["left", "right"])
+
+
+def test_replay_into_updates_agent(tmp_path):
+    with TransitionLog(str(tmp_path), ["up", "down"]) as log:
+        log.append(0, (0,), "up", 1.0, (1,), True, {}, lives=3)
+        log.append(0, (0,), "down", 0.0, (1,), True, {}, lives=3, explore=False)
+
+    agent = QLearningAgent(["up", "down"], alpha=0.5)
+    assert TransitionDataset(str(tmp_path)).replay_into(agent, passes=2, explore_only=True) == 2
+    assert agent.get_Q((0,), "up") == pytest.approx(0.75)
+    assert ((0,), "down") not in agent.Q
@@ -3,11 +3,31 @@ Module d'entraînement pour l'agent Mini-Pacman
 Inspiré du TP5 (exploration et hyperparamètres)
 """
 
+import math
+import threading
 import time
-from typing import Dict, List, Tuple
-import numpy as np
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Tuple
 from environment import MiniPacmanEnv
 from agent import QLearningAgent, RandomAgent
+from early_stopping import EarlyStopping
+from trajectory import FORMAT_VERSION, TrajectoryEncoder
+from profiling import TrainingProfiler
+from metrics import training_started, training_finished, record_episode
+
+if TYPE_CHECKING:
+    # NumPy n'est chargé que si un journal de transitions est utilisé
+    from transition_log import TransitionLog
+
+
+def _mean(values: List[float]) -> float:
+    """Moyenne (NaN pour une liste vide, comme np.mean)."""
+    return math.fsum(values) / len(values) if len(values) else math.nan
+
+
+def _std(values: List[float]) -> float:
+    """Écart-type de population (comme np.std)."""
+    mean = _mean(values)
+    return math.sqrt(_mean([(value - mean) ** 2 for value in values]))
 
 
 def train_agent(
@@ -16,7 +36,12 @@ def train_agent(
     num_episodes: int = 100,
     max_steps: int = 500,
     verbose: bool = True,
-    log_interval: int = 50
+    log_interval: int = 50,
+    early_stopping: EarlyStopping = None,
+    profiler: TrainingProfiler = None,
+    cancel_event: threading.Event = None,
+    progress_callback: Callable[[Dict], None] = None,
+    transition_log: 'TransitionLog' = None
 ) -> Dict:
     """
     Entraîne l'agent sur l'environnement Mini-Pacman.
@@ -28,6 +53,13 @@ def train_agent(
         max_steps: Nombre maximum de pas par épisode
         verbose: Afficher les logs pendant l'entraînement
         log_interval: Intervalle d'affichage des logs (en épisodes)
+        early_stopping: Contrôleur d'arrêt anticipé (None = toujours num_episodes)
+        profiler: Profileur par phase (None = aucune instrumentation)
+        cancel_event: Si fourni et activé, l'entraînement s'arrête à la fin de l'épisode courant
+        progress_callback: Appelée après chaque épisode avec ses métriques
+            (episode, num_episodes, reward, coins, steps, success, epsilon,
+            elapsed, steps_per_sec)
+        transition_log: Journal où enregistrer chaque transition (None = aucun)
         
     Returns:
         Dictionnaire contenant les statistiques d'entraînement
@@ -38,26 +70,58 @@ def train_agent(
     steps_per_episode = []
     success_per_episode = []  # 1 si victoire (toutes pièces), 0 sinon
     
+    if early_stopping is not None:
+        early_stopping.reset()
+    
+    # Fonctions de la boucle chaude, liées une fois (instrumentées si profiler)
+    choose_action = agent.choose_action
+    env_step = env.step
+    get_state_for_agent = env.get_state_for_agent
+    update = agent.update
+    replay_experience = agent.replay_experience
+    decay_epsilon = agent.decay_epsilon
+    evaluate = evaluate_agent
+    
+    if profiler is not None:
+        profiler.reset()
+        choose_action = profiler.wrap("choose_action", choose_action)
+        env_step = profiler.wrap("env_step", env_step)
+        get_state_for_agent = profiler.wrap("get_state_for_agent", get_state_for_agent)
+        update = profiler.wrap("update", update)
+        replay_experience = profiler.wrap("replay_experience", replay_experience)
+        decay_epsilon = profiler.wrap("decay_epsilon", decay_epsilon)
+        evaluate = profiler.wrap("evaluation", evaluate)
+    
     start_time = time.time()
+    total_steps = 0
+    # Métriques opérationnelles (/metrics), mises à jour une fois par épisode
+    metrics_run = training_started(agent)
+    planning_updates = getattr(agent, "planning_updates", None)
     
     for episode in range(1, num_episodes + 1):
+        episode_start = time.perf_counter()
         state = env.reset()
         # Utiliser l'état simplifié pour l'agent
-        agent_state = env.get_state_for_agent()
+        agent_state = get_state_for_agent()
         
         total_reward = 0
         done = False
         
         for step in range(max_steps):
             # Choisir une action
-            action = agent.choose_action(agent_state, explore=True)
+            action = choose_action(agent_state, explore=True)
             
             # Exécuter l'action
-            next_state, reward, done, info = env.step(action)
-            next_agent_state = env.get_state_for_agent()
+            next_state, reward, done, info = env_step(action)
+            next_agent_state = get_state_for_agent()
             
             # Mettre à jour l'agent
-            agent.update(agent_state, action, reward, next_agent_state, done)
+            update(agent_state, action, reward, next_agent_state, done)
+            
+            # Journal des transitions (optionnel)
+            if transition_log is not None:
+                transition_log.append(step, agent_state, action, reward, next_agent_state,
+                                      done, info, env.lives)
             
             # Accumuler la récompense
             total_reward += reward
@@ -69,11 +133,22 @@ def train_agent(
                 break
         
         # Experience replay pour renforcer l'apprentissage
+        replay_updates = 0
         if episode % 5 == 0:  # Replay tous les 5 épisodes
-            agent.replay_experience(batch_size=32)
+            replay_updates = replay_experience(batch_size=32)
         
         # Décrémenter epsilon et alpha après chaque épisode (avec détection régression)
-        agent.decay_epsilon(episode_reward=total_reward)
+        decay_epsilon(episode_reward=total_reward)
+        
+        # Mises à jour : une par pas, replay, et planification (Dyna-Q)
+        updates = step + 1 + replay_updates
+        if planning_updates is not None:
+            updates += agent.planning_updates - planning_updates
+            planning_updates = agent.planning_updates
+        
+        if profiler is not None:
+            profiler.on_episode_end(episode, step + 1, updates, agent)
+        record_episode(metrics_run, step + 1, updates, time.perf_counter() - episode_start)
         
         # Enregistrer les métriques
         rewards_per_episode.append(total_reward)
@@ -84,12 +159,28 @@ def train_agent(
         success = 1 if info.get('reason') == 'all_coins_collected' else 0
         success_per_episode.append(success)
         
+        # Progression (flux temps réel de l'API, CLI...)
+        if progress_callback is not None:
+            total_steps += step + 1
+            elapsed = time.time() - start_time
+            progress_callback({
+                "episode": episode,
+                "num_episodes": num_episodes,
+                "reward": total_reward,
+                "coins": info['coins_collected'],
+                "steps": step + 1,
+                "success": success,
+                "epsilon": agent.epsilon,
+                "elapsed": elapsed,
+                "steps_per_sec": total_steps / elapsed if elapsed > 0 else 0.0
+            })
+        
         # Logs périodiques
         if verbose and episode % log_interval == 0:
-            avg_reward = np.mean(rewards_per_episode[-log_interval:])
-            avg_coins = np.mean(coins_per_episode[-log_interval:])
-            avg_steps = np.mean(steps_per_episode[-log_interval:])
-            success_rate = np.mean(success_per_episode[-log_interval:]) * 100
+            avg_reward = _mean(rewards_per_episode[-log_interval:])
+            avg_coins = _mean(coins_per_episode[-log_interval:])
+            avg_steps = _mean(steps_per_episode[-log_interval:])
+            success_rate = _mean(success_per_episode[-log_interval:]) * 100
             
             print(f"Épisode {episode}/{num_episodes} | "
                   f"Récompense moy: {avg_reward:.2f} | "
@@ -97,26 +188,57 @@ def train_agent(
                   f"Steps moy: {avg_steps:.1f} | "
                   f"Succès: {success_rate:.1f}% | "
                   f"ε: {agent.epsilon:.3f}")
+        
+        # Évaluation gloutonne périodique pour l'arrêt anticipé
+        if early_stopping is not None and early_stopping.should_evaluate(episode):
+            eval_stats = evaluate(
+                env, agent,
+                num_episodes=early_stopping.eval_episodes,
+                max_steps=max_steps,
+                verbose=False
+            )
+            if early_stopping.update(episode, eval_stats, agent):
+                if verbose:
+                    print(f"Arrêt anticipé à l'épisode {episode} "
+                          f"({early_stopping.stop_reason})")
+                break
+        
+        # Annulation demandée (tâche en arrière-plan)
+        if cancel_event is not None and cancel_event.is_set():
+            break
+    
+    training_finished(agent)
+    
+    if early_stopping is not None:
+        early_stopping.finalize(agent)
     
     training_time = time.time() - start_time
     
     # Calculer les statistiques finales
     final_stats = {
-        "num_episodes": num_episodes,
+        "num_episodes": len(rewards_per_episode),
+        "requested_episodes": num_episodes,
         "max_steps": max_steps,
         "training_time": training_time,
         "rewards_per_episode": rewards_per_episode,
         "coins_per_episode": coins_per_episode,
         "steps_per_episode": steps_per_episode,
         "success_per_episode": success_per_episode,
-        "avg_reward": float(np.mean(rewards_per_episode)),
-        "avg_coins": float(np.mean(coins_per_episode)),
-        "avg_steps": float(np.mean(steps_per_episode)),
-        "success_rate": float(np.mean(success_per_episode) * 100),
+        "avg_reward": _mean(rewards_per_episode),
+        "avg_coins": _mean(coins_per_episode),
+        "avg_steps": _mean(steps_per_episode),
+        "success_rate": _mean(success_per_episode) * 100,
         "final_epsilon": agent.epsilon,
-        "q_table_size": len(agent.Q)
+        "q_table_size": len(agent.Q),
+        "cancelled": cancel_event is not None and cancel_event.is_set()
     }
     
+    if early_stopping is not None:
+        final_stats["early_stopping"] = early_stopping.get_summary()
+    
+    if profiler is not None:
+        final_stats["profile"] = profiler.get_report()
+    
     if verbose:
         print(f"\n{'='*60}")
         print("Entraînement terminé !")
@@ -135,7 +257,8 @@ def evaluate_agent(
     agent: QLearningAgent,
     num_episodes: int = 10,
     max_steps: int = 500,
-    verbose: bool = True
+    verbose: bool = True,
+    transition_log: 'TransitionLog' = None
 ) -> Dict:
     """
     Évalue les performances de l'agent (sans exploration).
@@ -146,6 +269,7 @@ def evaluate_agent(
         num_episodes: Nombre d'épisodes d'évaluation
         max_steps: Nombre maximum de pas par épisode
         verbose: Afficher les résultats
+        transition_log: Journal où enregistrer chaque transition (None = aucun)
         
     Returns:
         Dictionnaire contenant les statistiques d'évaluation
@@ -169,6 +293,10 @@ def evaluate_agent(
             next_state, reward, done, info = env.step(action)
             next_agent_state = env.get_state_for_agent()
             
+            if transition_log is not None:
+                transition_log.append(step, agent_state, action, reward, next_agent_state,
+                                      done, info, env.lives, explore=False)
+            
             total_reward += reward
             agent_state = next_agent_state
             
@@ -182,11 +310,13 @@ def evaluate_agent(
     
     eval_stats = {
         "num_episodes": num_episodes,
-        "avg_reward": float(np.mean(rewards)),
-        "std_reward": float(np.std(rewards)),
-        "avg_coins": float(np.mean(coins_collected)),
-        "avg_steps": float(np.mean(steps_taken)),
-        "success_rate": float(np.mean(successes) * 100)
+        "avg_reward": _mean(rewards),
+        "std_reward": _std(rewards),
+        "avg_coins": _mean(coins_collected),
+        "avg_steps": _mean(steps_taken),
+        "success_rate": _mean(successes) * 100,
+        "rewards_per_episode": rewards,
+        "success_per_episode": successes
     }
     
     if verbose:
@@ -202,29 +332,27 @@ def evaluate_agent(
     return eval_stats
 
 
-def run_episode_with_replay(
+def iter_episode_frames(
     env: MiniPacmanEnv,
     agent: QLearningAgent,
     max_steps: int = 500
-) -> List[Dict]:
+) -> Iterator[Dict]:
     """
-    Exécute un épisode complet et retourne l'historique pour le replay.
+    Exécute un épisode et produit chaque image au fur et à mesure (flux de replay).
     
     Args:
         env: Environnement Mini-Pacman
         agent: Agent à utiliser
         max_steps: Nombre maximum de pas
         
-    Returns:
-        Liste de dictionnaires contenant l'historique de l'épisode
+    Yields:
+        Image de chaque pas (état initial compris), voir run_episode_with_replay
     """
-    history = []
-    
     state = env.reset()
     agent_state = env.get_state_for_agent()
     
     # État initial
-    history.append({
+    yield {
         "step": 0,
         "pacman_pos": env.pacman_pos,
         "ghosts_pos": env.ghosts_pos.copy(),
@@ -235,7 +363,7 @@ def run_episode_with_replay(
         "reward": 0,
         "done": False,
         "info": {"coins_collected": 0, "steps": 0, "lives_remaining": env.lives}
-    })
+    }
     
     done = False
     for step in range(1, max_steps + 1):
@@ -247,7 +375,7 @@ def run_episode_with_replay(
         next_agent_state = env.get_state_for_agent()
         
         # Enregistrer l'état
-        history.append({
+        yield {
             "step": step,
             "pacman_pos": env.pacman_pos,
             "ghosts_pos": env.ghosts_pos.copy(),
@@ -258,14 +386,87 @@ def run_episode_with_replay(
             "reward": reward,
             "done": done,
             "info": info.copy()
-        })
+        }
         
         agent_state = next_agent_state
         
         if done:
             break
+
+
+def run_episode_with_replay(
+    env: MiniPacmanEnv,
+    agent: QLearningAgent,
+    max_steps: int = 500
+) -> List[Dict]:
+    """
+    Exécute un épisode complet et retourne l'historique pour le replay.
+    
+    Args:
+        env: Environnement Mini-Pacman
+        agent: Agent à utiliser
+        max_steps: Nombre maximum de pas
+        
+    Returns:
+        Liste de dictionnaires contenant l'historique de l'épisode
+    """
+    return list(iter_episode_frames(env, agent, max_steps))
+
+
+def iter_episode_trajectory(
+    env: MiniPacmanEnv,
+    agent: QLearningAgent,
+    max_steps: int = 500
+) -> Iterator[Dict]:
+    """
+    Exécute un épisode et produit sa trajectoire compacte au fur et à mesure.
+    
+    Args:
+        env: Environnement Mini-Pacman
+        agent: Agent à utiliser
+        max_steps: Nombre maximum de pas
+        
+    Yields:
+        En-tête {"format", "keyframe"}, puis le delta de chaque pas
+    """
+    env.reset()
+    agent_state = env.get_state_for_agent()
+    encoder = TrajectoryEncoder(env)
+    yield {"format": FORMAT_VERSION, "keyframe": encoder.keyframe}
+    
+    for step in range(1, max_steps + 1):
+        action = agent.choose_action(agent_state, explore=False)
+        next_state, reward, done, info = env.step(action)
+        yield encoder.add_step(action, reward, done, info)
+        agent_state = env.get_state_for_agent()
+        
+        if done:
+            break
+
+
+def run_episode_trajectory(
+    env: MiniPacmanEnv,
+    agent: QLearningAgent,
+    max_steps: int = 500
+) -> Dict:
+    """
+    Exécute un épisode complet et retourne sa trajectoire compacte.
     
-    return history
+    Contrairement à run_episode_with_replay, les murs, pièces et power-ups ne
+    sont envoyés qu'une fois (image clé) ; chaque pas ne contient que ses
+    changements. Voir trajectory.TrajectoryDecoder pour reconstruire les images.
+    
+    Args:
+        env: Environnement Mini-Pacman
+        agent: Agent à utiliser
+        max_steps: Nombre maximum de pas
+        
+    Returns:
+        Trajectoire compacte {"format", "keyframe", "steps"}
+    """
+    stream = iter_episode_trajectory(env, agent, max_steps)
+    header = next(stream)
+    return {**header, "steps": list(stream)}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,330 @@
+"""
+Format compact de trajectoire pour le replay Mini-Pacman
+Une image clé (labyrinthe statique + objets initiaux) suivie de deltas par pas
+"""
+
+from typing import Dict, List, Optional
+
+from environment import MiniPacmanEnv
+
+
+FORMAT_VERSION = "delta-v1"
+
+# Raisons de fin de pas (info["reason"]) encodées sur un caractère
+REASON_CODES = {
+    "life_lost": "l",
+    "game_over": "g",
+    "all_coins_collected": "w",
+}
+REASON_NAMES = {code: name for name, code in REASON_CODES.items()}
+
+
+class TrajectoryEncoder:
+    """
+    Encode un épisode au fil de l'eau.
+
+    L'image clé contient les murs (qui ne changent jamais), les pièces et
+    power-ups initiaux et les positions de départ. Chaque pas ne contient
+    ensuite que ce qui change :
+    - "a": indice de l'action, "p": position de Pacman, "g": fantômes (x, y à plat)
+    - "r": récompense
+    - "c" / "u": pièce / power-up mangé à ce pas (si présent)
+    - "x": code de la raison de fin de pas (vie perdue, défaite, victoire)
+    - "k": fantômes mangés à ce pas, "t": timer d'invincibilité (si > 0)
+    """
+
+    def __init__(self, env: MiniPacmanEnv):
+        """
+        Crée l'image clé à partir de l'environnement (juste après reset()).
+
+        Args:
+            env: Environnement Mini-Pacman réinitialisé
+        """
+        self.env = env
+        self._coins = set(env.coins)
+        self._powerups = set(env.powerups)
+        self._coins_collected = 0
+        self._powerups_collected = 0
+        self._ghosts_eaten = 0
+        self.keyframe = {
+            "grid_size": env.grid_size,
+            "walls": sorted(env.walls),
+            "coins": sorted(env.coins),
+            "powerups": sorted(env.powerups),
+            "pacman_pos": env.pacman_pos,
+            "ghosts_pos": list(env.ghosts_pos),
+            "lives": env.lives,
+        }
+        self.steps = []
+
+    def add_step(self, action: str, reward: float, done: bool, info: Dict) -> Dict:
+        """
+        Ajoute le delta du pas qui vient d'être joué.
+
+        Args:
+            action: Action effectuée
+            reward: Récompense reçue
+            done: Si True, l'épisode est terminé
+            info: Dictionnaire info retourné par env.step
+
+        Returns:
+            Delta encodé du pas
+        """
+        env = self.env
+        delta = {
+            "a": env.ACTIONS.index(action),
+            "p": env.pacman_pos,
+            "g": [c for pos in env.ghosts_pos for c in pos],
+            "r": reward,
+        }
+
+        # Les ensembles ne sont comparés que lorsqu'un compteur a changé
+        if info["coins_collected"] != self._coins_collected:
+            eaten = self._coins - env.coins
+            self._coins -= eaten
+            delta["c"] = next(iter(eaten))
+            self._coins_collected = info["coins_collected"]
+
+        if info["powerups_collected"] != self._powerups_collected:
+            eaten = self._powerups - env.powerups
+            self._powerups -= eaten
+            delta["u"] = next(iter(eaten))
+            self._powerups_collected = info["powerups_collected"]
+
+        if info["ghosts_eaten"] != self._ghosts_eaten:
+            delta["k"] = info["ghosts_eaten"] - self._ghosts_eaten
+            self._ghosts_eaten = info["ghosts_eaten"]
+
+        if "reason" in info:
+            delta["x"] = REASON_CODES[info["reason"]]
+
+        if env.invincible_timer > 0:
+            delta["t"] = env.invincible_timer
+
+        self.steps.append(delta)
+        return delta
+
+    def to_dict(self) -> Dict:
+        """
+        Retourne la trajectoire complète, sérialisable en JSON.
+
+        Returns:
+            Dictionnaire {"format", "keyframe", "steps"}
+        """
+        return {
+            "format": FORMAT_VERSION,
+            "keyframe": self.keyframe,
+            "steps": self.steps,
+        }
+
+
+class TrajectoryDecoder:
+    """
+    Reconstruit les images complètes (format de run_episode_with_replay).
+
+    Un instantané de l'état courant est mémorisé tous les
+    `checkpoint_interval` pas : seek(step) repart de l'instantané le plus
+    proche au lieu de rejouer tout l'épisode.
+    """
+
+    def __init__(self, trajectory: Dict, checkpoint_interval: int = 50):
+        """
+        Args:
+            trajectory: Trajectoire produite par TrajectoryEncoder.to_dict()
+            checkpoint_interval: Pas entre deux instantanés pour seek()
+        """
+        if trajectory.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Format de trajectoire inconnu: {trajectory.get('format')}")
+
+        self.keyframe = trajectory["keyframe"]
+        self.steps = trajectory["steps"]
+        self.checkpoint_interval = max(1, checkpoint_interval)
+        self.walls = [tuple(w) for w in self.keyframe["walls"]]
+        self._checkpoints = {0: self._initial_state()}
+        self._state = None
+
+    def __len__(self) -> int:
+        """Nombre d'images (image clé incluse)."""
+        return len(self.steps) + 1
+
+    def _initial_state(self) -> Dict:
+        keyframe = self.keyframe
+        return {
+            "step": 0,
+            "pacman_pos": tuple(keyframe["pacman_pos"]),
+            "ghosts_pos": [tuple(g) for g in keyframe["ghosts_pos"]],
+            "coins": set(tuple(c) for c in keyframe["coins"]),
+            "powerups": set(tuple(p) for p in keyframe["powerups"]),
+            "lives": keyframe["lives"],
+            "lives_lost": 0,
+            "coins_collected": 0,
+            "powerups_collected": 0,
+            "ghosts_eaten": 0,
+            "invincible_timer": 0,
+        }
+
+    @staticmethod
+    def _copy_state(state: Dict) -> Dict:
+        copy = dict(state)
+        copy["coins"] = set(state["coins"])
+        copy["powerups"] = set(state["powerups"])
+        return copy
+
+    def _apply(self, state: Dict, delta: Dict):
+        """Applique un delta à l'état courant (en place)."""
+        state["step"] += 1
+        state["pacman_pos"] = tuple(delta["p"])
+        ghosts = delta["g"]
+        state["ghosts_pos"] = [(ghosts[i], ghosts[i + 1]) for i in range(0, len(ghosts), 2)]
+        if "c" in delta:
+            state["coins"].discard(tuple(delta["c"]))
+            state["coins_collected"] += 1
+        if "u" in delta:
+            state["powerups"].discard(tuple(delta["u"]))
+            state["powerups_collected"] += 1
+        state["ghosts_eaten"] += delta.get("k", 0)
+        state["invincible_timer"] = delta.get("t", 0)
+        if delta.get("x") in ("l", "g"):
+            state["lives"] -= 1
+            state["lives_lost"] += 1
+
+    def _state_at(self, step: int) -> Dict:
+        """Retourne l'état reconstruit après `step` pas."""
+        if not 0 <= step < len(self):
+            raise IndexError(f"Pas hors de la trajectoire: {step}")
+
+        # Avancer depuis l'état courant si possible, sinon depuis un instantané
+        if self._state is None or self._state["step"] > step:
+            base = max(s for s in self._checkpoints if s <= step)
+            self._state = self._copy_state(self._checkpoints[base])
+
+        state = self._state
+        while state["step"] < step:
+            self._apply(state, self.steps[state["step"]])
+            if state["step"] % self.checkpoint_interval == 0:
+                self._checkpoints.setdefault(state["step"], self._copy_state(state))
+        return state
+
+    def _info(self, state: Dict, delta: Optional[Dict]) -> Dict:
+        """Reconstruit le dictionnaire info retourné par env.step."""
+        if delta is None:
+            return {"coins_collected": 0, "steps": 0, "lives_remaining": state["lives"]}
+
+        reason = REASON_NAMES.get(delta.get("x"))
+        common = {
+            "coins_collected": state["coins_collected"],
+            "powerups_collected": state["powerups_collected"],
+            "ghosts_eaten": state["ghosts_eaten"],
+        }
+        if reason is None:
+            return {
+                "coins_collected": state["coins_collected"],
+                "steps": state["step"],
+                "powerups_collected": state["powerups_collected"],
+                "invincible": state["invincible_timer"] > 0,
+                "invincible_timer": state["invincible_timer"],
+                "ghosts_eaten": state["ghosts_eaten"],
+            }
+        info = {"reason": reason, **common}
+        if reason == "life_lost":
+            info["lives_remaining"] = state["lives"]
+        if reason in ("life_lost", "game_over"):
+            info["lives_lost"] = state["lives_lost"]
+        return info
+
+    def frame(self, step: int) -> Dict:
+        """
+        Reconstruit une image complète (identique à run_episode_with_replay).
+
+        Args:
+            step: Numéro du pas (0 = état initial)
+
+        Returns:
+            Dictionnaire de l'image
+        """
+        state = self._state_at(step)
+        delta = self.steps[step - 1] if step > 0 else None
+        return {
+            "step": step,
+            "pacman_pos": state["pacman_pos"],
+            "ghosts_pos": list(state["ghosts_pos"]),
+            "coins": list(state["coins"]),
+            "powerups": list(state["powerups"]),
+            "walls": list(self.walls),
+            "action": MiniPacmanEnv.ACTIONS[delta["a"]] if delta else None,
+            "reward": delta["r"] if delta else 0,
+            "done": delta is not None and delta.get("x") in ("g", "w"),
+            "info": self._info(state, delta),
+        }
+
+    def seek(self, step: int) -> Dict:
+        """Alias de frame() pour la navigation dans le replay."""
+        return self.frame(step)
+
+    def frames(self) -> List[Dict]:
+        """Reconstruit toutes les images (format historique complet)."""
+        return [self.frame(step) for step in range(len(self))]
+
+
+def encode_history(history: List[Dict], grid_size: int) -> Dict:
+    """
+    Convertit un historique complet (run_episode_with_replay) en format compact.
+
+    Args:
+        history: Liste des images de l'épisode
+        grid_size: Taille de la grille
+
+    Returns:
+        Trajectoire compacte
+    """
+    first = history[0]
+    keyframe = {
+        "grid_size": grid_size,
+        "walls": sorted(tuple(w) for w in first["walls"]),
+        "coins": sorted(tuple(c) for c in first["coins"]),
+        "powerups": sorted(tuple(p) for p in first["powerups"]),
+        "pacman_pos": tuple(first["pacman_pos"]),
+        "ghosts_pos": [tuple(g) for g in first["ghosts_pos"]],
+        "lives": first["info"].get("lives_remaining", 3),
+    }
+
+    steps = []
+    previous = first
+    for frame in history[1:]:
+        info = frame["info"]
+        delta = {
+            "a": MiniPacmanEnv.ACTIONS.index(frame["action"]),
+            "p": tuple(frame["pacman_pos"]),
+            "g": [c for pos in frame["ghosts_pos"] for c in pos],
+            "r": frame["reward"],
+        }
+        eaten_coins = set(map(tuple, previous["coins"])) - set(map(tuple, frame["coins"]))
+        if eaten_coins:
+            delta["c"] = next(iter(eaten_coins))
+        eaten_powerups = set(map(tuple, previous["powerups"])) - set(map(tuple, frame["powerups"]))
+        if eaten_powerups:
+            delta["u"] = next(iter(eaten_powerups))
+        ghosts_eaten = info.get("ghosts_eaten", 0) - previous["info"].get("ghosts_eaten", 0)
+        if ghosts_eaten:
+            delta["k"] = ghosts_eaten
+        if "reason" in info:
+            delta["x"] = REASON_CODES[info["reason"]]
+        if info.get("invincible_timer", 0) > 0:
+            delta["t"] = info["invincible_timer"]
+        steps.append(delta)
+        previous = frame
+
+    return {"format": FORMAT_VERSION, "keyframe": keyframe, "steps": steps}
+
+
+def decode_trajectory(trajectory: Dict) -> List[Dict]:
+    """
+    Reconstruit l'historique complet à partir du format compact.
+
+    Args:
+        trajectory: Trajectoire compacte
+
+    Returns:
+        Liste des images (format de run_episode_with_replay)
+    """
+    return TrajectoryDecoder(trajectory).frames()
@@ -0,0 +1,373 @@
+"""
+Journal des transitions (analyse et apprentissage hors ligne)
+Jeu de données en colonnes, découpé en blocs .npy écrits par un thread
+d'arrière-plan et relus par projection mémoire (mmap)
+
+Structure sur disque :
+    <dossier>/manifest.json            schéma, vocabulaire, liste des blocs
+    <dossier>/chunk_00000/<colonne>.npy
+    <dossier>/chunk_00001/<colonne>.npy
+    ...
+
+Un bloc n'apparaît dans le manifeste qu'une fois toutes ses colonnes écrites :
+un lecteur voit toujours un jeu de données cohérent, même pendant l'écriture.
+"""
+
+import json
+import os
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+FORMAT_VERSION = "transitions-v1"
+
+# Raison de fin d'épisode (info["reason"]) -> code de la colonne "reason"
+REASONS = [None, "life_lost", "game_over", "all_coins_collected"]
+REASON_CODES = {reason: code for code, reason in enumerate(REASONS)}
+
+# Colonnes scalaires (une valeur par transition) ; "state" et "next_state"
+# sont des matrices (transitions x largeur de l'état)
+COLUMNS = {
+    "episode": np.int32,
+    "step": np.int32,
+    "action": np.int8,
+    "reward": np.float32,
+    "done": np.bool_,
+    "explore": np.bool_,       # True pendant l'entraînement, False en évaluation gloutonne
+    "reason": np.int8,         # Voir REASONS
+    "lives": np.int8,          # Vies restantes après la transition
+    "coins_collected": np.int16,
+    "ghosts_eaten": np.int16,
+}
+STATE_COLUMNS = ["state", "next_state"]
+STATE_DTYPE = np.int16
+
+
+def _write_json(path: str, data: Dict):
+    """Écrit un fichier JSON de manière atomique (fichier temporaire + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class TransitionLog:
+    """
+    Enregistre les transitions dans un jeu de données en colonnes.
+
+    La boucle d'entraînement ne fait qu'ajouter des valeurs à des listes ;
+    quand un bloc est plein, il est confié au thread d'écriture (conversion
+    numpy et np.save). La file d'attente est bornée : si le disque ne suit
+    pas, append() attend au lieu de faire grossir la mémoire.
+
+    Les états (tuples) sont encodés en entiers : chaque composante entière
+    est gardée telle quelle, chaque composante texte ("up", "none"...) est
+    remplacée par son indice dans un vocabulaire commun, enregistré dans le
+    manifeste.
+    """
+
+    def __init__(self, path: str, actions: List[str], chunk_size: int = 65536, max_pending: int = 4):
+        """
+        Args:
+            path: Dossier du jeu de données (créé si besoin ; s'il existe
+                déjà, les nouvelles transitions sont ajoutées à la suite)
+            actions: Actions de l'environnement (ordre des codes de "action")
+            chunk_size: Nombre de transitions par bloc
+            max_pending: Nombre maximum de blocs en attente d'écriture
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        os.makedirs(path, exist_ok=True)
+
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("format") != FORMAT_VERSION:
+                raise ValueError(f"Format de journal inconnu: {self.manifest.get('format')}")
+            if self.manifest["actions"] != list(actions):
+                raise ValueError("Actions différentes de celles du journal existant")
+        else:
+            self.manifest = {
+                "format": FORMAT_VERSION,
+                "actions": list(actions),
+                "reasons": REASONS,
+                "state_kinds": None,
+                "vocab": [],
+                "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+                "state_dtype": np.dtype(STATE_DTYPE).str,
+                "rows": 0,
+                "episodes": 0,
+                "chunks": [],
+            }
+
+        self.action_codes = {action: code for code, action in enumerate(actions)}
+        self.vocab = {word: code for code, word in enumerate(self.manifest["vocab"])}
+        self.state_kinds = self.manifest["state_kinds"]
+        self.state_codes = {}  # Cache état -> encodage (peu d'états distincts)
+        self.episode = self.manifest["episodes"] - 1
+        self.num_chunks = len(self.manifest["chunks"])
+        self._reset_buffer()
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.writer = threading.Thread(target=self._write_loop, name="transition-log-writer", daemon=True)
+        self.writer.start()
+
+    def _reset_buffer(self):
+        self.buffer = {name: [] for name in list(COLUMNS) + STATE_COLUMNS}
+        self.buffered = 0
+
+    def _encode_state(self, state: Tuple) -> Tuple:
+        encoded = self.state_codes.get(state)
+        if encoded is not None:
+            return encoded
+
+        if self.state_kinds is None:
+            self.state_kinds = ["str" if isinstance(value, str) else "int" for value in state]
+        if len(state) != len(self.state_kinds):
+            raise ValueError(f"État de largeur {len(state)} (attendu {len(self.state_kinds)})")
+
+        values = []
+        for value, kind in zip(state, self.state_kinds):
+            if kind == "str":
+                value = self.vocab.setdefault(value, len(self.vocab))
+            values.append(int(value))
+        encoded = tuple(values)
+        self.state_codes[state] = encoded
+        return encoded
+
+    def append(self, step: int, state: Tuple, action: str, reward: float, next_state: Tuple,
+               done: bool, info: Dict, lives: int, explore: bool = True):
+        """
+        Ajoute une transition (un nouvel épisode commence à step == 0).
+
+        Args:
+            step: Numéro du pas dans l'épisode (à partir de 0)
+            state: État de l'agent avant l'action
+            action: Action effectuée
+            reward: Récompense reçue
+            next_state: État de l'agent après l'action
+            done: Fin d'épisode
+            info: Informations renvoyées par env.step
+            lives: Vies restantes après la transition
+            explore: Transition d'entraînement (True) ou d'évaluation (False)
+        """
+        if self.error is not None:
+            raise self.error
+        if step == 0:
+            self.episode += 1
+
+        buffer = self.buffer
+        buffer["episode"].append(self.episode)
+        buffer["step"].append(step)
+        buffer["action"].append(self.action_codes[action])
+        buffer["reward"].append(reward)
+        buffer["done"].append(done)
+        buffer["explore"].append(explore)
+        buffer["reason"].append(REASON_CODES.get(info.get("reason"), 0))
+        buffer["lives"].append(lives)
+        buffer["coins_collected"].append(info.get("coins_collected", 0))
+        buffer["ghosts_eaten"].append(info.get("ghosts_eaten", 0))
+        buffer["state"].extend(self._encode_state(state))
+        buffer["next_state"].extend(self._encode_state(next_state))
+
+        self.buffered += 1
+        if self.buffered >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Confie les transitions en mémoire au thread d'écriture (bloc partiel)."""
+        if self.buffered == 0:
+            return
+        snapshot = {
+            "vocab": sorted(self.vocab, key=self.vocab.get),
+            "state_kinds": self.state_kinds,
+            "episodes": self.episode + 1,
+        }
+        self.pending.put((self.num_chunks, self.buffer, self.buffered, snapshot))
+        self.num_chunks += 1
+        self._reset_buffer()
+
+    def close(self):
+        """Écrit les dernières transitions et attend la fin du thread d'écriture."""
+        self.flush()
+        self.pending.put(None)
+        self.writer.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self) -> "TransitionLog":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _write_loop(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            if self.error is not None:
+                continue  # Vider la file sans écrire après une erreur
+            try:
+                self._write_chunk(*item)
+            except Exception as e:
+                self.error = e
+
+    def _write_chunk(self, index: int, buffer: Dict[str, list], rows: int, snapshot: Dict):
+        name = f"chunk_{index:05d}"
+        chunk_dir = os.path.join(self.path, name)
+        os.makedirs(chunk_dir, exist_ok=True)
+
+        for column, dtype in COLUMNS.items():
+            np.save(os.path.join(chunk_dir, f"{column}.npy"), np.asarray(buffer[column], dtype=dtype))
+        width = len(snapshot["state_kinds"])
+        for column in STATE_COLUMNS:
+            values = np.asarray(buffer[column], dtype=STATE_DTYPE).reshape(rows, width)
+            np.save(os.path.join(chunk_dir, f"{column}.npy"), values)
+
+        # Publier le bloc seulement maintenant (les lecteurs ne voient que des blocs complets)
+        self.manifest.update(snapshot)
+        self.manifest["chunks"].append({"name": name, "rows": rows})
+        self.manifest["rows"] += rows
+        _write_json(os.path.join(self.path, "manifest.json"), self.manifest)
+
+
+class TransitionDataset:
+    """
+    Lecture d'un journal de transitions.
+
+    Les colonnes de chaque bloc sont projetées en mémoire (np.load avec
+    mmap_mode="r") : seules les pages effectivement lues sont chargées, ce
+    qui permet de parcourir des millions de transitions bloc par bloc.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Dossier du jeu de données
+        """
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Format de journal inconnu: {self.manifest.get('format')}")
+        self.actions = self.manifest["actions"]
+        self.vocab = self.manifest["vocab"]
+        self.state_kinds = self.manifest["state_kinds"] or []
+        self.chunks = self.manifest["chunks"]
+        self._state_cache = {}
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    @property
+    def num_episodes(self) -> int:
+        return self.manifest["episodes"]
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest["columns"]) + STATE_COLUMNS
+
+    def chunk(self, index: int, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Colonnes d'un bloc, projetées en mémoire.
+
+        Args:
+            index: Numéro du bloc
+            columns: Colonnes voulues (défaut: toutes)
+
+        Returns:
+            {colonne: tableau en lecture seule}
+        """
+        chunk_dir = os.path.join(self.path, self.chunks[index]["name"])
+        return {
+            column: np.load(os.path.join(chunk_dir, f"{column}.npy"), mmap_mode="r")
+            for column in (columns or self.columns)
+        }
+
+    def iter_chunks(self, columns: Optional[List[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Parcourt les blocs dans l'ordre d'écriture (voir chunk())."""
+        for index in range(len(self.chunks)):
+            yield self.chunk(index, columns)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Colonne complète (copie en mémoire de tous les blocs).
+
+        Args:
+            name: Nom de la colonne
+
+        Returns:
+            Tableau de len(self) valeurs (ou lignes pour les états)
+        """
+        parts = [chunk[name] for chunk in self.iter_chunks([name])]
+        if not parts:
+            width = (len(self.state_kinds),) if name in STATE_COLUMNS else ()
+            dtype = STATE_DTYPE if name in STATE_COLUMNS else np.dtype(self.manifest["columns"][name])
+            return np.empty((0,) + width, dtype=dtype)
+        return np.concatenate(parts)
+
+    def decode_state(self, row: np.ndarray) -> Tuple:
+        """
+        Retrouve l'état de l'agent à partir d'une ligne de "state"/"next_state".
+
+        Args:
+            row: Ligne encodée
+
+        Returns:
+            État (tuple identique à celui de get_state_for_agent)
+        """
+        key = row.tobytes()
+        state = self._state_cache.get(key)
+        if state is None:
+            state = tuple(
+                self.vocab[value] if kind == "str" else int(value)
+                for value, kind in zip(row.tolist(), self.state_kinds)
+            )
+            self._state_cache[key] = state
+        return state
+
+    def episode_returns(self) -> np.ndarray:
+        """
+        Récompense totale de chaque épisode.
+
+        Returns:
+            Tableau indexé par numéro d'épisode
+        """
+        totals = np.zeros(self.num_episodes, dtype=np.float64)
+        for chunk in self.iter_chunks(["episode", "reward"]):
+            np.add.at(totals, chunk["episode"], chunk["reward"])
+        return totals
+
+    def replay_into(self, agent, passes: int = 1, explore_only: bool = False) -> int:
+        """
+        Entraîne un agent sur les transitions enregistrées (sans simulation).
+
+        Args:
+            agent: Agent possédant update(state, action, reward, next_state, done)
+            passes: Nombre de passages sur le jeu de données
+            explore_only: Ignorer les transitions d'évaluation
+
+        Returns:
+            Nombre de mises à jour effectuées
+        """
+        update = agent.update
+        decode = self.decode_state
+        updates = 0
+        for _ in range(passes):
+            for chunk in self.iter_chunks():
+                rows = np.flatnonzero(chunk["explore"]) if explore_only else range(len(chunk["action"]))
+                states, next_states = chunk["state"], chunk["next_state"]
+                actions = chunk["action"].tolist()
+                rewards = chunk["reward"].tolist()
+                dones = chunk["done"].tolist()
+                for i in rows:
+                    update(decode(states[i]), self.actions[actions[i]], rewards[i],
+                           decode(next_states[i]), dones[i])
+                    updates += 1
+        return updates
@@ -0,0 +1,193 @@
+// Replay compact côté client (format "delta-v1" de /api/replay/stream)
+//
+// Le labyrinthe statique (murs, pièces et power-ups initiaux) est gardé une
+// seule fois ; chaque pas n'occupe que quelques octets dans des colonnes
+// typées (action, positions, récompense, compteurs cumulés). Une image
+// complète est reconstruite à la demande en accès direct : les pièces et
+// power-ups présents sont ceux dont le pas de disparition est postérieur.
+// Un petit cache LRU garde les dernières images reconstruites (navigation).
+
+const ACTIONS = ['up', 'down', 'left', 'right']
+const REASONS = [null, 'life_lost', 'game_over', 'all_coins_collected']
+const REASON_CODES = { l: 1, g: 2, w: 3 }
+const NEVER = 0x7fffffff
+const FORMAT_VERSION = 'delta-v1'
+
+const grow = (array, capacity) => {
+  const bigger = new array.constructor(capacity)
+  bigger.set(array)
+  return bigger
+}
+
+export class ReplayFrames {
+  /**
+   * @param {Object} header - En-tête du flux : {format, keyframe}
+   * @param {number} cacheSize - Nombre d'images reconstruites gardées en cache
+   */
+  constructor(header, cacheSize = 64) {
+    if (header.format !== FORMAT_VERSION) {
+      throw new Error(`Format de replay inconnu: ${header.format}`)
+    }
+    const keyframe = header.keyframe
+    this.gridSize = keyframe.grid_size
+    this.walls = keyframe.walls
+    this.initialLives = keyframe.lives
+    this.numGhosts = keyframe.ghosts_pos.length
+
+    // Objets initiaux et pas auquel chacun est mangé (NEVER = jamais)
+    this.coins = keyframe.coins
+    this.powerups = keyframe.powerups
+    this.coinIndex = new Map(this.coins.map((c, i) => [`${c[0]},${c[1]}`, i]))
+    this.powerupIndex = new Map(this.powerups.map((p, i) => [`${p[0]},${p[1]}`, i]))
+    this.coinEatenAt = new Int32Array(this.coins.length).fill(NEVER)
+    this.powerupEatenAt = new Int32Array(this.powerups.length).fill(NEVER)
+
+    this.length = 0
+    this.capacity = 0
+    this._allocate(256)
+
+    this.cacheSize = cacheSize
+    this.cache = new Map()
+
+    // Image 0 : état initial
+    this.push({
+      a: -1,
+      p: keyframe.pacman_pos,
+      g: keyframe.ghosts_pos.flat(),
+      r: 0
+    })
+  }
+
+  _allocate(capacity) {
+    const g = this.numGhosts * 2
+    if (this.capacity === 0) {
+      this.action = new Int8Array(capacity)
+      this.pacman = new Int16Array(capacity * 2)
+      this.ghosts = new Int16Array(capacity * g)
+      this.reward = new Float32Array(capacity)
+      this.timer = new Uint16Array(capacity)
+      this.reason = new Uint8Array(capacity)
+      // Compteurs cumulés à chaque pas
+      this.coinsCollected = new Uint16Array(capacity)
+      this.powerupsCollected = new Uint16Array(capacity)
+      this.ghostsEaten = new Uint16Array(capacity)
+      this.livesLost = new Uint16Array(capacity)
+    } else {
+      this.action = grow(this.action, capacity)
+      this.pacman = grow(this.pacman, capacity * 2)
+      this.ghosts = grow(this.ghosts, capacity * g)
+      this.reward = grow(this.reward, capacity)
+      this.timer = grow(this.timer, capacity)
+      this.reason = grow(this.reason, capacity)
+      this.coinsCollected = grow(this.coinsCollected, capacity)
+      this.powerupsCollected = grow(this.powerupsCollected, capacity)
+      this.ghostsEaten = grow(this.ghostsEaten, capacity)
+      this.livesLost = grow(this.livesLost, capacity)
+    }
+    this.capacity = capacity
+  }
+
+  /**
+   * Ajoute le delta d'un pas reçu du flux.
+   * @param {Object} delta - {a, p, g, r, c?, u?, k?, x?, t?}
+   */
+  push(delta) {
+    if (this.length === this.capacity) this._allocate(this.capacity * 2)
+    const step = this.length
+    const previous = step - 1
+
+    this.action[step] = delta.a
+    this.pacman[step * 2] = delta.p[0]
+    this.pacman[step * 2 + 1] = delta.p[1]
+    this.ghosts.set(delta.g.slice(0, this.numGhosts * 2), step * this.numGhosts * 2)
+    this.reward[step] = delta.r
+    this.timer[step] = delta.t || 0
+    this.reason[step] = REASON_CODES[delta.x] || 0
+
+    const carry = (column, increment) => {
+      column[step] = (previous >= 0 ? column[previous] : 0) + increment
+    }
+    carry(this.coinsCollected, delta.c ? 1 : 0)
+    carry(this.powerupsCollected, delta.u ? 1 : 0)
+    carry(this.ghostsEaten, delta.k || 0)
+    carry(this.livesLost, delta.x === 'l' || delta.x === 'g' ? 1 : 0)
+
+    if (delta.c) {
+      const index = this.coinIndex.get(`${delta.c[0]},${delta.c[1]}`)
+      if (index !== undefined) this.coinEatenAt[index] = step
+    }
+    if (delta.u) {
+      const index = this.powerupIndex.get(`${delta.u[0]},${delta.u[1]}`)
+      if (index !== undefined) this.powerupEatenAt[index] = step
+    }
+    this.length++
+  }
+
+  /**
+   * Image complète d'un pas (même forme que le format "full" de l'API).
+   * @param {number} step - Numéro du pas (0 = état initial)
+   */
+  frame(step) {
+    if (step < 0 || step >= this.length) return undefined
+    const cached = this.cache.get(step)
+    if (cached !== undefined) {
+      // Rafraîchir la position LRU
+      this.cache.delete(step)
+      this.cache.set(step, cached)
+      return cached
+    }
+
+    const frame = this._materialize(step)
+    this.cache.set(step, frame)
+    if (this.cache.size > this.cacheSize) {
+      this.cache.delete(this.cache.keys().next().value)
+    }
+    return frame
+  }
+
+  _materialize(step) {
+    const g = this.numGhosts * 2
+    const ghosts = []
+    for (let i = step * g; i < (step + 1) * g; i += 2) {
+      ghosts.push([this.ghosts[i], this.ghosts[i + 1]])
+    }
+    const reason = REASONS[this.reason[step]]
+
+    return {
+      step,
+      pacman_pos: [this.pacman[step * 2], this.pacman[step * 2 + 1]],
+      ghosts_pos: ghosts,
+      coins: this.coins.filter((_, i) => this.coinEatenAt[i] > step),
+      powerups: this.powerups.filter((_, i) => this.powerupEatenAt[i] > step),
+      walls: this.walls,  // Partagé par toutes les images
+      action: step > 0 ? ACTIONS[this.action[step]] : null,
+      reward: this.reward[step],
+      done: reason === 'game_over' || reason === 'all_coins_collected',
+      info: this._info(step, reason)
+    }
+  }
+
+  _info(step, reason) {
+    const lives = this.initialLives - this.livesLost[step]
+    if (step === 0) {
+      return { coins_collected: 0, steps: 0, lives_remaining: lives }
+    }
+    const common = {
+      coins_collected: this.coinsCollected[step],
+      powerups_collected: this.powerupsCollected[step],
+      ghosts_eaten: this.ghostsEaten[step]
+    }
+    if (reason === null) {
+      return {
+        ...common,
+        steps: step,
+        invincible: this.timer[step] > 0,
+        invincible_timer: this.timer[step]
+      }
+    }
+    const info = { reason, ...common }
+    if (reason === 'life_lost') info.lives_remaining = lives
+    if (reason !== 'all_coins_collected') info.lives_lost = this.livesLost[step]
+    return info
+  }
+}